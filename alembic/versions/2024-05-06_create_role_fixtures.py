@@ -31,7 +31,9 @@ def upgrade() -> None:
             {"id": index + 1, "name": role.value, "created_at": datetime.datetime.now(), "updated_at": datetime.datetime.now()} for index, role in enumerate(UserRole)
         ],
     )
-    op.execute("SELECT setval('role_id_seq', (SELECT MAX(id) FROM role))")
+    # Only PostgreSQL needs the sequence moved past the explicitly inserted ids, e.g. not the SQLite test database.
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("SELECT setval('role_id_seq', (SELECT MAX(id) FROM role))")
 
 
 def downgrade() -> None:
@@ -0,0 +1,27 @@
+"""add revoked token reused column
+
+Revision ID: 7a1d4c9e3b52
+Revises: 5e8b3f1c9d24
+Create Date: 2026-10-19 22:48:31.204617
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7a1d4c9e3b52"
+down_revision = "5e8b3f1c9d24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "revoked_token",
+        sa.Column("reused", sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("revoked_token", "reused")
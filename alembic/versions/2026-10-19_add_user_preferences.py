@@ -0,0 +1,32 @@
+"""add user preferences
+
+Revision ID: 5a8e2f0c7d31
+Revises: 9d4b6c2e1f85
+Create Date: 2026-10-19 16:40:52.918304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5a8e2f0c7d31"
+down_revision = "9d4b6c2e1f85"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user",
+        sa.Column("timezone", sa.String(), server_default="UTC", nullable=False),
+    )
+    op.add_column(
+        "user",
+        sa.Column("weight_unit", sa.String(), server_default="kg", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user", "weight_unit")
+    op.drop_column("user", "timezone")
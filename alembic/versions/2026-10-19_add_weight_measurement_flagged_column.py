@@ -0,0 +1,27 @@
+"""add weight measurement flagged column
+
+Revision ID: 2c9d7e4f1a68
+Revises: 8f3c6a2d5e17
+Create Date: 2026-10-19 20:05:13.482190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2c9d7e4f1a68"
+down_revision = "8f3c6a2d5e17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "weight_measurement",
+        sa.Column("flagged", sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("weight_measurement", "flagged")
@@ -0,0 +1,35 @@
+"""add weight measurement sync columns
+
+Revision ID: 9d4b6c2e1f85
+Revises: 3e5a1f7b9c02
+Create Date: 2026-10-19 14:12:08.204716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9d4b6c2e1f85"
+down_revision = "3e5a1f7b9c02"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "weight_measurement", sa.Column("deleted_at", sa.DateTime(), nullable=True)
+    )
+    # Delta synchronization reads the changes of a user ordered by their modification time.
+    op.create_index(
+        "ix_weight_measurement_user_id_updated_at",
+        "weight_measurement",
+        ["user_id", "updated_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_weight_measurement_user_id_updated_at", table_name="weight_measurement"
+    )
+    op.drop_column("weight_measurement", "deleted_at")
@@ -0,0 +1,28 @@
+"""create admin role
+
+Revision ID: 5e8b3f1c9d24
+Revises: 2c9d7e4f1a68
+Create Date: 2026-10-19 21:34:08.561027
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5e8b3f1c9d24"
+down_revision = "2c9d7e4f1a68"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The role fixtures migration inserts every `UserRole`, so fresh databases may already have it.
+    op.execute(
+        "INSERT INTO role (name, created_at, updated_at) "
+        "SELECT 'admin', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "WHERE NOT EXISTS (SELECT 1 FROM role WHERE name = 'admin')"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM role WHERE name = 'admin'")
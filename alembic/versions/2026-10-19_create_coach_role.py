@@ -0,0 +1,28 @@
+"""create coach role
+
+Revision ID: 7c2f9d4e8a13
+Revises: 1b6ea1364d25
+Create Date: 2026-10-19 09:12:41.118204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "7c2f9d4e8a13"
+down_revision = "1b6ea1364d25"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The role fixtures migration inserts every `UserRole`, so fresh databases may already have it.
+    op.execute(
+        "INSERT INTO role (name, created_at, updated_at) "
+        "SELECT 'coach', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "WHERE NOT EXISTS (SELECT 1 FROM role WHERE name = 'coach')"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM role WHERE name = 'coach'")
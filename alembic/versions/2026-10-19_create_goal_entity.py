@@ -0,0 +1,44 @@
+"""create goal entity
+
+Revision ID: 8f3c6a2d5e17
+Revises: 4b7e1d9a3c56
+Create Date: 2026-10-19 18:22:40.671935
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8f3c6a2d5e17"
+down_revision = "4b7e1d9a3c56"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "goal",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("target_weight", sa.Float(), nullable=False),
+        sa.Column("target_date", sa.Date(), nullable=False),
+        sa.Column("start_weight", sa.Float(), nullable=False),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("latest_weight", sa.Float(), nullable=False),
+        sa.Column("latest_date", sa.DateTime(), nullable=False),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("sum_t", sa.Float(), nullable=False),
+        sa.Column("sum_w", sa.Float(), nullable=False),
+        sa.Column("sum_tt", sa.Float(), nullable=False),
+        sa.Column("sum_tw", sa.Float(), nullable=False),
+        sa.Column("progress", sa.Float(), nullable=False),
+        sa.Column("eta", sa.Date(), nullable=True),
+        sa.Column("milestone", sa.Integer(), nullable=False),
+        sa.Column("milestone_reached_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("goal")
@@ -0,0 +1,36 @@
+"""create revoked token entity
+
+Revision ID: 3e5a1f7b9c02
+Revises: 7c2f9d4e8a13
+Create Date: 2026-10-19 11:04:27.530117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3e5a1f7b9c02"
+down_revision = "7c2f9d4e8a13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_token",
+        sa.Column("jti", sa.String(), primary_key=True),
+        sa.Column("revoked_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_revoked_token_expires_at", "revoked_token", ["expires_at"])
+    # Workers poll for revocations created since their last synchronization.
+    op.create_index("ix_revoked_token_created_at", "revoked_token", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_revoked_token_created_at", table_name="revoked_token")
+    op.drop_index("ix_revoked_token_expires_at", table_name="revoked_token")
+    op.drop_table("revoked_token")
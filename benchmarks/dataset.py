@@ -0,0 +1,133 @@
+import datetime
+import random
+from dataclasses import dataclass
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.utils.db_utils import Base
+from src.modules.auth.constants import UserRole
+from src.modules.auth.models import Role, User, UserRole as UserRoleModel
+from src.modules.weight.models import WeightMeasurement
+
+# Password shared by all generated users, hashed only once since bcrypt is deliberately slow.
+BENCHMARK_PASSWORD = "benchmark-password"
+
+# Rows inserted per statement when seeding the database.
+INSERT_CHUNK_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Describes the size of a generated dataset.
+
+    Attributes:
+        users (int): The number of generated users.
+        measurements_per_user (int): The number of daily weight measurements per user.
+    """
+
+    users: int
+    measurements_per_user: int
+
+
+SCALES: dict[str, Scale] = {
+    "small": Scale(users=10, measurements_per_user=90),
+    "medium": Scale(users=100, measurements_per_user=365),
+    "large": Scale(users=1000, measurements_per_user=730),
+}
+
+
+def user_email(index: int) -> str:
+    """Return the email address of the generated user with the given index.
+
+    Args:
+        index (int): The index of the generated user.
+
+    Returns:
+        str: The email address of the user.
+    """
+    return f"bench-user-{index}@example.com"
+
+
+def generate_weight_series(
+    count: int, end: datetime.datetime, rng: random.Random
+) -> list[tuple[datetime.datetime, float]]:
+    """Generate a realistic daily weight series as a slow random walk with daily noise.
+
+    Args:
+        count (int): The number of measurements to generate.
+        end (datetime.datetime): The date of the last measurement.
+        rng (random.Random): The random generator to use.
+
+    Returns:
+        list[tuple[datetime.datetime, float]]: The (date, weight) pairs in chronological order.
+    """
+    weight = rng.uniform(55.0, 110.0)
+    trend = rng.uniform(-0.05, 0.05)
+    series = []
+    for day in range(count):
+        weight += trend + rng.gauss(0, 0.1)
+        # Measurements are taken in the morning at a slightly different time every day.
+        date = end - datetime.timedelta(
+            days=count - day - 1, minutes=rng.randint(0, 90)
+        )
+        series.append((date.replace(microsecond=0), round(weight + rng.gauss(0, 0.3), 1)))
+    return series
+
+
+async def seed_database(engine: AsyncEngine, scale: Scale, seed: int = 42) -> None:
+    """Recreate the schema and fill it with generated users and weight measurements.
+
+    Args:
+        engine (AsyncEngine): The engine of the benchmark database. All existing tables are dropped.
+        scale (Scale): The size of the generated dataset.
+        seed (int): The seed of the random generator, so datasets are reproducible.
+
+    Returns:
+        None
+    """
+    rng = random.Random(seed)
+    now = datetime.datetime.now().replace(hour=7, minute=0, second=0, microsecond=0)
+    hashed_password = User.hash_password(BENCHMARK_PASSWORD)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+        # Insert the role fixtures the same way the `create_role_fixtures` migration does.
+        await connection.execute(
+            insert(Role),
+            [{"id": index + 1, "name": role.value} for index, role in enumerate(UserRole)],
+        )
+        user_role_id = await connection.scalar(
+            select(Role.id).where(Role.name == UserRole.USER.value)
+        )
+
+        result = await connection.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {
+                    "full_name": f"Benchmark User {index}",
+                    "email": user_email(index),
+                    "hashed_password": hashed_password,
+                }
+                for index in range(scale.users)
+            ],
+        )
+        user_ids = result.scalars().all()
+        await connection.execute(
+            insert(UserRoleModel),
+            [{"user_id": user_id, "role_id": user_role_id} for user_id in user_ids],
+        )
+
+        # Insert the measurements in chunks to keep the statements reasonably sized.
+        rows = []
+        for user_id in user_ids:
+            for date, weight in generate_weight_series(
+                scale.measurements_per_user, now, rng
+            ):
+                rows.append({"user_id": user_id, "date": date, "weight": weight})
+                if len(rows) >= INSERT_CHUNK_SIZE:
+                    await connection.execute(insert(WeightMeasurement), rows)
+                    rows = []
+        if rows:
+            await connection.execute(insert(WeightMeasurement), rows)
@@ -0,0 +1,155 @@
+"""Compare requests/sec of the previous and the tuned Gunicorn worker configuration.
+
+Usage:
+    python -m benchmarks.gunicorn_profiles --workers 4 --concurrency 64 --requests 20000
+
+Both profiles start Gunicorn with ``gunicorn/gunicorn_conf.py`` and differ only in the
+environment. By default the unauthenticated ``/auth/me`` path is measured: it exercises the
+worker, the HTTP parser and the middleware stack without needing a database. Pass ``--token``
+together with a reachable ``DATABASE_URL`` to measure authenticated routes.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from uvicorn.workers import UvicornWorker
+from benchmarks.environment import DEFAULT_ENVIRONMENT
+from benchmarks.harness import run_scenario
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# Environment of each profile, applied on top of the current environment.
+PROFILES: dict[str, dict[str, str]] = {
+    # The configuration before the tuning: stock worker on asyncio and h11, no recycling or preloading.
+    "previous": {
+        "WORKER_CLASS": "benchmarks.gunicorn_profiles.AsyncioH11UvicornWorker",
+        "MAX_REQUESTS": "0",
+        "MAX_REQUESTS_JITTER": "0",
+        "PRELOAD_APP": "false",
+    },
+    # The defaults of `gunicorn/gunicorn_conf.py`.
+    "production": {},
+}
+
+
+class AsyncioH11UvicornWorker(UvicornWorker):
+    """The stock uvicorn worker as it ran without uvloop and httptools installed."""
+
+    CONFIG_KWARGS = {"loop": "asyncio", "http": "h11"}
+
+
+def free_port() -> int:
+    """Return a free local TCP port.
+
+    Returns:
+        int: The port number.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    """Wait until the server at the given URL accepts requests.
+
+    Args:
+        url (str): The URL to probe.
+        timeout (float): The maximum time to wait in seconds.
+
+    Returns:
+        None
+
+    Raises:
+        TimeoutError: If the server doesn't respond in time.
+    """
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise TimeoutError(f"Server at {url} did not start within {timeout} s")
+
+
+async def benchmark_profile(name: str, args: argparse.Namespace) -> float:
+    """Start Gunicorn with the given profile and measure its throughput.
+
+    Args:
+        name (str): The name of the profile in `PROFILES`.
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        float: The measured requests per second.
+    """
+    port = free_port()
+    env = {
+        **DEFAULT_ENVIRONMENT,
+        **os.environ,
+        "BIND": f"127.0.0.1:{port}",
+        "WEB_CONCURRENCY": str(args.workers),
+        "LOG_CONFIG": str(ROOT_DIR / "logging_production.ini"),
+        "LOG_LEVEL": "warning",
+        **PROFILES[name],
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn/gunicorn_conf.py", "src.main:app"],
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        await wait_until_ready(base_url + args.path)
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits) as client:
+            result = await run_scenario(
+                [client],
+                lambda client, _: client.get(args.path),
+                args.requests,
+                args.concurrency,
+                warmup=args.concurrency * 10,
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(
+        f"{name:<12} {result.throughput:>10.2f} req/s  p50 {result.p50_ms:>8.2f} ms  "
+        f"p95 {result.p95_ms:>8.2f} ms  p99 {result.p99_ms:>8.2f} ms"
+    )
+    return result.throughput
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Benchmark all profiles one after another and print the relative difference.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        None
+    """
+    throughput = {name: await benchmark_profile(name, args) for name in PROFILES}
+    change = throughput["production"] / throughput["previous"] - 1
+    print(f"\nproduction vs previous: {change:+.1%} requests/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--path", default="/auth/me")
+    parser.add_argument("--token", help="Access token sent as a bearer token.")
+    asyncio.run(main(parser.parse_args()))
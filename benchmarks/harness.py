@@ -0,0 +1,153 @@
+import asyncio
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable
+
+import httpx
+
+# A scenario issues one request with the given client for the given virtual user index.
+Scenario = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+@dataclass
+class ScenarioResult:
+    """Aggregated measurements of a single benchmark scenario.
+
+    Attributes:
+        requests (int): The number of issued requests.
+        errors (int): The number of requests that did not finish with a 2xx status code.
+        concurrency (int): The number of concurrently running virtual users.
+        throughput (float): Completed requests per second.
+        mean_ms (float): The mean latency in milliseconds.
+        p50_ms (float): The median latency in milliseconds.
+        p95_ms (float): The 95th percentile of the latency in milliseconds.
+        p99_ms (float): The 99th percentile of the latency in milliseconds.
+    """
+
+    requests: int
+    errors: int
+    concurrency: int
+    throughput: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    def to_dict(self) -> dict[str, float]:
+        """Return the result as a JSON serializable dictionary.
+
+        Returns:
+            dict[str, float]: The result fields.
+        """
+        return asdict(self)
+
+
+def summarize(
+    latencies: list[float], errors: int, concurrency: int, elapsed: float
+) -> ScenarioResult:
+    """Compute throughput and latency percentiles of a finished scenario.
+
+    Args:
+        latencies (list[float]): The latencies of all requests in seconds.
+        errors (int): The number of failed requests.
+        concurrency (int): The number of concurrently running virtual users.
+        elapsed (float): The wall-clock duration of the scenario in seconds.
+
+    Returns:
+        ScenarioResult: The aggregated measurements.
+    """
+    # `quantiles` needs at least two data points; a single one is its own percentile.
+    cut_points = (
+        statistics.quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else latencies * 99
+    )
+    return ScenarioResult(
+        requests=len(latencies),
+        errors=errors,
+        concurrency=concurrency,
+        throughput=round(len(latencies) / elapsed, 2),
+        mean_ms=round(statistics.fmean(latencies) * 1000, 3),
+        p50_ms=round(cut_points[49] * 1000, 3),
+        p95_ms=round(cut_points[94] * 1000, 3),
+        p99_ms=round(cut_points[98] * 1000, 3),
+    )
+
+
+async def run_scenario(
+    clients: list[httpx.AsyncClient],
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+) -> ScenarioResult:
+    """Drive a scenario with concurrently running virtual users.
+
+    Args:
+        clients (list[httpx.AsyncClient]): Authenticated clients; virtual users pick them round-robin.
+        scenario (Scenario): The scenario issuing a single request.
+        requests (int): The total number of measured requests.
+        concurrency (int): The number of concurrently running virtual users.
+        warmup (int): The number of unmeasured requests issued before the measurement.
+
+    Returns:
+        ScenarioResult: The aggregated measurements.
+    """
+    for index in range(warmup):
+        await scenario(clients[index % len(clients)], index)
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def virtual_user() -> None:
+        nonlocal errors
+        # Virtual users share the iterator, so exactly `requests` requests are issued in total.
+        for index in remaining:
+            start = time.perf_counter()
+            response = await scenario(clients[index % len(clients)], index)
+            latencies.append(time.perf_counter() - start)
+            if not response.is_success:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+    return summarize(latencies, errors, concurrency, time.perf_counter() - start)
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Compare scenario results against a baseline and print a report.
+
+    A scenario regresses when its throughput drops, or its p95 latency grows, by more than
+    the threshold relative to the baseline.
+
+    Args:
+        results (dict[str, dict[str, float]]): The current results keyed by scenario name.
+        baseline (dict[str, dict[str, float]]): The baseline results keyed by scenario name.
+        threshold (float): The tolerated relative change, e.g. ``0.1`` for 10 %.
+
+    Returns:
+        list[str]: The names of the regressed scenarios.
+    """
+    regressions = []
+    print(f"\n{'scenario':<16}{'rps':>12}{'Δ rps':>10}{'p95 ms':>12}{'Δ p95':>10}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            print(f"{name:<16}{result['throughput']:>12.2f}{'-':>10}{result['p95_ms']:>12.3f}{'-':>10}")
+            continue
+
+        throughput_change = result["throughput"] / reference["throughput"] - 1
+        p95_change = result["p95_ms"] / reference["p95_ms"] - 1
+        print(
+            f"{name:<16}{result['throughput']:>12.2f}{throughput_change:>+10.1%}"
+            f"{result['p95_ms']:>12.3f}{p95_change:>+10.1%}"
+        )
+        if throughput_change < -threshold or p95_change > threshold:
+            regressions.append(name)
+    return regressions
@@ -0,0 +1,128 @@
+"""Measure the cost of signing and verifying tokens per JWT algorithm.
+
+Usage:
+    python -m benchmarks.jwt_algorithms --iterations 2000
+
+Every algorithm is measured with key objects parsed once (as ``JWTKeySet`` does) and with
+raw PEM strings or secrets passed to PyJWT on every call (as tokens were handled before).
+"""
+
+import argparse
+import datetime
+import timeit
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from benchmarks.environment import set_default_environment
+
+# The application settings are read at import time, provide defaults for a standalone run.
+set_default_environment()
+
+import jwt  # noqa: E402
+from src.utils.jwt_utils import JWTKeySet  # noqa: E402
+
+# Algorithms and their freshly generated private keys.
+PRIVATE_KEYS = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def to_pem(key) -> tuple[bytes, bytes]:
+    """Serialize a private key and its public key to PEM.
+
+    Args:
+        key: The private key object.
+
+    Returns:
+        tuple[bytes, bytes]: The private and the public key in PEM format.
+    """
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem, public_pem
+
+
+def measure(function, iterations: int) -> float:
+    """Measure the mean duration of a call.
+
+    Args:
+        function: The measured callable.
+        iterations (int): The number of calls per repetition.
+
+    Returns:
+        float: The duration of the fastest repetition per call in microseconds.
+    """
+    return min(timeit.repeat(function, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    """Print the sign and verify cost of every algorithm.
+
+    Args:
+        iterations (int): The number of calls per measurement.
+
+    Returns:
+        None
+    """
+    now = datetime.datetime.now()
+    payload = {
+        "sub": 42,
+        "exp": now + datetime.timedelta(minutes=30),
+        "iat": now,
+        "jti": "0" * 32,
+        "type": "access",
+    }
+
+    # The cached key set and the raw signing and verification keys of every algorithm.
+    setups = {
+        "HS256": (
+            JWTKeySet("HS256", None, b"s" * 32, {None: b"s" * 32}),
+            "s" * 32,
+            "s" * 32,
+        )
+    }
+    for algorithm, generate in PRIVATE_KEYS.items():
+        key = generate()
+        private_pem, public_pem = to_pem(key)
+        key_set = JWTKeySet(algorithm, "bench", key, {"bench": key.public_key()})
+        setups[algorithm] = (key_set, private_pem, public_pem)
+
+    print(
+        f"{'algorithm':<10}{'sign µs':>12}{'verify µs':>12}{'sign PEM µs':>14}{'verify PEM µs':>16}{'size B':>8}"
+    )
+    for algorithm, (key_set, signing_key, verification_key) in setups.items():
+        token = key_set.sign(payload)
+        raw_token = jwt.encode(payload, signing_key, algorithm=algorithm)
+        results = [
+            measure(lambda: key_set.sign(payload), iterations),
+            measure(lambda: key_set.verify(token), iterations),
+            measure(
+                lambda: jwt.encode(payload, signing_key, algorithm=algorithm),
+                iterations,
+            ),
+            measure(
+                lambda: jwt.decode(raw_token, verification_key, algorithms=[algorithm]),
+                iterations,
+            ),
+        ]
+        print(
+            f"{algorithm:<10}"
+            + "".join(
+                f"{value:>{width}.1f}"
+                for value, width in zip(results, (12, 12, 14, 16))
+            )
+            + f"{len(token):>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    main(parser.parse_args().iterations)
@@ -0,0 +1,192 @@
+"""Measure the latency the logging pipeline adds to requests, synchronous versus queued JSON logging.
+
+Usage:
+    python -m benchmarks.logging_pipeline --concurrency 32 --requests 5000
+    python -m benchmarks.logging_pipeline --sink-latency-us 500 --lines-per-request 5
+
+Every request logs the access line plus ``--lines-per-request`` application lines with the request
+context, formatted to JSON. The sink emulates stderr piped to a log collector: every write blocks
+for ``--sink-latency-us``. The scenarios run against a seeded local database, once without any
+log handler, once with a ``StreamHandler`` writing on the event loop and once with the
+``QueueLogHandler`` of ``logging_production.ini``.
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.environment import set_default_environment
+
+# The application settings are read at import time, provide defaults for a standalone run.
+set_default_environment()
+
+import httpx  # noqa: E402
+from pythonjsonlogger.jsonlogger import JsonFormatter  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from src.main import app  # noqa: E402
+from src.utils import db_utils  # noqa: E402
+from src.utils.log_utils import QueueLogHandler, RequestContextFilter  # noqa: E402
+from benchmarks.dataset import SCALES, seed_database  # noqa: E402
+from benchmarks.harness import run_scenario  # noqa: E402
+from benchmarks.run import build_scenarios, sign_in_clients  # noqa: E402
+
+# The format of logging_production.ini.
+JSON_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s %(request_id)s %(user_id)s %(route)s %(db_queries)s %(db_ms)s"
+
+app_logger = logging.getLogger("src.benchmark")
+
+
+class SlowSink(io.TextIOBase):
+    """A text stream to a file whose every write blocks, like a pipe to a busy log collector.
+
+    Attributes:
+        latency (float): The time in seconds every write blocks.
+        lines (int): The number of written lines.
+    """
+
+    def __init__(self, path: Path, latency: float) -> None:
+        self.file = path.open("w")
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.latency)
+        self.lines += text.count("\n")
+        return self.file.write(text)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+
+def create_handler(mode: str, sink: SlowSink) -> Optional[logging.Handler]:
+    """Create the log handler of a mode.
+
+    Args:
+        mode (str): ``none``, ``sync`` or ``queue``.
+        sink (SlowSink): The stream the handler writes to.
+
+    Returns:
+        Optional[logging.Handler]: The handler, None for ``none``.
+    """
+    if mode == "none":
+        return None
+    if mode == "sync":
+        handler = logging.StreamHandler(sink)
+        handler.addFilter(RequestContextFilter())
+    else:
+        handler = QueueLogHandler(sink, queue_size=100_000)
+    handler.setFormatter(JsonFormatter(JSON_FORMAT))
+    return handler
+
+
+def measure_calls(handler: logging.Handler, iterations: int) -> float:
+    """Measure the time a log call takes in the calling thread.
+
+    Args:
+        handler (logging.Handler): The handler of the measured logger.
+        iterations (int): The number of log calls.
+
+    Returns:
+        float: The duration of a call in microseconds.
+    """
+    logger = logging.Logger("benchmark.calls")
+    logger.addHandler(handler)
+    duration = timeit.timeit(
+        lambda: logger.info("Measurement %d saved", 42, extra={"weight": 80.0}),
+        number=iterations,
+    )
+    return duration / iterations * 1e6
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Seed the database and run the scenarios in every logging mode.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        None
+    """
+    scale = SCALES[args.scale]
+    engine = create_async_engine(args.database_url)
+    db_utils.async_session.configure(bind=engine)
+    await seed_database(engine, scale)
+
+    transport = httpx.ASGITransport(app=app)
+    clients = await sign_in_clients(transport, min(scale.users, args.concurrency))
+    scenarios = build_scenarios(scale.users)
+
+    async def scenario(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        response = await scenarios[args.scenario](client, index)
+        for line in range(args.lines_per_request):
+            app_logger.info("Processed step %d of request %d", line, index)
+        return response
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    output_dir = Path(tempfile.mkdtemp(prefix="logging-benchmark-"))
+    print(
+        f"{args.scenario}, {args.requests} requests, concurrency {args.concurrency}, "
+        f"{args.lines_per_request + 1} lines per request, sink latency {args.sink_latency_us} µs\n"
+    )
+    print(
+        f"{'mode':<8}{'call µs':>10}{'rps':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'written':>10}{'dropped':>10}"
+    )
+    try:
+        for mode in ("none", "sync", "queue"):
+            sink = SlowSink(output_dir / f"{mode}.log", args.sink_latency_us / 1e6)
+            handler = create_handler(mode, sink)
+            call_us = measure_calls(handler, 1000) if handler else 0.0
+            if handler:
+                root.addHandler(handler)
+            try:
+                result = await run_scenario(
+                    clients, scenario, args.requests, args.concurrency, args.warmup
+                )
+            finally:
+                if handler:
+                    root.removeHandler(handler)
+                    # Waits for the queued records, so the written lines are complete
+                    handler.close()
+            dropped = getattr(handler, "dropped", 0)
+            print(
+                f"{mode:<8}{call_us:>10.1f}{result.throughput:>12.2f}{result.p50_ms:>10.2f}"
+                f"{result.p95_ms:>10.2f}{result.p99_ms:>10.2f}{sink.lines:>10}{dropped:>10}"
+            )
+    finally:
+        for client in clients:
+            await client.aclose()
+        await engine.dispose()
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite+aiosqlite:///{Path(tempfile.gettempdir()) / 'weight-tracker-benchmark.db'}",
+        help="Async database URL of a throwaway database, its tables are dropped and recreated.",
+    )
+    parser.add_argument("--scenario", choices=list(build_scenarios(1)), default="me")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--lines-per-request", type=int, default=3)
+    parser.add_argument("--sink-latency-us", type=float, default=100)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,121 @@
+"""Report the import-time breakdown of the application and the duration of its startup.
+
+Usage:
+    python -m benchmarks.startup --top 25
+    python -m benchmarks.startup --module src.main --lifespan
+
+The import of the module runs in a fresh interpreter with ``-X importtime``, so the numbers
+match a cold start of a Gunicorn worker. ``--lifespan`` additionally runs the application's
+startup hook, which needs a reachable ``DATABASE_URL``.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from benchmarks.environment import DEFAULT_ENVIRONMENT
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# Runs the application's lifespan startup and shutdown, printing the elapsed time of both.
+LIFESPAN_SCRIPT = """
+import asyncio, time
+from {module} import app
+
+async def main():
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        print(f"lifespan startup: {{(time.perf_counter() - start) * 1000:.1f}} ms")
+        start = time.perf_counter()
+    print(f"lifespan shutdown: {{(time.perf_counter() - start) * 1000:.1f}} ms")
+
+asyncio.run(main())
+"""
+
+
+@dataclass
+class ImportRecord:
+    """A single line of the ``-X importtime`` output.
+
+    Attributes:
+        module (str): The imported module.
+        self_us (int): The time spent importing the module itself in microseconds.
+        cumulative_us (int): The time including the imports of its dependencies in microseconds.
+    """
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def measure_imports(module: str) -> list[ImportRecord]:
+    """Import the module in a fresh interpreter and collect its import times.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        list[ImportRecord]: The import times of all modules imported along the way.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        env={**DEFAULT_ENVIRONMENT, **os.environ},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us)))
+    return records
+
+
+def print_report(records: list[ImportRecord], top: int) -> None:
+    """Print the total import time, the slowest modules and the time per top-level package.
+
+    Args:
+        records (list[ImportRecord]): The collected import times.
+        top (int): The number of rows printed per table.
+
+    Returns:
+        None
+    """
+    total_us = sum(record.self_us for record in records)
+    print(f"Total import time: {total_us / 1000:.1f} ms ({len(records)} modules)\n")
+
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        print(f"{record.cumulative_us / 1000:>14.1f}{record.self_us / 1000:>10.1f}  {record.module}")
+
+    packages: dict[str, int] = defaultdict(int)
+    for record in records:
+        packages[record.module.split(".")[0]] += record.self_us
+    print(f"\n{'self ms':>14}{'share':>10}  package")
+    for package, self_us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:top]:
+        print(f"{self_us / 1000:>14.1f}{self_us / total_us:>10.1%}  {package}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--lifespan", action="store_true")
+    args = parser.parse_args()
+
+    print_report(measure_imports(args.module), args.top)
+    if args.lifespan:
+        print()
+        subprocess.run(
+            [sys.executable, "-c", LIFESPAN_SCRIPT.format(module=args.module)],
+            cwd=ROOT_DIR,
+            env={**DEFAULT_ENVIRONMENT, **os.environ},
+            check=True,
+        )
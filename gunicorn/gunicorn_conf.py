@@ -34,10 +34,20 @@ graceful_timeout_str = os.getenv("GRACEFUL_TIMEOUT", "120")
 timeout_str = os.getenv("TIMEOUT", "120")
 keepalive_str = os.getenv("KEEP_ALIVE", "5")
 use_loglevel = os.getenv("LOG_LEVEL", "info")
+worker_class_str = os.getenv("WORKER_CLASS", "src.workers.ProductionUvicornWorker")
+worker_connections_str = os.getenv("WORKER_CONNECTIONS", "1000")
+backlog_str = os.getenv("BACKLOG", "2048")
+max_requests_str = os.getenv("MAX_REQUESTS", "10000")
+max_requests_jitter_str = os.getenv("MAX_REQUESTS_JITTER", "1000")
+preload_app_str = os.getenv("PRELOAD_APP", "true")
+forwarded_allow_ips_str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
 
 # Gunicorn configuration variables
 loglevel = use_loglevel  # Logging level for Gunicorn
+bind = use_bind  # Address the server listens on
 workers = web_concurrency  # Number of worker processes to handle requests
+# Worker implementation; the default runs uvicorn on uvloop with the httptools parser
+worker_class = worker_class_str
 
 # Temporary directory for Gunicorn workers
 worker_tmp_dir = "/dev/shm"
@@ -48,4 +58,17 @@ timeout = int(timeout_str)
 # HTTP Keep-Alive timeout for client connections
 keepalive = int(keepalive_str)
 # Logging configuration file path
-logconfig = os.getenv("LOG_CONFIG", "/src/logging_production.ini")
\ No newline at end of file
+logconfig = os.getenv("LOG_CONFIG", "/src/logging_production.ini")
+# Maximum number of concurrent connections handled by a single worker
+worker_connections = int(worker_connections_str)
+# Maximum number of pending connections in the listen queue
+backlog = int(backlog_str)
+# Restart workers after this many requests to bound memory growth (0 disables recycling)
+max_requests = int(max_requests_str)
+# Random offset added to `max_requests` so workers don't all restart at the same time
+max_requests_jitter = int(max_requests_jitter_str)
+# Import the application in the master process so workers share the loaded modules copy-on-write
+preload_app = preload_app_str.lower() in ("1", "true", "yes")
+# Proxies trusted to set X-Forwarded-For; the client IP drives the sign-in rate limit, so never use "*"
+# unless the port is reachable through the proxy only
+forwarded_allow_ips = forwarded_allow_ips_str
@@ -5,12 +5,17 @@ set -e
 DEFAULT_MODULE_NAME=src.main
 
 MODULE_NAME=${MODULE_NAME:-$DEFAULT_MODULE_NAME}
-VARIABLE_NAME=${VARIABLE_NAME:-custom_knowledge_base_chatbot}
+VARIABLE_NAME=${VARIABLE_NAME:-app}
 export APP_MODULE=${APP_MODULE:-"$MODULE_NAME:$VARIABLE_NAME"}
 
 DEFAULT_GUNICORN_CONF=/src/gunicorn/gunicorn_conf.py
 export GUNICORN_CONF=${GUNICORN_CONF:-$DEFAULT_GUNICORN_CONF}
-export WORKER_CLASS=${WORKER_CLASS:-"uvicorn.workers.UvicornWorker"}
+export WORKER_CLASS=${WORKER_CLASS:-"src.workers.ProductionUvicornWorker"}
+
+# Generate the OpenAPI schema once, the workers serve the file instead of generating it each
+if [ -n "$OPENAPI_SCHEMA_PATH" ] && [ -n "${OPENAPI_URL-/openapi.json}" ]; then
+    python -m src.openapi --output "$OPENAPI_SCHEMA_PATH"
+fi
 
 # Start Gunicorn
-gunicorn --forwarded-allow-ips "*" -k "$WORKER_CLASS" -c "$GUNICORN_CONF" "$APP_MODULE"
\ No newline at end of file
+gunicorn -k "$WORKER_CLASS" -c "$GUNICORN_CONF" "$APP_MODULE"
\ No newline at end of file
@@ -0,0 +1,9 @@
+#!/usr/bin/env bash
+
+set -e
+
+LOG_CONFIG=${LOG_CONFIG:-/src/logging_production.ini}
+export LOG_CONFIG
+
+# Start a job worker, run alongside the Gunicorn application servers
+exec python -m src.modules.jobs.worker
@@ -1,15 +1,93 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
-from pydantic import PostgresDsn
+from pydantic import BaseModel, PostgresDsn
 
 
 class DBConfig(BaseSettings):
     DATABASE_URL: PostgresDsn
     DATABASE_ENCRYPTION_KEY: str
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_WARMUP: int = 2
+    # On shutdown, the longest wait in seconds for the connections still in use before closing the pool.
+    DATABASE_DRAIN_TIMEOUT: float = 10
 
 class CorsConfig(BaseSettings):
     CORS_ORIGINS: list[str]
     CORS_HEADERS: list[str]
     CORS_METHODS: list[str]
 
+class MonitoringConfig(BaseSettings):
+    QUERY_BUDGET: int = 10
+    SERVER_TIMING_ENABLED: bool = True
+
+class LoggingConfig(BaseSettings):
+    ACCESS_LOG_ENABLED: bool = True
+    # The fraction of the fast successful requests logged, failed and slow ones are always logged.
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SLOW_REQUEST_MS: float = 500
+
+class DocsConfig(BaseSettings):
+    # An empty URL disables the schema or a docs UI, the UIs require the schema.
+    OPENAPI_URL: str = "/openapi.json"
+    DOCS_URL: str = "/"
+    REDOC_URL: str = "/redoc"
+    # The schema written by `python -m src.openapi`, workers generate it themselves if it's missing.
+    OPENAPI_SCHEMA_PATH: Optional[str] = None
+
+class TracingConfig(BaseSettings):
+    TRACING_ENABLED: bool = False
+    # The fraction of the requests traced, unless the caller's `traceparent` header decides.
+    TRACING_SAMPLE_RATE: float = 0.01
+    # memory, file (OTLP/JSON lines) or otlp (OTLP/HTTP collector).
+    TRACING_EXPORTER: Literal["memory", "file", "otlp"] = "file"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_SERVICE_NAME: str = "weight-tracker"
+    # Logs a breakdown of every traced request, for local use.
+    TRACING_DEBUG: bool = False
+
+class ConcurrencyLimit(BaseModel):
+    PATHS: list[str]
+    # None exempts the group from load shedding.
+    LIMIT: Optional[int] = None
+    QUEUE_SIZE: int = 0
+    QUEUE_TIMEOUT: float = 0
+
+class LoadSheddingConfig(BaseSettings):
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHEDDING_RETRY_AFTER: int = 1
+    # Route groups matched by path prefix in order, the first matching group applies.
+    CONCURRENCY_LIMITS: dict[str, ConcurrencyLimit] = {
+        "auth": ConcurrencyLimit(
+            PATHS=["/auth/sign-in", "/auth/sign-up"], LIMIT=4, QUEUE_SIZE=16, QUEUE_TIMEOUT=2.0
+        ),
+        # Event streams stay open, they are capped by STREAM_MAX_CONNECTIONS instead of taking
+        # the slots of the default group.
+        "stream": ConcurrencyLimit(PATHS=["/weight/stream"]),
+        # Probes must be answered by saturated workers, readiness reflects the pool on its own.
+        "health": ConcurrencyLimit(PATHS=["/health/"]),
+        # Kept apart from the default group, so workers can be profiled while they are saturated.
+        "admin": ConcurrencyLimit(
+            PATHS=["/admin/"], LIMIT=2, QUEUE_SIZE=0, QUEUE_TIMEOUT=0
+        ),
+        "default": ConcurrencyLimit(
+            PATHS=["/"], LIMIT=100, QUEUE_SIZE=200, QUEUE_TIMEOUT=5.0
+        ),
+    }
+
+class CompressionConfig(BaseSettings):
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # Offered in the order of preference, brotli and zstd require the optional packages.
+    COMPRESSION_ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_CACHE_SIZE: int = 16 * 1024 * 1024
+
 db_config: DBConfig = DBConfig()
-cors_config: CorsConfig = CorsConfig()
\ No newline at end of file
+cors_config: CorsConfig = CorsConfig()
+monitoring_config: MonitoringConfig = MonitoringConfig()
+logging_config: LoggingConfig = LoggingConfig()
+tracing_config: TracingConfig = TracingConfig()
+docs_config: DocsConfig = DocsConfig()
+load_shedding_config: LoadSheddingConfig = LoadSheddingConfig()
+compression_config: CompressionConfig = CompressionConfig()
\ No newline at end of file
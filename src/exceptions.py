@@ -57,3 +57,29 @@ class AlreadyExists(DetailedHTTPException):
     def __init__(self, detail: str = "Entity already exists") -> None:
         self.DETAIL = detail
         super().__init__()
+
+
+class Conflict(DetailedHTTPException):
+    STATUS_CODE = status.HTTP_409_CONFLICT
+
+    def __init__(self, detail: str = "Conflict with the current state") -> None:
+        self.DETAIL = detail
+        super().__init__()
+
+
+class TooManyRequests(DetailedHTTPException):
+    STATUS_CODE = status.HTTP_429_TOO_MANY_REQUESTS
+
+    def __init__(self, detail: str = "Too many requests", retry_after: int = 1) -> None:
+        self.DETAIL = detail
+        super().__init__(headers={"Retry-After": str(retry_after)})
+
+
+class ServiceUnavailable(DetailedHTTPException):
+    STATUS_CODE = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def __init__(
+        self, detail: str = "Service unavailable", retry_after: int = 1
+    ) -> None:
+        self.DETAIL = detail
+        super().__init__(headers={"Retry-After": str(retry_after)})
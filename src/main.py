@@ -1,18 +1,69 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from starlette.middleware.cors import CORSMiddleware
-from src.utils.db_utils import close_db
+from src.utils.db_utils import init_db, close_db
+from src.utils.jwt_utils import load_key_sets
+from src.modules.auth.config import auth_config
+from src.modules.auth.repository import revocation_store, role_registry
 from src.modules.auth.router import router as auth_router
+from src.modules.weight.repository import measurement_notifications
 from src.modules.weight.router import router as weight_router
-from src.config import cors_config
+from src.modules.goals.router import router as goals_router
+from src.modules.jobs.router import router as jobs_router
+from src.modules.admin.router import router as admin_router
+from src.modules.health.router import router as health_router
+from src.modules.health.service import service as health_service
+from src.config import (
+    compression_config,
+    cors_config,
+    db_config,
+    docs_config,
+    load_shedding_config,
+    logging_config,
+    monitoring_config,
+    tracing_config,
+)
+from src.middlewares import (
+    CompressionMiddleware,
+    LoadSheddingMiddleware,
+    QueryBudgetMiddleware,
+    RequestContextMiddleware,
+    TracingMiddleware,
+)
+from src.openapi import setup_docs
+from src.utils.trace_utils import Tracer, create_exporter
+
+tracer = Tracer(
+    create_exporter(
+        tracing_config.TRACING_EXPORTER,
+        tracing_config.TRACING_SERVICE_NAME,
+        tracing_config.TRACING_FILE_PATH,
+        tracing_config.TRACING_OTLP_ENDPOINT,
+    ),
+    sample_rate=tracing_config.TRACING_SAMPLE_RATE,
+    debug=tracing_config.TRACING_DEBUG,
+)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     # Startup
+    load_key_sets()
+    await init_db()
+    await role_registry.start(auth_config.ROLE_REGISTRY_REFRESH_INTERVAL)
+    await revocation_store.start(auth_config.REVOCATION_SYNC_INTERVAL)
+    await measurement_notifications.start()
+    if openapi_schema:
+        # Spares the first docs visitor of every worker the generation
+        openapi_schema.load()
     yield
     # Shutdown
-    await close_db()
+    health_service.drain()
+    await measurement_notifications.stop()
+    await revocation_store.stop()
+    await role_registry.stop()
+    await close_db(db_config.DATABASE_DRAIN_TIMEOUT)
+    tracer.exporter.shutdown()
 
 
 app = FastAPI(
@@ -20,7 +71,10 @@ app = FastAPI(
     version="0.0.1",
     summary="Weight tracker API",
     description="API for weight tracking and analysis",
-    docs_url="/",
+    # Served from the precomputed schema by `setup_docs`
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
     lifespan=lifespan,
 )
 
@@ -36,10 +90,78 @@ app.include_router(
     tags=["Weight tracking"],
 )
 
+app.include_router(
+    goals_router,
+    prefix="/goals",
+    tags=["Goals"],
+)
+
+app.include_router(
+    jobs_router,
+    prefix="/jobs",
+    tags=["Jobs"],
+)
+
+app.include_router(
+    health_router,
+    prefix="/health",
+    tags=["Health"],
+)
+
+app.include_router(
+    admin_router,
+    prefix="/admin",
+    tags=["Admin"],
+)
+
+openapi_schema = (
+    setup_docs(
+        app,
+        docs_config.OPENAPI_URL,
+        docs_config.DOCS_URL or None,
+        docs_config.REDOC_URL or None,
+        docs_config.OPENAPI_SCHEMA_PATH,
+    )
+    if docs_config.OPENAPI_URL
+    else None
+)
+
+if load_shedding_config.LOAD_SHEDDING_ENABLED:
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        groups=load_shedding_config.CONCURRENCY_LIMITS,
+        retry_after=load_shedding_config.LOAD_SHEDDING_RETRY_AFTER,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_config.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=cors_config.CORS_METHODS,
     allow_headers=cors_config.CORS_HEADERS,
+)
+
+if compression_config.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=compression_config.COMPRESSION_MINIMUM_SIZE,
+        encodings=compression_config.COMPRESSION_ENCODINGS,
+        cache_size=compression_config.COMPRESSION_CACHE_SIZE,
+    )
+
+app.add_middleware(
+    QueryBudgetMiddleware,
+    budget=monitoring_config.QUERY_BUDGET,
+    server_timing=monitoring_config.SERVER_TIMING_ENABLED,
+)
+
+if tracing_config.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Outermost, so the log records of all middlewares carry the request context.
+app.add_middleware(
+    RequestContextMiddleware,
+    access_log=logging_config.ACCESS_LOG_ENABLED,
+    sample_rate=logging_config.ACCESS_LOG_SAMPLE_RATE,
+    slow_request_ms=logging_config.ACCESS_LOG_SLOW_REQUEST_MS,
 )
\ No newline at end of file
@@ -0,0 +1,456 @@
+import asyncio
+import logging
+import random
+import re
+import time
+import uuid
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.config import ConcurrencyLimit
+from src.utils.compression_utils import (
+    COMPRESSORS,
+    CompressedBodyCache,
+    Compressor,
+    negotiate_encoding,
+)
+from src.utils.log_utils import RequestContext, bind_request_context
+from src.utils.query_utils import track_queries
+from src.utils.trace_utils import Tracer
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("src.access")
+
+
+class QueryBudgetMiddleware:
+    """An ASGI middleware that measures the SQL statements executed while handling a request.
+
+    The number of statements and the total DB time are attached to the response as a
+    ``Server-Timing`` header, and a warning is logged when a request exceeds the query budget.
+
+    The header only covers the statements executed before the response starts. Statements of a
+    streamed body or of the teardown of dependencies with ``yield`` run after the headers are
+    sent, they are only included in the budget check, which runs once the response completes.
+    """
+
+    def __init__(self, app: ASGIApp, budget: int, server_timing: bool = True) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped ASGI application.
+            budget (int): The maximum number of statements a single request should execute.
+            server_timing (bool): Whether to attach the ``Server-Timing`` response header.
+        """
+        self.app = app
+        self.budget = budget
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # The number of statements executed before the response started.
+        started_count = 0
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal started_count
+                if message["type"] == "http.response.start":
+                    started_count = stats.count
+                    if self.server_timing:
+                        headers = MutableHeaders(scope=message)
+                        headers.append(
+                            "Server-Timing",
+                            f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries"',
+                        )
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        # Report routes that issue more statements than expected (e.g. N+1 query patterns).
+        if stats.count > self.budget:
+            logger.warning(
+                "Query budget exceeded: %s %s executed %d queries (budget %d) in %.2f ms, "
+                "%d of them after the response started",
+                scope["method"],
+                scope["path"],
+                stats.count,
+                self.budget,
+                stats.duration_ms,
+                stats.count - started_count,
+            )
+
+
+class ConcurrencyLimiter:
+    """Limits the number of concurrently processed requests with a bounded wait queue.
+
+    Attributes:
+        limit (int): The maximum number of concurrently processed requests.
+        queue_size (int): The maximum number of requests waiting for a free slot.
+        queue_timeout (float): The maximum time in seconds a request waits for a free slot.
+        waiting (int): The number of currently waiting requests.
+    """
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> bool:
+        """Acquire a slot, waiting in the queue if all slots are taken.
+
+        Returns:
+            bool: True if a slot was acquired, False if the queue is full or the wait timed out.
+        """
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return True
+
+        # Reject immediately instead of piling up requests that would time out anyway.
+        if self.waiting >= self.queue_size:
+            return False
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def release(self) -> None:
+        """Release a previously acquired slot.
+
+        Returns:
+            None
+        """
+        self._semaphore.release()
+
+
+class LoadSheddingMiddleware:
+    """An ASGI middleware enforcing per-route-group concurrency limits.
+
+    Requests are assigned to the first group with a matching path prefix. When the group is
+    saturated and its wait queue is full (or the wait times out), the request is answered
+    right away with ``503 Service Unavailable`` and a ``Retry-After`` header, so expensive
+    routes can't starve the cheap ones of the worker and the database pool. Groups without a
+    limit, e.g. the health probes, are exempt and never shed.
+    """
+
+    def __init__(
+        self, app: ASGIApp, groups: dict[str, ConcurrencyLimit], retry_after: int
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped ASGI application.
+            groups (dict[str, ConcurrencyLimit]): The concurrency limits of the route groups, in matching order.
+            retry_after (int): The value of the ``Retry-After`` header of rejected requests in seconds.
+        """
+        self.app = app
+        self.retry_after = retry_after
+        self.groups = [
+            (
+                group.PATHS,
+                ConcurrencyLimiter(group.LIMIT, group.QUEUE_SIZE, group.QUEUE_TIMEOUT)
+                if group.LIMIT is not None
+                else None,
+            )
+            for group in groups.values()
+        ]
+
+    def _get_limiter(self, path: str) -> Optional[ConcurrencyLimiter]:
+        """Find the limiter of the first route group matching the path.
+
+        Args:
+            path (str): The request path.
+
+        Returns:
+            Optional[ConcurrencyLimiter]: The limiter of the group, or ``None`` if no group matches or the group is exempt.
+        """
+        for prefixes, limiter in self.groups:
+            if any(path.startswith(prefix) for prefix in prefixes):
+                return limiter
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = self._get_limiter(scope["path"]) if scope["type"] == "http" else None
+        if not limiter:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+class CompressionMiddleware:
+    """An ASGI middleware compressing responses with gzip, brotli or zstd.
+
+    The encoding is negotiated through the ``Accept-Encoding`` request header. Complete
+    responses smaller than the minimum size are sent as they are, larger ones are compressed
+    through a cache of the compressed bodies. Streamed responses are compressed chunk by chunk,
+    every chunk is flushed so the client receives it right away. Event streams and responses
+    that are already encoded pass through untouched.
+    """
+
+    COMPRESSIBLE_TYPES = (
+        "application/json",
+        "application/javascript",
+        "application/xml",
+        "image/svg+xml",
+        "text/",
+    )
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        encodings: list[str],
+        cache_size: int,
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped ASGI application.
+            minimum_size (int): The minimum size of a complete response body to compress, in bytes.
+            encodings (list[str]): The offered encodings in the order of preference, the ones
+                without an installed compressor are ignored.
+            cache_size (int): The maximum total size of the cached compressed bodies, in bytes.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [encoding for encoding in encodings if encoding in COMPRESSORS]
+        self.cache = CompressedBodyCache(cache_size)
+
+    def _is_compressible(self, headers: Headers) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            "content-encoding" not in headers
+            and content_type.startswith(self.COMPRESSIBLE_TYPES)
+            # Buffering in the compressor would delay the events.
+            and not content_type.startswith("text/event-stream")
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = None
+        if scope["type"] == "http":
+            accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+            encoding = negotiate_encoding(accept_encoding, self.encodings)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                # The headers depend on the body, hold them back until its first chunk.
+                if self._is_compressible(Headers(raw=message["headers"])):
+                    start_message = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(scope=start_message)
+                if not more_body:
+                    if len(body) < self.minimum_size:
+                        passthrough = True
+                        await send(start_message)
+                        await send(message)
+                        return
+
+                    body = self.cache.compress(encoding, body)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    headers.add_vary_header("Accept-Encoding")
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                # The length of a streamed body isn't known upfront.
+                headers["Content-Encoding"] = encoding
+                del headers["Content-Length"]
+                headers.add_vary_header("Accept-Encoding")
+                await send(start_message)
+                compressor = COMPRESSORS[encoding]()
+
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": compressor.compress(body, final=not more_body),
+                    "more_body": more_body,
+                }
+            )
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class RequestContextMiddleware:
+    """An ASGI middleware binding the request ID, user, route and DB timing to the request's log records.
+
+    The request ID is taken from the ``X-Request-ID`` header set by the proxy, or generated, and
+    returned in the response. Every request is logged to the ``src.access`` logger once it's
+    finished. Successful requests are the bulk of the volume, so only the given fraction of
+    them is logged, unless they are slow; failed requests are always logged.
+    """
+
+    REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        access_log: bool = True,
+        sample_rate: float = 1.0,
+        slow_request_ms: float = 500,
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped ASGI application.
+            access_log (bool): Whether to log the finished requests.
+            sample_rate (float): The fraction of the fast successful requests to log.
+            slow_request_ms (float): The duration in milliseconds from which successful requests are always logged.
+        """
+        self.app = app
+        self.access_log = access_log
+        self.sample_rate = sample_rate
+        self.slow_request_ms = slow_request_ms
+
+    def _get_request_id(self, scope: Scope) -> str:
+        request_id = Headers(scope=scope).get("x-request-id")
+        # Don't let clients inject arbitrary content into the logs
+        if request_id and self.REQUEST_ID_PATTERN.fullmatch(request_id):
+            return request_id
+        return uuid.uuid4().hex
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._get_request_id(scope)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        with track_queries() as queries, bind_request_context(
+            RequestContext(request_id, scope, queries)
+        ):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if self.access_log:
+                    self._log(scope, status_code, time.perf_counter() - start)
+
+    def _log(self, scope: Scope, status_code: int, duration: float) -> None:
+        duration_ms = duration * 1000
+        sample_rate = 1.0
+        if status_code < 400 and duration_ms < self.slow_request_ms:
+            if random.random() >= self.sample_rate:
+                return
+            # Lets the aggregation weight the logged requests up to the real volume
+            sample_rate = self.sample_rate
+        access_logger.log(
+            logging.WARNING if status_code >= 500 else logging.INFO,
+            "%s %s %d %.2f ms",
+            scope["method"],
+            scope["path"],
+            status_code,
+            duration_ms,
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "duration_ms": round(duration_ms, 2),
+                "sample_rate": sample_rate,
+            },
+        )
+
+
+class TracingMiddleware:
+    """An ASGI middleware tracing the sampled requests, from the dependencies down to the queries.
+
+    The root span of a request is named after the method and the matched route, the spans of the
+    dependencies, services, repositories and SQL statements nest below it. What's left of the
+    root's time is the framework's: parsing the request and serializing the response.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped ASGI application.
+            tracer (Tracer): The tracer sampling and exporting the traces.
+        """
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        root = None
+        if scope["type"] == "http":
+            traceparent = Headers(scope=scope).get("traceparent")
+            root = self.tracer.start_trace(scope["method"], traceparent)
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with self.tracer.activate(root):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # The route is only known once the router has matched it
+                route = getattr(scope.get("route"), "path", None)
+                root.name = f"{scope['method']} {route or scope['path']}"
+                root.attributes.update(
+                    {
+                        "http.request.method": scope["method"],
+                        "http.route": route or "",
+                        "url.path": scope["path"],
+                        "http.response.status_code": status_code,
+                    }
+                )
+                if status_code >= 500:
+                    root.error = root.error or f"HTTP {status_code}"
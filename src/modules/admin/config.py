@@ -0,0 +1,11 @@
+from pydantic_settings import BaseSettings
+
+
+class AdminConfig(BaseSettings):
+    # The maximum duration of a profiling session in seconds.
+    PROFILE_MAX_SECONDS: float = 60
+    # The shortest sampling interval in milliseconds, shorter ones take too much of the GIL.
+    PROFILE_MIN_INTERVAL_MS: float = 1
+
+
+admin_config = AdminConfig()
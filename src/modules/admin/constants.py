@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class ProfileFormat(str, Enum):
+    """Enum class representing the formats a recorded profile can be returned in.
+
+    Attributes:
+        COLLAPSED (str): Collapsed stacks, one line per distinct stack, read by flame graph tools.
+        SPEEDSCOPE (str): The JSON file format of speedscope.
+    """
+
+    COLLAPSED = "collapsed"
+    SPEEDSCOPE = "speedscope"
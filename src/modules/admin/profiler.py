@@ -0,0 +1,179 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Optional
+
+from src.exceptions import Conflict
+
+# A frame of a sampled stack: the function, its file and its first line.
+Frame = tuple[str, str, int]
+# A sampled stack: the name of the thread and its frames from the outermost to the innermost.
+Stack = tuple[str, tuple[Frame, ...]]
+
+
+class Profile:
+    """The stacks sampled by a profiling session, aggregated by identical stacks.
+
+    Attributes:
+        samples (Counter[Stack]): The number of samples of every distinct stack.
+        interval (float): The sampling interval in seconds.
+        duration (float): The duration of the session in seconds.
+    """
+
+    def __init__(
+        self, samples: Counter[Stack], interval: float, duration: float
+    ) -> None:
+        self.samples = samples
+        self.interval = interval
+        self.duration = duration
+
+    def to_collapsed(self) -> str:
+        """Render the profile in the collapsed stack format of flame graph tools.
+
+        Returns:
+            str: One ``thread;outer;...;inner count`` line per distinct stack.
+        """
+        lines = []
+        for (thread, frames), count in self.samples.most_common():
+            names = [thread] + [
+                f"{name} ({file}:{line})" for name, file, line in frames
+            ]
+            lines.append(
+                f"{';'.join(name.replace(';', ':') for name in names)} {count}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self) -> dict[str, Any]:
+        """Render the profile in the file format of speedscope, one profile per thread.
+
+        Returns:
+            dict[str, Any]: The speedscope document.
+        """
+        frame_indexes: dict[Frame, int] = {}
+        profiles: dict[str, dict[str, Any]] = {}
+        for (thread, frames), count in self.samples.most_common():
+            profile = profiles.setdefault(
+                thread,
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": round(self.duration, 6),
+                    "samples": [],
+                    "weights": [],
+                },
+            )
+            profile["samples"].append(
+                [
+                    frame_indexes.setdefault(frame, len(frame_indexes))
+                    for frame in frames
+                ]
+            )
+            profile["weights"].append(round(count * self.interval, 6))
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"Worker {os.getpid()}",
+            "exporter": "weight-tracker",
+            "shared": {
+                "frames": [
+                    {"name": name, "file": file, "line": line}
+                    for name, file, line in frame_indexes
+                ]
+            },
+            "profiles": list(profiles.values()),
+        }
+
+
+class SamplingProfiler:
+    """A statistical profiler sampling the stacks of all threads of the worker.
+
+    A background thread takes a snapshot of the threads' current frames every interval while a
+    session runs. Nothing is hooked into the interpreter, so the profiler costs nothing while
+    inactive, and a session only costs the snapshots, bounded by the interval. Only one session
+    runs at a time in a worker.
+
+    Attributes:
+        max_depth (int): The maximum number of the innermost frames kept of a stack.
+    """
+
+    def __init__(self, max_depth: int = 128) -> None:
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._frames: dict[CodeType, Frame] = {}
+
+    @property
+    def running(self) -> bool:
+        """bool: Whether a session is running."""
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, interval: float) -> Profile:
+        """Sample the stacks of the worker's threads for a while.
+
+        The event loop keeps serving requests meanwhile, the sampling happens on another thread.
+
+        Args:
+            seconds (float): The duration of the session in seconds.
+            interval (float): The sampling interval in seconds.
+
+        Returns:
+            Profile: The sampled stacks.
+
+        Raises:
+            Conflict: If a session is already running in the worker.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise Conflict("A profile is already being recorded by this worker")
+        stopped = threading.Event()
+        samples: Counter[Stack] = Counter()
+        thread = threading.Thread(
+            target=self._sample,
+            args=(samples, interval, stopped),
+            name="SamplingProfiler",
+            daemon=True,
+        )
+        start = time.perf_counter()
+        try:
+            thread.start()
+            await asyncio.sleep(seconds)
+        finally:
+            # Stops the sampling also when the client disconnects and the request is cancelled
+            stopped.set()
+            # The sampler finishes its snapshot at the latest
+            thread.join()
+            self._frames.clear()
+            self._lock.release()
+        return Profile(samples, interval, time.perf_counter() - start)
+
+    def _sample(
+        self, samples: Counter[Stack], interval: float, stopped: threading.Event
+    ) -> None:
+        own_id = threading.get_ident()
+        while not stopped.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    stack = self._get_stack(frame)
+                    samples[(names.get(thread_id, str(thread_id)), stack)] += 1
+
+    def _get_stack(self, frame: Optional[FrameType]) -> tuple[Frame, ...]:
+        frames = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            key = self._frames.get(code)
+            if key is None:
+                # co_qualname includes the class, it's only available from Python 3.11
+                name = getattr(code, "co_qualname", code.co_name)
+                key = self._frames[code] = (name, code.co_filename, code.co_firstlineno)
+            frames.append(key)
+            frame = frame.f_back
+        frames.reverse()
+        return tuple(frames)
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from src.modules.admin.config import admin_config
+from src.modules.admin.constants import ProfileFormat
+from src.modules.admin.profiler import profiler
+from src.modules.auth.constants import UserRole
+from src.modules.auth.dependencies import access_token_validation
+from src.modules.auth.schemas import UserDetail
+
+router: APIRouter = APIRouter()
+
+
+@router.post(
+    "/profile",
+    summary="Profile the worker",
+    description=(
+        "Sample the stacks of all threads of the worker handling the request for a while and "
+        "return the profile as collapsed stacks or a speedscope document. Only one profile is "
+        "recorded per worker at a time. Requires the admin role."
+    ),
+    response_class=Response,
+    responses={
+        200: {"content": {"text/plain": {}, "application/json": {}}},
+        409: {"description": "A profile is already being recorded by the worker"},
+    },
+)
+async def profile_worker(
+    seconds: float = Query(5, gt=0, le=admin_config.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(10, ge=admin_config.PROFILE_MIN_INTERVAL_MS, le=1000),
+    format: ProfileFormat = ProfileFormat.COLLAPSED,
+    _: UserDetail = Depends(access_token_validation(required_roles=[UserRole.ADMIN])),
+) -> Response:
+    """Record a statistical profile of the current worker.
+
+    Args:
+        seconds (float): The duration of the profile in seconds.
+        interval_ms (float): The sampling interval in milliseconds.
+        format (ProfileFormat): The format of the returned profile.
+        _ (UserDetail): The authenticated admin requesting the profile.
+
+    Returns:
+        Response: The profile in the requested format.
+
+    Raises:
+        Conflict: If a profile is already being recorded by the worker.
+    """
+    profile = await profiler.profile(seconds, interval_ms / 1000)
+    if format == ProfileFormat.SPEEDSCOPE:
+        return JSONResponse(profile.to_speedscope())
+    return PlainTextResponse(profile.to_collapsed())
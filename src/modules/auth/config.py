@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -7,6 +8,18 @@ class AuthConfig(BaseSettings):
     JWT_ALGORITHM: str
     JWT_ACCESS_SECRET: str
     JWT_REFRESH_SECRET: str
+    JWT_KEYS_DIR: Optional[str] = None
+    JWT_ACTIVE_KID: Optional[str] = None
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 10
+    REVOCATION_SYNC_INTERVAL: int = 5
+    SIGN_IN_RATE_LIMIT_ENABLED: bool = True
+    SIGN_IN_IP_LIMIT: int = 20
+    SIGN_IN_IP_PERIOD: int = 60
+    SIGN_IN_EMAIL_LIMIT: int = 5
+    SIGN_IN_EMAIL_PERIOD: int = 300
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    ROLE_REGISTRY_REFRESH_INTERVAL: int = 300
 
 
 auth_config = AuthConfig()
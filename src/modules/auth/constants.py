@@ -6,6 +6,34 @@ class UserRole(str, Enum):
 
     Attributes:
         USER (str): The standard user role.
+        COACH (str): A role allowed to view weight summaries of other users.
+        ADMIN (str): A role allowed to operate the service, e.g. to profile its workers.
     """
 
     USER = "user"
+    COACH = "coach"
+    ADMIN = "admin"
+
+
+class TokenType(str, Enum):
+    """Enum class representing the types of issued JWT tokens.
+
+    Attributes:
+        ACCESS (str): A short-lived token authenticating requests.
+        REFRESH (str): A long-lived token exchanged for new access tokens.
+    """
+
+    ACCESS = "access"
+    REFRESH = "refresh"
+
+
+class WeightUnit(str, Enum):
+    """Enum class representing the units a user can prefer for displaying weights.
+
+    Attributes:
+        KG (str): Kilograms, the unit the weights are stored in.
+        LB (str): Pounds.
+    """
+
+    KG = "kg"
+    LB = "lb"
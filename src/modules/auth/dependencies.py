@@ -1,10 +1,11 @@
 from fastapi import Depends
 from src.modules.auth.schemas import UserDetail
-from src.modules.auth.constants import UserRole
-from src.modules.auth.config import auth_config
-from src.utils.jwt_utils import jwt_cookie_security, decode_token
+from src.modules.auth.constants import TokenType, UserRole
+from src.utils.jwt_utils import jwt_cookie_security, decode_token, is_token_revoked
 from src.modules.auth.service import service as auth_service
 from src.exceptions import NotAuthenticated, PermissionDenied
+from src.utils.log_utils import get_request_context
+from src.utils.trace_utils import span
 
 
 def access_token_validation(
@@ -42,16 +43,19 @@ def access_token_validation(
             NotAuthenticated: If the token is invalid or expired.
             PermissionDenied: If the user's roles don't meet the required criteria.
         """
-        # Decode the access token to get the user ID.
-        payload = decode_token(
-            token, auth_config.JWT_ACCESS_SECRET, auth_config.JWT_ALGORITHM
-        )
-        if not payload:
-            raise NotAuthenticated("Invalid or expired access token")
+        with span("auth.validate_token"):
+            # Decode the access token to get the user ID.
+            payload = decode_token(token, TokenType.ACCESS)
+            if not payload or is_token_revoked(payload):
+                raise NotAuthenticated("Invalid or expired access token")
 
-        user_id = payload.get("sub")
-        # Retrieve the user's details from the service using the decoded user ID.
-        user = await auth_service.get_user(int(user_id))
+            user_id = payload.get("sub")
+            # Retrieve the user's details from the service using the decoded user ID.
+            user = await auth_service.get_user(int(user_id))
+            # Attribute the request's log records to the user
+            context = get_request_context()
+            if context:
+                context.user_id = user.id
 
         # If any of the roles in `any_role` are present in the user's roles, pass validation.
         if any_role and any(role in user.roles for role in any_role):
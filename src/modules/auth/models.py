@@ -1,8 +1,8 @@
-import bcrypt
-
+import datetime
 from src.utils.db_utils import Base
+from src.modules.auth.constants import WeightUnit
 from typing import List
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 
@@ -40,6 +40,8 @@ class User(Base):
         full_name (Mapped[str]): The user's full name.
         email (Mapped[str]): The user's unique email address.
         hashed_password (Mapped[bytes]): The user's hashed password.
+        timezone (Mapped[str]): The IANA name of the user's timezone, defining the user's days.
+        weight_unit (Mapped[str]): The unit the user prefers for displaying weights.
         roles (Mapped[List[Role]]): A list of roles associated with the user, using a many-to-many relationship.
     """
 
@@ -48,6 +50,10 @@ class User(Base):
     full_name: Mapped[str] = mapped_column(nullable=False)
     email: Mapped[str] = mapped_column(nullable=False, unique=True)
     hashed_password: Mapped[bytes] = mapped_column(nullable=True)
+    timezone: Mapped[str] = mapped_column(nullable=False, default="UTC")
+    weight_unit: Mapped[str] = mapped_column(
+        nullable=False, default=WeightUnit.KG.value
+    )
     roles: Mapped[List[Role]] = relationship(
         secondary=UserRole.__tablename__, lazy="joined"
     )
@@ -62,6 +68,9 @@ class User(Base):
         Returns:
             str: The hashed password in bytes.
         """
+        # Imported lazily, only the sign-up and sign-in routes need bcrypt.
+        import bcrypt
+
         return bcrypt.hashpw(password.encode(), bcrypt.gensalt())
 
     def validate_password(self, password: str) -> bool:
@@ -73,4 +82,24 @@ class User(Base):
         Returns:
             bool: True if the password matches, False otherwise.
         """
+        import bcrypt
+
         return bcrypt.checkpw(password.encode(), self.hashed_password)
+
+
+class RevokedToken(Base):
+    """Represents a revoked JWT, identified by its ``jti`` claim, or a revoked family of refresh tokens.
+
+    Attributes:
+        jti (Mapped[str]): The unique identifier of the revoked token, or of the token family.
+        revoked_at (Mapped[datetime.datetime]): The time from which the token is rejected.
+        expires_at (Mapped[datetime.datetime]): The expiration of the token, after which the record can be removed.
+        reused (Mapped[bool]): Whether the revoked refresh token was exchanged once more within its grace period.
+    """
+
+    __tablename__ = "revoked_token"
+    __table_args__ = (Index("ix_revoked_token_created_at", "created_at"),)
+    jti: Mapped[str] = mapped_column(primary_key=True)
+    revoked_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    expires_at: Mapped[datetime.datetime] = mapped_column(nullable=False, index=True)
+    reused: Mapped[bool] = mapped_column(nullable=False, default=False)
@@ -1,10 +1,258 @@
-from typing import List, Optional
-from sqlalchemy import select
+import asyncio
+import datetime
+import logging
+from enum import Enum
+from typing import Any, List, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 from src.utils.db_utils import async_session
-from src.modules.auth.constants import UserRole
-from src.modules.auth.models import Role, User
+from src.utils.trace_utils import traced_methods
+from src.modules.auth.constants import UserRole, WeightUnit
+from src.modules.auth.models import (
+    RevokedToken,
+    Role,
+    User,
+    UserRole as UserRoleModel,
+)
 
+logger = logging.getLogger(__name__)
 
+
+class RoleRegistry:
+    """
+    A process-wide cache mapping role names to their ids.
+
+    The roles are static fixtures, so they are loaded once on startup and refreshed periodically
+    in the background instead of being queried on every sign-up.
+    """
+
+    def __init__(self) -> None:
+        self._role_ids: dict[str, int] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def load(self) -> None:
+        """
+        Load all roles from the database, replacing the cached mapping.
+        """
+        async with async_session() as session:
+            result = await session.execute(select(Role.name, Role.id))
+            self._role_ids = dict(result.all())
+
+    async def get_role_ids(self, roles: List[UserRole]) -> List[int]:
+        """
+        Resolve user roles to their ids without querying the database.
+
+        Args:
+            roles: The user roles to resolve.
+
+        Returns:
+            The ids of the roles. Like a lookup by name, roles missing in the database are skipped.
+        """
+        # Reload once if a role is unknown, e.g. the cache is empty or a role was added after startup.
+        if any(role.value not in self._role_ids for role in roles):
+            await self.load()
+        return [
+            self._role_ids[role.value] for role in roles if role.value in self._role_ids
+        ]
+
+    async def start(self, refresh_interval: int) -> None:
+        """
+        Load the roles and start refreshing them periodically in the background.
+
+        Args:
+            refresh_interval: The refresh interval in seconds, ``0`` disables the refresh.
+        """
+        await self.load()
+        if refresh_interval > 0:
+            self._refresh_task = asyncio.create_task(self._refresh(refresh_interval))
+
+    async def stop(self) -> None:
+        """
+        Stop the background refresh.
+        """
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh(self, interval: int) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception:
+                # Keep serving the previously loaded roles, they rarely change.
+                logger.exception("Failed to refresh the role registry")
+
+
+class TokenRevocationStore:
+    """
+    A store of revoked token ids, persisted in the database and mirrored in memory.
+
+    Checking a token against the in-memory mirror costs no database round trip. Every worker
+    pulls the revocations made by other workers in the background, so a revocation made
+    elsewhere takes effect within the synchronization interval. Entries are dropped once the
+    revoked token expires, which keeps the mirror as small as the set of live revoked tokens.
+    """
+
+    # Overlap of consecutive synchronizations, covering transactions committed out of order.
+    SYNC_OVERLAP = datetime.timedelta(seconds=5)
+
+    def __init__(self) -> None:
+        # Maps a revoked jti to the time it is rejected from and its expiration.
+        self._revoked: dict[str, tuple[datetime.datetime, datetime.datetime]] = {}
+        self._synced_until: Optional[datetime.datetime] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """
+        Check whether a token is revoked, using the in-memory mirror only.
+
+        Args:
+            jti: The unique identifier of the token, tokens without one can't be revoked.
+
+        Returns:
+            ``True`` if the token is revoked, ``False`` otherwise.
+        """
+        entry = self._revoked.get(jti) if jti else None
+        return bool(entry) and entry[0] <= datetime.datetime.now()
+
+    async def is_revoked_in_db(self, jti: str) -> bool:
+        """
+        Check whether a token is revoked against the database, including revocations of other workers.
+
+        Args:
+            jti: The unique identifier of the token.
+
+        Returns:
+            ``True`` if the token is revoked, ``False`` otherwise.
+        """
+        if self.is_revoked(jti):
+            return True
+        async with async_session() as session:
+            revoked_at = await session.scalar(
+                select(RevokedToken.revoked_at).where(RevokedToken.jti == jti)
+            )
+        return revoked_at is not None and revoked_at <= datetime.datetime.now()
+
+    async def revoke(
+        self, jti: str, expires_at: datetime.datetime, grace_seconds: int = 0
+    ) -> bool:
+        """
+        Revoke a token.
+
+        Args:
+            jti: The unique identifier of the token.
+            expires_at: The expiration of the token.
+            grace_seconds: The time the token stays valid after the revocation.
+
+        Returns:
+            ``True`` if the token was revoked by this call, ``False`` if it was revoked already.
+        """
+        revoked_at = datetime.datetime.now() + datetime.timedelta(seconds=grace_seconds)
+        try:
+            async with async_session() as session:
+                session.add(
+                    RevokedToken(jti=jti, revoked_at=revoked_at, expires_at=expires_at)
+                )
+                await session.commit()
+        except IntegrityError:
+            # The token was already revoked, e.g. rotated concurrently by another request or worker.
+            return False
+        self._revoked[jti] = (revoked_at, expires_at)
+        return True
+
+    async def register_reuse(self, jti: str) -> bool:
+        """
+        Register a use of a revoked token within its grace period, allowed only once.
+
+        The row is updated conditionally, so concurrent requests of all workers can't both succeed.
+
+        Args:
+            jti: The unique identifier of the token.
+
+        Returns:
+            ``True`` if the token is within its grace period and wasn't reused yet, ``False`` otherwise.
+        """
+        async with async_session() as session:
+            result = await session.execute(
+                update(RevokedToken)
+                .where(
+                    RevokedToken.jti == jti,
+                    RevokedToken.revoked_at > datetime.datetime.now(),
+                    RevokedToken.reused.is_(False),
+                )
+                .values(reused=True)
+            )
+            await session.commit()
+        return result.rowcount == 1
+
+    async def sync(self) -> None:
+        """
+        Pull the revocations made since the last synchronization and drop expired entries.
+        """
+        now = datetime.datetime.now()
+        query = select(
+            RevokedToken.jti, RevokedToken.revoked_at, RevokedToken.expires_at
+        )
+        if self._synced_until:
+            query = query.where(
+                RevokedToken.created_at >= self._synced_until - self.SYNC_OVERLAP
+            )
+        else:
+            query = query.where(RevokedToken.expires_at > now)
+
+        async with async_session() as session:
+            result = await session.execute(query)
+            for jti, revoked_at, expires_at in result.all():
+                self._revoked[jti] = (revoked_at, expires_at)
+        self._synced_until = now
+
+        self._revoked = {
+            jti: entry for jti, entry in self._revoked.items() if entry[1] > now
+        }
+
+    async def purge_expired(self) -> None:
+        """
+        Delete the records of expired revoked tokens from the database.
+        """
+        async with async_session() as session:
+            await session.execute(
+                delete(RevokedToken).where(
+                    RevokedToken.expires_at <= datetime.datetime.now()
+                )
+            )
+            await session.commit()
+
+    async def start(self, sync_interval: int) -> None:
+        """
+        Load the live revocations and start synchronizing them periodically in the background.
+
+        Args:
+            sync_interval: The synchronization interval in seconds.
+        """
+        await self.purge_expired()
+        await self.sync()
+        self._sync_task = asyncio.create_task(self._synchronize(sync_interval))
+
+    async def stop(self) -> None:
+        """
+        Stop the background synchronization.
+        """
+        if self._sync_task:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+    async def _synchronize(self, interval: int) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Failed to synchronize revoked tokens")
+
+
+@traced_methods
 class AuthRepository:
     """
     A repository class that provides data access methods for user and role management.
@@ -64,6 +312,8 @@ class AuthRepository:
         email: str,
         password: str,
         roles: List[UserRole] = [UserRole.USER],
+        timezone: str = "UTC",
+        weight_unit: WeightUnit = WeightUnit.KG,
     ) -> User:
         """
         Create a new user with the specified information.
@@ -73,14 +323,16 @@ class AuthRepository:
             email: The email address of the new user.
             password: The plaintext password for the new user.
             roles: A list of user roles to assign to the new user. Defaults to standard user role.
+            timezone: The IANA name of the new user's timezone. Defaults to UTC.
+            weight_unit: The unit the new user prefers for displaying weights. Defaults to kilograms.
 
         Returns:
             The newly created user object.
         """
-        # Retrieve the Role objects that correspond to the specified `UserRole` enum values.
-        user_roles = await self.get_roles_by_names([role.value for role in roles])
-        # Hash the plaintext password using the User model's password hashing method.
-        hashed_password = User.hash_password(password)
+        # Resolve the role ids of the specified `UserRole` enum values from the in-memory registry.
+        role_ids = await role_registry.get_role_ids(roles)
+        # Hash the plaintext password using the User model's password hashing method, off the event loop.
+        hashed_password = await run_in_threadpool(User.hash_password, password)
 
         # Create a new user instance and commit the transaction to the database.
         async with async_session() as session:
@@ -88,13 +340,50 @@ class AuthRepository:
                 full_name=full_name,
                 email=email,
                 hashed_password=hashed_password,
-                roles=user_roles,
+                timezone=timezone,
+                weight_unit=weight_unit.value,
             )
             session.add(new_user)
+            # Flush to get the user's id and insert the role assignments directly by role id.
+            await session.flush()
+            session.add_all(
+                [
+                    UserRoleModel(user_id=new_user.id, role_id=role_id)
+                    for role_id in role_ids
+                ]
+            )
             # Commit the new user to the database and refresh it to get the updated state.
             await session.commit()
             await session.refresh(new_user)
             return new_user
 
+    async def update_user(self, user_id: int, **values: Any) -> Optional[User]:
+        """
+        Update the given columns of a user.
+
+        Args:
+            user_id: The unique identifier of the user to update.
+            values: The new values of the user's columns.
+
+        Returns:
+            The updated user object, or ``None`` if not found.
+        """
+        # Enum values are stored as their plain string values.
+        values = {
+            key: value.value if isinstance(value, Enum) else value
+            for key, value in values.items()
+        }
+        async with async_session() as session:
+            if values:
+                await session.execute(
+                    update(User).where(User.id == user_id).values(**values)
+                )
+                await session.commit()
+            # Reload the user together with the roles.
+            result = await session.execute(select(User).where(User.id == user_id))
+            return result.scalars().first()
+
 
+role_registry = RoleRegistry()
+revocation_store = TokenRevocationStore()
 repository = AuthRepository()
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Response, status, Depends
-from src.modules.auth.config import auth_config
+from fastapi import APIRouter, Request, Response, status, Depends
+from src.utils.jwt_utils import get_key_set, set_token_cookies
+from src.modules.auth.constants import TokenType
 from src.modules.auth.schemas import (
     SignUp,
     SignIn,
     AuthTokens,
+    JSONWebKeySet,
     UserDetail,
+    UserPreferencesUpdate,
 )
 from src.modules.auth.service import service as auth_service
 from src.modules.auth.dependencies import access_token_validation
@@ -29,43 +32,52 @@ async def get_me(user: UserDetail = Depends(access_token_validation())) -> UserD
     return user
 
 
+@router.patch(
+    "/me",
+    summary="Update the authenticated user's preferences",
+    description="Update the timezone or the preferred weight unit of the authenticated user.",
+)
+async def update_me(
+    body: UserPreferencesUpdate,
+    user: UserDetail = Depends(access_token_validation()),
+) -> UserDetail:
+    """Update the preferences of the authenticated user.
+
+    Args:
+        body (UserPreferencesUpdate): The changed preferences.
+        user (UserDetail): The authenticated user's information.
+
+    Returns:
+        UserDetail: The authenticated user's updated information.
+    """
+    return await auth_service.update_user_preferences(user.id, body)
+
+
 @router.post(
     "/sign-in",
     summary="Sign in the user",
     description="Sign in the user with the provided email and password.",
 )
-async def sign_in(body: SignIn, response: Response) -> AuthTokens:
+async def sign_in(body: SignIn, request: Request, response: Response) -> AuthTokens:
     """Sign in the user with the provided email and password.
 
     Args:
         body (SignIn): The sign-in request containing the user's email, password, and an optional "remember_me" flag.
+        request (Request): The HTTP request object, used to rate limit sign-in attempts per client IP.
         response (Response): The HTTP response object to set authentication cookies.
 
     Returns:
         AuthTokens: The generated access and refresh tokens for the authenticated user.
     """
     # Generate the access and refresh tokens.
-    tokens = await auth_service.generate_tokens(body.email, body.password)
-    access_token_age = None
-    refresh_token_age = None
-
-    # Set the token age based on the "remember_me" flag.
-    if body.remember_me:
-        access_token_age = 60 * auth_config.ACCESS_TOKEN_EXPIRE_MINUTES
-        refresh_token_age = 60 * auth_config.REFRESH_TOKEN_EXPIRE_MINUTES
+    client_ip = request.client.host if request.client else None
+    tokens = await auth_service.generate_tokens(
+        body.email, body.password, client_ip, body.remember_me
+    )
 
     # Set the authentication cookies.
-    response.set_cookie(
-        key="access_token",
-        value=tokens.access_token,
-        max_age=access_token_age,
-        httponly=True,
-    )
-    response.set_cookie(
-        key="refresh_token",
-        value=tokens.refresh_token,
-        max_age=refresh_token_age,
-        httponly=True,
+    set_token_cookies(
+        response, tokens.access_token, tokens.refresh_token, body.remember_me
     )
     return tokens
 
@@ -91,16 +103,39 @@ async def sign_up(body: SignUp) -> UserDetail:
     "/sign-out",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Sign out the user",
-    description="Sign out the user by deleting authentication cookies.",
+    description="Sign out the user by revoking the tokens and deleting authentication cookies.",
 )
-async def sign_out(response: Response) -> None:
-    """Sign out the user by deleting authentication cookies.
+async def sign_out(request: Request, response: Response) -> None:
+    """Sign out the user by revoking the tokens and deleting authentication cookies.
 
     Args:
+        request (Request): The HTTP request object carrying the authentication cookies.
         response (Response): The HTTP response object to remove authentication cookies.
 
     Returns:
         None
     """
+    await auth_service.revoke_tokens(
+        request.cookies.get("access_token"), request.cookies.get("refresh_token")
+    )
     response.delete_cookie(key="access_token")
     response.delete_cookie(key="refresh_token")
+
+
+@router.get(
+    "/.well-known/jwks.json",
+    summary="Get the token verification keys",
+    description="Get the public keys verifying the issued tokens as a JSON Web Key Set. Empty for HMAC algorithms.",
+)
+async def get_jwks(response: Response) -> JSONWebKeySet:
+    """Get the public keys other services use to verify the issued tokens.
+
+    Args:
+        response (Response): The HTTP response object to set caching headers.
+
+    Returns:
+        JSONWebKeySet: The public verification keys.
+    """
+    # The key set only changes with a deployment, let verifiers cache it.
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return JSONWebKeySet(**get_key_set(TokenType.ACCESS).jwks)
@@ -1,6 +1,29 @@
+from typing import Any, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from src.modules.auth.constants import WeightUnit
 from src.modules.auth.models import User
 from src.schemas import CustomSchema
-from pydantic import Field
+from pydantic import Field, field_validator
+
+
+def validate_timezone(timezone: Optional[str]) -> Optional[str]:
+    """Validate that the value is a known IANA timezone name.
+
+    Args:
+        timezone (Optional[str]): The timezone name, e.g. ``"Europe/Prague"``.
+
+    Returns:
+        Optional[str]: The validated timezone name.
+
+    Raises:
+        ValueError: If the timezone is unknown.
+    """
+    if timezone is not None:
+        try:
+            ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone: {timezone}")
+    return timezone
 
 
 class SignIn(CustomSchema):
@@ -24,11 +47,31 @@ class SignUp(CustomSchema):
         full_name (str): The full name of the user.
         email (str): The user's email address.
         password (str): The user's password.
+        timezone (str): The IANA name of the user's timezone (default: UTC).
+        weight_unit (WeightUnit): The unit the user prefers for displaying weights (default: kg).
     """
 
     full_name: str = Field(..., description="Full name of the user")
     email: str = Field(..., description="Email of the user")
     password: str = Field(..., description="Password of the user")
+    timezone: str = Field("UTC", description="Timezone of the user")
+    weight_unit: WeightUnit = Field(WeightUnit.KG, description="Preferred weight unit")
+
+    _validate_timezone = field_validator("timezone")(validate_timezone)
+
+
+class UserPreferencesUpdate(CustomSchema):
+    """Schema for a partial update of the user's preferences.
+
+    Attributes:
+        timezone (Optional[str]): The IANA name of the user's timezone.
+        weight_unit (Optional[WeightUnit]): The unit the user prefers for displaying weights.
+    """
+
+    timezone: Optional[str] = Field(None, description="Timezone of the user")
+    weight_unit: Optional[WeightUnit] = Field(None, description="Preferred weight unit")
+
+    _validate_timezone = field_validator("timezone")(validate_timezone)
 
 
 class UserDetail(CustomSchema):
@@ -39,12 +82,16 @@ class UserDetail(CustomSchema):
         full_name (str): The user's full name.
         email (str): The user's email address.
         roles (list[str]): A list of role names associated with the user.
+        timezone (str): The IANA name of the user's timezone.
+        weight_unit (WeightUnit): The unit the user prefers for displaying weights.
     """
 
     id: int = Field(..., description="User ID")
     full_name: str = Field(..., description="Full name of the user")
     email: str = Field(..., description="Email of the user")
     roles: list[str] = Field(..., description="Roles of the user")
+    timezone: str = Field(..., description="Timezone of the user")
+    weight_unit: WeightUnit = Field(..., description="Preferred weight unit")
 
     @staticmethod
     def from_model(user: User) -> "UserDetail":
@@ -61,6 +108,8 @@ class UserDetail(CustomSchema):
             full_name=user.full_name,
             email=user.email,
             roles=[role.name for role in user.roles],
+            timezone=user.timezone,
+            weight_unit=user.weight_unit,
         )
 
 
@@ -74,3 +123,13 @@ class AuthTokens(CustomSchema):
 
     access_token: str = Field(..., description="Access token")
     refresh_token: str = Field(..., description="Refresh token")
+
+
+class JSONWebKeySet(CustomSchema):
+    """Schema representing the public keys verifying the issued tokens (JWKS).
+
+    Attributes:
+        keys (list[dict[str, Any]]): The public keys in the JSON Web Key format.
+    """
+
+    keys: list[dict[str, Any]] = Field(..., description="Public JSON Web Keys")
@@ -1,52 +1,178 @@
-from typing import List
-from src.utils.jwt_utils import create_token
-from src.exceptions import AlreadyExists, NotAuthenticated, NotFound
+import logging
+import math
+import uuid
+from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from src.utils.jwt_utils import create_token, decode_token, get_token_expiration
+from src.utils.rate_limit_utils import create_rate_limiter
+from src.utils.trace_utils import traced_methods
+from src.exceptions import AlreadyExists, NotAuthenticated, NotFound, TooManyRequests
 from src.modules.auth.config import auth_config
-from src.modules.auth.schemas import UserDetail, AuthTokens
-from src.modules.auth.constants import UserRole
-from src.modules.auth.repository import repository as auth_repository
+from src.modules.auth.schemas import UserDetail, UserPreferencesUpdate, AuthTokens
+from src.modules.auth.constants import TokenType, UserRole, WeightUnit
+from src.modules.auth.repository import (
+    repository as auth_repository,
+    revocation_store,
+)
 
+logger = logging.getLogger(__name__)
 
+# Limits sign-in attempts before any database or bcrypt work is done.
+sign_in_rate_limiter = create_rate_limiter(
+    auth_config.RATE_LIMIT_REDIS_URL, auth_config.RATE_LIMIT_MAX_KEYS
+)
+
+
+@traced_methods
 class AuthService:
     """A service class that handles user authentication, user retrieval, and account creation."""
 
-    async def generate_tokens(self, email: str, password: str) -> AuthTokens:
+    async def check_sign_in_rate_limit(
+        self, email: str, client_ip: Optional[str] = None
+    ) -> None:
+        """Register a sign-in attempt of the client IP and the email and reject it if either is limited.
+
+        The attempt takes its token from the email bucket before the password is checked, so
+        parallel attempts can't all pass the check before any of them fails. A successful attempt
+        gets the token back (see `refund_sign_in`), so knowing someone's email isn't enough to lock
+        them out of their account.
+
+        Args:
+            email (str): The email address used in the attempt.
+            client_ip (Optional[str]): The IP address of the client, if known.
+
+        Raises:
+            TooManyRequests: If the client IP or the email made too many attempts recently.
+        """
+        if not auth_config.SIGN_IN_RATE_LIMIT_ENABLED:
+            return
+
+        # The IP limit is checked first, so a blocked client doesn't reach the email check.
+        limits = []
+        if client_ip:
+            limits.append(
+                (
+                    "sign_in_ip",
+                    client_ip,
+                    auth_config.SIGN_IN_IP_LIMIT,
+                    auth_config.SIGN_IN_IP_PERIOD,
+                    1,
+                )
+            )
+        limits.append(
+            (
+                "sign_in_email",
+                email.strip().lower(),
+                auth_config.SIGN_IN_EMAIL_LIMIT,
+                auth_config.SIGN_IN_EMAIL_PERIOD,
+                1,
+            )
+        )
+
+        for name, key, capacity, period, cost in limits:
+            retry_after = await sign_in_rate_limiter.hit(
+                name, key, capacity, period, cost
+            )
+            if retry_after:
+                logger.warning(
+                    "Sign-in attempt blocked by %s limit (blocked so far: %d)",
+                    name,
+                    sign_in_rate_limiter.blocked[name],
+                )
+                raise TooManyRequests(
+                    "Too many sign-in attempts, try again later",
+                    retry_after=math.ceil(retry_after),
+                )
+
+    async def refund_sign_in(self, email: str) -> None:
+        """Give back the token a successful sign-in attempt took from the limit of the email.
+
+        Args:
+            email (str): The email address used in the attempt.
+        """
+        if auth_config.SIGN_IN_RATE_LIMIT_ENABLED:
+            await sign_in_rate_limiter.refund(
+                "sign_in_email",
+                email.strip().lower(),
+                auth_config.SIGN_IN_EMAIL_LIMIT,
+                auth_config.SIGN_IN_EMAIL_PERIOD,
+            )
+
+    async def generate_tokens(
+        self,
+        email: str,
+        password: str,
+        client_ip: Optional[str] = None,
+        remember_me: bool = False,
+    ) -> AuthTokens:
         """Generate access and refresh tokens for a user if the credentials are valid.
 
         Args:
             email (str): The email address of the user.
             password (str): The plaintext password of the user.
+            client_ip (Optional[str]): The IP address of the client, used for rate limiting.
+            remember_me (bool): Whether the session outlives the browser session, kept across token rotations.
 
         Returns:
             AuthTokens: An object containing the access and refresh tokens.
 
         Raises:
+            TooManyRequests: If the client or the email made too many sign-in attempts recently.
             NotAuthenticated: If the user does not exist or the password is incorrect.
         """
+        # Reject rate limited attempts before touching the database or bcrypt.
+        await self.check_sign_in_rate_limit(email, client_ip)
+
         # Retrieve user by email; validate that the user exists and their password is correct.
+        # bcrypt releases the GIL, so checking the password in a thread keeps the event loop responsive.
         user = await auth_repository.get_user_by_email(email)
-        if not (user and user.validate_password(password)):
+        if not (user and await run_in_threadpool(user.validate_password, password)):
             raise NotAuthenticated("Invalid email or password")
+        await self.refund_sign_in(email)
+
+        # The tokens start a new family, shared by all the tokens they are rotated to.
+        family = uuid.uuid4().hex
 
         # Generate an access token using the user's ID as the subject and configured expiration time.
         access_token = create_token(
-            data={"sub": user.id},
-            secret=auth_config.JWT_ACCESS_SECRET,
+            data={"sub": user.id, "fid": family},
             duration=auth_config.ACCESS_TOKEN_EXPIRE_MINUTES,
-            algorithm=auth_config.JWT_ALGORITHM,
+            token_type=TokenType.ACCESS,
         )
 
         # Generate a refresh token with a longer expiration time.
         refresh_token = create_token(
-            data={"sub": user.id},
-            secret=auth_config.JWT_REFRESH_SECRET,
+            data={"sub": user.id, "fid": family, "remember_me": remember_me},
             duration=auth_config.REFRESH_TOKEN_EXPIRE_MINUTES,
-            algorithm=auth_config.JWT_ALGORITHM,
+            token_type=TokenType.REFRESH,
         )
 
         # Return both tokens as an AuthTokens object.
         return AuthTokens(access_token=access_token, refresh_token=refresh_token)
 
+    async def revoke_tokens(
+        self, access_token: Optional[str], refresh_token: Optional[str]
+    ) -> None:
+        """Revoke the given access and refresh tokens, so they can't be used anymore.
+
+        Args:
+            access_token (Optional[str]): The access token to revoke, if any.
+            refresh_token (Optional[str]): The refresh token to revoke, if any.
+
+        Returns:
+            None
+        """
+        for token, token_type in (
+            (access_token, TokenType.ACCESS),
+            (refresh_token, TokenType.REFRESH),
+        ):
+            # Invalid or expired tokens are unusable already and need no revocation.
+            payload = decode_token(token, token_type) if token else None
+            if payload and payload.get("jti"):
+                await revocation_store.revoke(
+                    payload["jti"], get_token_expiration(payload)
+                )
+
     async def get_user(self, user_id: int) -> UserDetail:
         """Retrieve user details by user ID.
 
@@ -73,6 +199,8 @@ class AuthService:
         email: str,
         password: str,
         roles: List[UserRole] = [UserRole.USER],
+        timezone: str = "UTC",
+        weight_unit: WeightUnit = WeightUnit.KG,
     ) -> UserDetail:
         """Create a new user with the specified details.
 
@@ -81,6 +209,8 @@ class AuthService:
             email (str): The email address of the new user.
             password (str): The plaintext password for the new user.
             roles (List[UserRole]): A list of roles to assign to the user. Defaults to a standard user role.
+            timezone (str): The IANA name of the new user's timezone. Defaults to UTC.
+            weight_unit (WeightUnit): The unit the new user prefers for displaying weights. Defaults to kilograms.
 
         Returns:
             UserDetail: An object containing detailed information about the newly created user.
@@ -95,11 +225,38 @@ class AuthService:
 
         # Create the new user with the specified attributes in the database.
         created_user = await auth_repository.create_user(
-            full_name=full_name, email=email, password=password, roles=roles
+            full_name=full_name,
+            email=email,
+            password=password,
+            roles=roles,
+            timezone=timezone,
+            weight_unit=weight_unit,
         )
 
         # Convert the created user model to the UserDetail schema for the response.
         return UserDetail.from_model(created_user)
 
+    async def update_user_preferences(
+        self, user_id: int, preferences: UserPreferencesUpdate
+    ) -> UserDetail:
+        """Update the timezone or the preferred weight unit of a user.
+
+        Args:
+            user_id (int): The unique identifier of the user.
+            preferences (UserPreferencesUpdate): The changed preferences.
+
+        Returns:
+            UserDetail: An object containing detailed information about the updated user.
+
+        Raises:
+            NotFound: If the user with the given ID is not found.
+        """
+        user = await auth_repository.update_user(
+            user_id, **preferences.model_dump(exclude_none=True)
+        )
+        if not user:
+            raise NotFound("User not found")
+        return UserDetail.from_model(user)
+
 
 service = AuthService()
@@ -0,0 +1,4 @@
+# The progress percentages reported as milestones, in ascending order.
+MILESTONES = (25, 50, 75, 100)
+# Trends reaching the target later than this number of days are too flat to project a date.
+MAX_ETA_DAYS = 10 * 365
@@ -0,0 +1,55 @@
+import datetime
+from typing import Optional
+from src.utils.db_utils import Base
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class Goal(Base):
+    """Represents the weight goal of a user, with its progress maintained incrementally.
+
+    Besides the target, the record keeps the running sums of a least-squares fit of the weights
+    since the start, so each new measurement updates the trend, the progress and the ETA in
+    constant time instead of rescanning the history. The time axis of the fit is the number of
+    days since the start.
+
+    Attributes:
+        __tablename__ (str): Name of the SQL table that stores the goals.
+        user_id (Mapped[int]): The ID of the user, a user has at most one goal.
+        target_weight (Mapped[float]): The weight the user aims for.
+        target_date (Mapped[datetime.date]): The date by which the user aims to reach the target.
+        start_weight (Mapped[float]): The weight when the goal was set.
+        start_date (Mapped[datetime.datetime]): The date of the measurement the goal starts from.
+        latest_weight (Mapped[float]): The weight of the latest measurement since the start.
+        latest_date (Mapped[datetime.datetime]): The date of the latest measurement since the start.
+        samples (Mapped[int]): The number of measurements since the start.
+        sum_t (Mapped[float]): The sum of the measurement times.
+        sum_w (Mapped[float]): The sum of the weights.
+        sum_tt (Mapped[float]): The sum of the squared measurement times.
+        sum_tw (Mapped[float]): The sum of the products of the measurement times and weights.
+        progress (Mapped[float]): The share of the way to the target covered so far, in percent.
+        eta (Mapped[Optional[datetime.date]]): The projected date of reaching the target, if the trend leads there.
+        milestone (Mapped[int]): The highest progress milestone reached, in percent.
+        milestone_reached_at (Mapped[Optional[datetime.datetime]]): The date of the measurement reaching the milestone.
+    """
+
+    __tablename__ = "goal"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), primary_key=True)
+    target_weight: Mapped[float] = mapped_column(nullable=False)
+    target_date: Mapped[datetime.date] = mapped_column(nullable=False)
+    start_weight: Mapped[float] = mapped_column(nullable=False)
+    start_date: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    latest_weight: Mapped[float] = mapped_column(nullable=False)
+    latest_date: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    samples: Mapped[int] = mapped_column(nullable=False, default=0)
+    sum_t: Mapped[float] = mapped_column(nullable=False, default=0)
+    sum_w: Mapped[float] = mapped_column(nullable=False, default=0)
+    sum_tt: Mapped[float] = mapped_column(nullable=False, default=0)
+    sum_tw: Mapped[float] = mapped_column(nullable=False, default=0)
+    progress: Mapped[float] = mapped_column(nullable=False, default=0)
+    eta: Mapped[Optional[datetime.date]] = mapped_column(nullable=True)
+    milestone: Mapped[int] = mapped_column(nullable=False, default=0)
+    milestone_reached_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        nullable=True
+    )
@@ -0,0 +1,71 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from sqlalchemy import delete
+from src.modules.goals.models import Goal
+from src.utils.db_utils import async_session
+from src.utils.trace_utils import traced_methods
+
+
+@traced_methods
+class GoalRepository:
+    async def get_goal(self, user_id: int) -> Optional[Goal]:
+        """Retrieve the goal of a user by its primary key.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            Optional[Goal]: The goal, or None if the user has no goal.
+        """
+        async with async_session() as session:
+            return await session.get(Goal, user_id)
+
+    async def save_goal(self, goal: Goal) -> Goal:
+        """Save the goal of a user, replacing the previous one.
+
+        Args:
+            goal (Goal): The new goal.
+
+        Returns:
+            Goal: The saved goal record.
+        """
+        async with async_session() as session:
+            goal = await session.merge(goal)
+            await session.commit()
+            return goal
+
+    async def delete_goal(self, user_id: int) -> bool:
+        """Delete the goal of a user.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            bool: True if the goal was deleted, False if the user has no goal.
+        """
+        async with async_session() as session:
+            result = await session.execute(delete(Goal).where(Goal.user_id == user_id))
+            await session.commit()
+            return result.rowcount > 0
+
+    @asynccontextmanager
+    async def lock_goal(self, user_id: int) -> AsyncIterator[Optional[Goal]]:
+        """Lock the goal of a user for an update, committing the changes made within the context.
+
+        Concurrent updates of the goal, e.g. measurements saved by two devices at once, are
+        serialized by the row lock, so none of them is lost.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            AsyncIterator[Optional[Goal]]: The locked goal, or None if the user has no goal.
+        """
+        async with async_session() as session:
+            goal = await session.get(Goal, user_id, with_for_update=True)
+            yield goal
+            if goal:
+                await session.commit()
+
+
+repository = GoalRepository()
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, status
+from src.modules.auth.schemas import UserDetail
+from src.modules.auth.dependencies import access_token_validation
+from src.modules.goals.schemas import GoalStatus, GoalUpdate
+from src.modules.goals.service import service as goal_service
+
+router: APIRouter = APIRouter()
+
+
+@router.get(
+    "/",
+    summary="Get the goal",
+    description="Get the weight goal of the authenticated user with the progress, the ETA and the reached milestone.",
+)
+async def get_goal(
+    user: UserDetail = Depends(access_token_validation()),
+) -> GoalStatus:
+    """Retrieve the goal of the authenticated user.
+
+    Args:
+        user (UserDetail): The authenticated user requesting their goal.
+
+    Returns:
+        GoalStatus: A response containing the goal and the progress towards it.
+    """
+    return await goal_service.get_goal(user.id)
+
+
+@router.put(
+    "/",
+    summary="Set the goal",
+    description="Set the weight goal of the authenticated user, starting from their latest weight measurement.",
+)
+async def set_goal(
+    goal: GoalUpdate,
+    user: UserDetail = Depends(access_token_validation()),
+) -> GoalStatus:
+    """Set the goal of the authenticated user, replacing the previous one.
+
+    Args:
+        goal (GoalUpdate): The target weight and date.
+        user (UserDetail): The authenticated user setting their goal.
+
+    Returns:
+        GoalStatus: A response containing the new goal and the progress towards it.
+    """
+    return await goal_service.set_goal(user.id, goal)
+
+
+@router.delete(
+    "/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete the goal",
+    description="Delete the weight goal of the authenticated user.",
+)
+async def delete_goal(
+    user: UserDetail = Depends(access_token_validation()),
+) -> None:
+    """Delete the goal of the authenticated user.
+
+    Args:
+        user (UserDetail): The authenticated user deleting their goal.
+
+    Returns:
+        None
+    """
+    await goal_service.delete_goal(user.id)
@@ -0,0 +1,69 @@
+import datetime
+from typing import Optional
+from pydantic import Field
+from src.modules.goals.models import Goal
+from src.schemas import CustomSchema
+
+
+class GoalUpdate(CustomSchema):
+    """Schema representing a new weight goal.
+
+    Attributes:
+        target_weight (float): The weight the user aims for.
+        target_date (datetime.date): The date by which the user aims to reach the target.
+    """
+
+    target_weight: float = Field(..., gt=0)
+    target_date: datetime.date
+
+
+class GoalStatus(CustomSchema):
+    """Schema representing a weight goal and the progress towards it.
+
+    Attributes:
+        target_weight (float): The weight the user aims for.
+        target_date (datetime.date): The date by which the user aims to reach the target.
+        start_weight (float): The weight when the goal was set.
+        start_date (datetime.datetime): The date of the measurement the goal starts from.
+        latest_weight (float): The latest weight since the start.
+        progress (float): The share of the way to the target covered so far, in percent.
+        eta (Optional[datetime.date]): The projected date of reaching the target, if the trend leads there.
+        on_track (bool): Whether the target is reached or projected to be reached by the target date.
+        milestone (int): The highest progress milestone reached, in percent.
+        milestone_reached_at (Optional[datetime.datetime]): The date the milestone was reached.
+    """
+
+    target_weight: float
+    target_date: datetime.date
+    start_weight: float
+    start_date: datetime.datetime
+    latest_weight: float
+    progress: float
+    eta: Optional[datetime.date] = None
+    on_track: bool
+    milestone: int
+    milestone_reached_at: Optional[datetime.datetime] = None
+
+    @staticmethod
+    def from_model(goal: Goal) -> "GoalStatus":
+        """Convert a goal model instance into its status representation.
+
+        Args:
+            goal (Goal): The goal model instance.
+
+        Returns:
+            GoalStatus: The status of the goal.
+        """
+        return GoalStatus(
+            target_weight=goal.target_weight,
+            target_date=goal.target_date,
+            start_weight=goal.start_weight,
+            start_date=goal.start_date,
+            latest_weight=goal.latest_weight,
+            progress=goal.progress,
+            eta=goal.eta,
+            on_track=goal.progress >= 100
+            or (goal.eta is not None and goal.eta <= goal.target_date),
+            milestone=goal.milestone,
+            milestone_reached_at=goal.milestone_reached_at,
+        )
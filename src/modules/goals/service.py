@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta
+from typing import Sequence
+from src.exceptions import BadRequest, NotFound
+from src.modules.goals.constants import MAX_ETA_DAYS, MILESTONES
+from src.modules.goals.models import Goal
+from src.modules.goals.repository import repository as goal_repository
+from src.modules.goals.schemas import GoalStatus, GoalUpdate
+from src.modules.weight.repository import repository as weight_repository
+from src.utils.trace_utils import traced_methods
+
+
+def add_sample(goal: Goal, date: datetime, weight: float) -> None:
+    """Add a measurement to the trend of a goal and update the progress.
+
+    Args:
+        goal (Goal): The updated goal.
+        date (datetime): The date of the measurement, not before the start of the goal.
+        weight (float): The measured weight.
+
+    Returns:
+        None
+    """
+    t = (date - goal.start_date).total_seconds() / 86400
+    goal.samples += 1
+    goal.sum_t += t
+    goal.sum_w += weight
+    goal.sum_tt += t * t
+    goal.sum_tw += t * weight
+
+    # Measurements backfilled out of order only refine the trend
+    if date >= goal.latest_date:
+        goal.latest_date = date
+        goal.latest_weight = weight
+    update_progress(goal)
+
+
+def update_progress(goal: Goal) -> None:
+    """Update the progress, the reached milestone and the ETA of a goal from its latest weight and trend.
+
+    Args:
+        goal (Goal): The updated goal.
+
+    Returns:
+        None
+    """
+    distance = goal.start_weight - goal.target_weight
+    covered = goal.start_weight - goal.latest_weight
+    progress = 100.0 if distance == 0 else covered / distance * 100
+    goal.progress = round(min(max(progress, 0.0), 100.0), 1)
+
+    milestone = max((m for m in MILESTONES if goal.progress >= m), default=0)
+    if milestone > goal.milestone:
+        goal.milestone = milestone
+        goal.milestone_reached_at = goal.latest_date
+
+    goal.eta = None
+    if goal.progress >= 100:
+        return
+    # Least-squares fit of the weights since the start, weight = intercept + slope * days
+    denominator = goal.samples * goal.sum_tt - goal.sum_t**2
+    if goal.samples < 2 or denominator <= 0:
+        return
+    slope = (goal.samples * goal.sum_tw - goal.sum_t * goal.sum_w) / denominator
+    # The trend has to head towards the target
+    if slope == 0 or (slope > 0) != (goal.target_weight > goal.latest_weight):
+        return
+    intercept = (goal.sum_w - slope * goal.sum_t) / goal.samples
+    days = (goal.target_weight - intercept) / slope
+    if days > MAX_ETA_DAYS:
+        return
+    eta = goal.start_date + timedelta(days=max(days, 0))
+    goal.eta = max(eta, goal.latest_date).date()
+
+
+@traced_methods
+class GoalService:
+    async def get_goal(self, user_id: int) -> GoalStatus:
+        """Retrieve the goal of a user with its precomputed progress.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            GoalStatus: The goal and the progress towards it.
+
+        Raises:
+            NotFound: If the user has no goal.
+        """
+        # The progress is maintained on every measurement, so reading it is a primary key lookup
+        goal = await goal_repository.get_goal(user_id)
+        if not goal:
+            raise NotFound("Goal not found")
+        return GoalStatus.from_model(goal)
+
+    async def set_goal(self, user_id: int, data: GoalUpdate) -> GoalStatus:
+        """Set the goal of a user, starting from the user's latest weight measurement.
+
+        Args:
+            user_id (int): The unique ID of the user.
+            data (GoalUpdate): The target of the goal.
+
+        Returns:
+            GoalStatus: The new goal and the progress towards it.
+
+        Raises:
+            BadRequest: If the user has no weight measurement to start from.
+        """
+        latest = await weight_repository.get_latest_weight_measurement(user_id)
+        if not latest:
+            raise BadRequest("Record a weight measurement before setting a goal")
+
+        goal = Goal(
+            user_id=user_id,
+            target_weight=data.target_weight,
+            target_date=data.target_date,
+            start_weight=latest.weight,
+            start_date=latest.date,
+            latest_weight=latest.weight,
+            latest_date=latest.date,
+            samples=0,
+            sum_t=0.0,
+            sum_w=0.0,
+            sum_tt=0.0,
+            sum_tw=0.0,
+            milestone=0,
+            milestone_reached_at=None,
+        )
+        add_sample(goal, latest.date, latest.weight)
+        goal = await goal_repository.save_goal(goal)
+        return GoalStatus.from_model(goal)
+
+    async def delete_goal(self, user_id: int) -> None:
+        """Delete the goal of a user.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            None
+
+        Raises:
+            NotFound: If the user has no goal.
+        """
+        if not await goal_repository.delete_goal(user_id):
+            raise NotFound("Goal not found")
+
+    async def record_measurements(
+        self, user_id: int, measurements: Sequence[tuple[datetime, float]]
+    ) -> None:
+        """Update the progress of the user's goal with new weight measurements in constant time per measurement.
+
+        Args:
+            user_id (int): The unique ID of the user.
+            measurements (Sequence[tuple[datetime, float]]): The dates and the weights of the measurements.
+
+        Returns:
+            None
+        """
+        async with goal_repository.lock_goal(user_id) as goal:
+            if not goal:
+                return
+            for date, weight in measurements:
+                # Measurements preceding the goal don't count towards it
+                if date >= goal.start_date:
+                    add_sample(goal, date, weight)
+
+    async def rebuild(self, user_id: int) -> None:
+        """Recompute the progress of the user's goal from the measurements since its start.
+
+        Updated or deleted measurements can't be taken back from the running sums, so their
+        changes replay the measurements since the start of the goal instead.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            None
+        """
+        async with goal_repository.lock_goal(user_id) as goal:
+            if not goal:
+                return
+            series = await weight_repository.get_weight_series(user_id, goal.start_date)
+            goal.samples = 0
+            goal.sum_t = goal.sum_w = goal.sum_tt = goal.sum_tw = 0.0
+            goal.latest_date = goal.start_date
+            goal.latest_weight = goal.start_weight
+            goal.milestone = 0
+            goal.milestone_reached_at = None
+            for date, weight in series:
+                add_sample(goal, date, weight)
+            update_progress(goal)
+
+
+service = GoalService()
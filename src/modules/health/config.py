@@ -0,0 +1,16 @@
+from pydantic_settings import BaseSettings
+
+
+class HealthConfig(BaseSettings):
+    # Probes within this interval in seconds share the result of one readiness check.
+    HEALTH_CACHE_TTL: float = 2.0
+    # The longest wait in seconds for the database round trip before the worker is reported unready.
+    HEALTH_DB_TIMEOUT: float = 1.0
+    # A slower database round trip in milliseconds reports the worker as unready.
+    HEALTH_MAX_DB_LATENCY_MS: float = 250
+    # After the shutdown signal, the time in seconds a worker keeps serving while reporting itself
+    # unready, so the orchestrator stops routing to it first. Shorter than Gunicorn's graceful timeout.
+    HEALTH_DRAIN_DELAY: float = 5
+
+
+health_config = HealthConfig()
@@ -0,0 +1,15 @@
+from enum import Enum
+
+
+class HealthStatus(str, Enum):
+    """Enum class representing the outcomes of a health probe.
+
+    Attributes:
+        OK (str): The worker serves requests.
+        UNAVAILABLE (str): A dependency of the worker, e.g. the database, is unavailable or slow.
+        DRAINING (str): The worker is shutting down and takes no new requests.
+    """
+
+    OK = "ok"
+    UNAVAILABLE = "unavailable"
+    DRAINING = "draining"
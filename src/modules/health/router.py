@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Response, status
+from src.modules.health.constants import HealthStatus
+from src.modules.health.schemas import HealthCheck
+from src.modules.health.service import service as health_service
+
+router: APIRouter = APIRouter()
+
+
+@router.get(
+    "/live",
+    summary="Liveness probe",
+    description="Report that the worker is running, without checking its dependencies.",
+)
+async def get_liveness() -> HealthCheck:
+    """Answer the liveness probe.
+
+    Returns:
+        HealthCheck: The OK status.
+    """
+    return health_service.get_liveness()
+
+
+@router.get(
+    "/ready",
+    summary="Readiness probe",
+    description=(
+        "Report whether the worker can serve requests: the database pool has free connections, "
+        "the database round trip is fast and the worker isn't shutting down. The result is cached "
+        "for a short interval. Responds with 503 when the worker isn't ready."
+    ),
+    responses={503: {"model": HealthCheck}},
+)
+async def get_readiness(response: Response) -> HealthCheck:
+    """Answer the readiness probe.
+
+    Args:
+        response (Response): The response, its status code is set to 503 when the worker isn't ready.
+
+    Returns:
+        HealthCheck: The result of the readiness check.
+    """
+    result = await health_service.get_readiness()
+    if result.status != HealthStatus.OK:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
@@ -0,0 +1,21 @@
+from typing import Optional
+from src.modules.health.constants import HealthStatus
+from src.schemas import CustomSchema
+
+
+class HealthCheck(CustomSchema):
+    """Schema representing the result of a health probe.
+
+    Attributes:
+        status (HealthStatus): The outcome of the probe.
+        detail (Optional[str]): The reason the worker is unavailable.
+        db_latency_ms (Optional[float]): The duration of the database round trip in milliseconds.
+        pool_checked_out (Optional[int]): The number of connections checked out of the pool.
+        pool_capacity (Optional[int]): The maximum number of connections of the pool.
+    """
+
+    status: HealthStatus
+    detail: Optional[str] = None
+    db_latency_ms: Optional[float] = None
+    pool_checked_out: Optional[int] = None
+    pool_capacity: Optional[int] = None
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from src.config import db_config
+from src.modules.health.config import health_config
+from src.modules.health.constants import HealthStatus
+from src.modules.health.schemas import HealthCheck
+from src.utils import db_utils
+
+
+class HealthService:
+    """Answers the liveness and readiness probes of the orchestrator.
+
+    The readiness check takes a database round trip, so its result is cached for a short
+    interval and concurrent probes wait for the same check, keeping the load of frequent
+    probes off the database. Once the worker starts draining on the shutdown signal, it reports
+    itself unready without checking anything.
+
+    The readiness counts all checked out connections as busy: the pool serves only the requests and
+    their background work, long-lived connections like the ``LISTEN`` one are opened outside of it.
+
+    Attributes:
+        draining (bool): Whether the worker is shutting down.
+    """
+
+    def __init__(self) -> None:
+        self.draining = False
+        self._result: Optional[HealthCheck] = None
+        self._checked_at = 0.0
+        self._check: Optional[asyncio.Task] = None
+
+    def get_liveness(self) -> HealthCheck:
+        """Report that the worker's event loop is responsive, without checking its dependencies.
+
+        Returns:
+            HealthCheck: The OK status.
+        """
+        return HealthCheck(status=HealthStatus.OK)
+
+    async def get_readiness(self) -> HealthCheck:
+        """Report whether the worker can serve requests, from the cache if checked recently.
+
+        Returns:
+            HealthCheck: The result of the readiness check.
+        """
+        if self.draining:
+            return HealthCheck(status=HealthStatus.DRAINING, detail="Shutting down")
+        if (
+            self._result
+            and time.monotonic() - self._checked_at < health_config.HEALTH_CACHE_TTL
+        ):
+            return self._result
+
+        if self._check is None:
+            self._check = asyncio.create_task(self._check_readiness())
+            self._check.add_done_callback(self._store_result)
+        # A cancelled probe mustn't cancel the check other probes wait for
+        return await asyncio.shield(self._check)
+
+    def _store_result(self, check: asyncio.Task) -> None:
+        self._check = None
+        if not check.cancelled() and check.exception() is None:
+            self._result = check.result()
+            self._checked_at = time.monotonic()
+
+    async def _check_readiness(self) -> HealthCheck:
+        pool = db_utils.engine.pool if db_utils.engine else None
+        checked_out = capacity = None
+        if isinstance(pool, QueuePool):
+            checked_out = pool.checkedout()
+            capacity = db_config.DATABASE_POOL_SIZE + db_config.DATABASE_MAX_OVERFLOW
+            # The round trip would wait for a connection until the pool timeout
+            if checked_out >= capacity:
+                return HealthCheck(
+                    status=HealthStatus.UNAVAILABLE,
+                    detail="The database pool is exhausted",
+                    pool_checked_out=checked_out,
+                    pool_capacity=capacity,
+                )
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._ping(), health_config.HEALTH_DB_TIMEOUT)
+        except Exception as e:
+            return HealthCheck(
+                status=HealthStatus.UNAVAILABLE,
+                detail=f"The database is unavailable: {type(e).__name__}",
+                pool_checked_out=checked_out,
+                pool_capacity=capacity,
+            )
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        slow = latency_ms > health_config.HEALTH_MAX_DB_LATENCY_MS
+        return HealthCheck(
+            status=HealthStatus.UNAVAILABLE if slow else HealthStatus.OK,
+            detail="The database is slow" if slow else None,
+            db_latency_ms=latency_ms,
+            pool_checked_out=checked_out,
+            pool_capacity=capacity,
+        )
+
+    async def _ping(self) -> None:
+        async with db_utils.async_session() as session:
+            await session.execute(text("SELECT 1"))
+
+    def drain(self) -> None:
+        """Report the worker unready from now on, as it's shutting down.
+
+        Returns:
+            None
+        """
+        self.draining = True
+
+
+service = HealthService()
@@ -0,0 +1,15 @@
+from pydantic_settings import BaseSettings
+
+
+class JobsConfig(BaseSettings):
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_DELAY: float = 2.0
+    JOB_RETRY_MAX_DELAY: float = 300.0
+    JOB_TIMEOUT: int = 300
+    # Jobs locked for longer are considered abandoned by a crashed worker and claimed again.
+    JOB_LOCK_TIMEOUT: int = 600
+
+
+jobs_config = JobsConfig()
@@ -0,0 +1,47 @@
+import datetime
+from typing import Any, Optional
+from src.utils.db_utils import Base
+from src.modules.jobs.constants import JobStatus
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class Job(Base):
+    """Represents a unit of background work processed by the job workers.
+
+    Attributes:
+        __tablename__ (str): Name of the SQL table that stores the jobs.
+        id (Mapped[int]): Unique identifier for the job.
+        user_id (Mapped[Optional[int]]): The ID of the user who enqueued the job, if any.
+        type (Mapped[str]): The name of the handler processing the job.
+        payload (Mapped[dict[str, Any]]): The arguments of the handler.
+        status (Mapped[str]): The processing status of the job.
+        attempts (Mapped[int]): The number of times the job was claimed by a worker.
+        max_attempts (Mapped[int]): The number of attempts after which a failing job is given up.
+        run_at (Mapped[datetime.datetime]): The earliest time the job may be claimed.
+        locked_at (Mapped[Optional[datetime.datetime]]): The time the job was claimed by a worker.
+        locked_by (Mapped[Optional[str]]): The identifier of the worker processing the job.
+        result (Mapped[Optional[dict[str, Any]]]): The result returned by the handler.
+        error (Mapped[Optional[str]]): The error of the last failed attempt.
+    """
+
+    __tablename__ = "job"
+    # Supports claiming the due jobs in the order of their scheduled time.
+    __table_args__ = (Index("ix_job_status_run_at", "status", "run_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("user.id"), nullable=True, index=True
+    )
+    type: Mapped[str] = mapped_column(nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(nullable=False)
+    status: Mapped[str] = mapped_column(nullable=False, default=JobStatus.PENDING.value)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(nullable=False)
+    run_at: Mapped[datetime.datetime] = mapped_column(
+        nullable=False, default=datetime.datetime.now
+    )
+    locked_at: Mapped[Optional[datetime.datetime]] = mapped_column(nullable=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(nullable=True)
+    result: Mapped[Optional[dict[str, Any]]] = mapped_column(nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(nullable=True)
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+from sqlalchemy import and_, or_, select, update
+from src.modules.jobs.constants import JobStatus
+from src.modules.jobs.models import Job
+from src.utils.db_utils import async_session
+from src.utils.trace_utils import traced_methods
+
+
+@traced_methods
+class JobRepository:
+    async def create_job(
+        self,
+        user_id: Optional[int],
+        type: str,
+        payload: dict[str, Any],
+        max_attempts: int,
+    ) -> Job:
+        """Enqueue a new job.
+
+        Args:
+            user_id (Optional[int]): The unique ID of the user enqueuing the job, if any.
+            type (str): The name of the handler processing the job.
+            payload (dict[str, Any]): The JSON-serializable arguments of the handler.
+            max_attempts (int): The number of attempts after which a failing job is given up.
+
+        Returns:
+            Job: The newly created job record.
+        """
+        async with async_session() as session:
+            job = Job(
+                user_id=user_id, type=type, payload=payload, max_attempts=max_attempts
+            )
+            session.add(job)
+            await session.commit()
+            return job
+
+    async def get_job(self, job_id: int, user_id: int) -> Optional[Job]:
+        """Retrieve a job enqueued by a user.
+
+        Args:
+            job_id (int): The unique ID of the job.
+            user_id (int): The unique ID of the user who enqueued the job.
+
+        Returns:
+            Optional[Job]: The job, or None if the user has no such job.
+        """
+        async with async_session() as session:
+            result = await session.execute(
+                select(Job).where(Job.id == job_id, Job.user_id == user_id)
+            )
+            return result.scalars().one_or_none()
+
+    async def claim_jobs(
+        self, worker_id: str, limit: int, lock_timeout: timedelta
+    ) -> List[Job]:
+        """Claim the due jobs for a worker in a single statement.
+
+        The candidates are locked with ``FOR UPDATE SKIP LOCKED``, so concurrent workers claim
+        disjoint sets of jobs without waiting for each other. Running jobs whose lock expired
+        were abandoned by a crashed worker and are claimed again.
+
+        Args:
+            worker_id (str): The identifier of the claiming worker.
+            limit (int): The maximum number of jobs to claim.
+            lock_timeout (timedelta): The time after which the lock of a running job expires.
+
+        Returns:
+            List[Job]: The claimed jobs, their attempts already incremented.
+        """
+        now = datetime.now()
+        claimable = (
+            select(Job.id)
+            .where(
+                or_(
+                    and_(Job.status == JobStatus.PENDING.value, Job.run_at <= now),
+                    and_(
+                        Job.status == JobStatus.RUNNING.value,
+                        Job.locked_at < now - lock_timeout,
+                    ),
+                )
+            )
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(Job)
+            .where(Job.id.in_(claimable.scalar_subquery()))
+            .values(
+                status=JobStatus.RUNNING.value,
+                attempts=Job.attempts + 1,
+                locked_at=now,
+                locked_by=worker_id,
+                updated_at=now,
+            )
+            .returning(Job)
+        )
+        async with async_session() as session:
+            result = await session.execute(query)
+            await session.commit()
+            return result.scalars().all()
+
+    async def finish_job(
+        self,
+        job_id: int,
+        worker_id: str,
+        status: JobStatus,
+        result: Optional[dict[str, Any]] = None,
+        error: Optional[str] = None,
+        run_at: Optional[datetime] = None,
+    ) -> None:
+        """Record the outcome of an attempt and release the lock of the job.
+
+        Nothing is updated if the lock expired and another worker claimed the job meanwhile.
+
+        Args:
+            job_id (int): The unique ID of the job.
+            worker_id (str): The identifier of the worker holding the lock.
+            status (JobStatus): The new status, ``pending`` schedules a retry.
+            result (Optional[dict[str, Any]]): The result of a successful attempt.
+            error (Optional[str]): The error of a failed attempt.
+            run_at (Optional[datetime]): The time of the retry.
+
+        Returns:
+            None
+        """
+        values = {"run_at": run_at} if run_at else {}
+        query = (
+            update(Job)
+            .where(
+                Job.id == job_id,
+                Job.status == JobStatus.RUNNING.value,
+                Job.locked_by == worker_id,
+            )
+            .values(
+                status=status.value,
+                result=result,
+                error=error,
+                locked_at=None,
+                locked_by=None,
+                updated_at=datetime.now(),
+                **values,
+            )
+        )
+        async with async_session() as session:
+            await session.execute(query)
+            await session.commit()
+
+
+repository = JobRepository()
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from src.modules.auth.schemas import UserDetail
+from src.modules.auth.dependencies import access_token_validation
+from src.modules.jobs.schemas import JobDetail
+from src.modules.jobs.service import service as job_service
+
+router: APIRouter = APIRouter()
+
+
+@router.get(
+    "/{job_id}",
+    summary="Get a job",
+    description="Get the status and the result of a background job enqueued by the authenticated user.",
+)
+async def get_job(
+    job_id: int,
+    user: UserDetail = Depends(access_token_validation()),
+) -> JobDetail:
+    """Retrieve the status of a background job of the authenticated user.
+
+    Args:
+        job_id (int): The unique ID of the job.
+        user (UserDetail): The authenticated user who enqueued the job.
+
+    Returns:
+        JobDetail: A response containing the status of the job.
+    """
+    return await job_service.get_job(user.id, job_id)
@@ -0,0 +1,50 @@
+import datetime
+from typing import Any, Optional
+from src.modules.jobs.constants import JobStatus
+from src.modules.jobs.models import Job
+from src.schemas import CustomSchema
+
+
+class JobDetail(CustomSchema):
+    """Schema representing the status of a background job.
+
+    Attributes:
+        id (int): The unique ID of the job.
+        type (str): The kind of work done by the job.
+        status (JobStatus): The processing status of the job.
+        attempts (int): The number of processing attempts so far.
+        result (Optional[dict[str, Any]]): The result of the job once it succeeded.
+        error (Optional[str]): The error of the last failed attempt.
+        created_at (datetime.datetime): The time the job was enqueued.
+        updated_at (datetime.datetime): The time of the last status change.
+    """
+
+    id: int
+    type: str
+    status: JobStatus
+    attempts: int
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    @staticmethod
+    def from_model(job: Job) -> "JobDetail":
+        """Convert a job model instance into its status representation.
+
+        Args:
+            job (Job): The job model instance.
+
+        Returns:
+            JobDetail: The status of the job.
+        """
+        return JobDetail(
+            id=job.id,
+            type=job.type,
+            status=job.status,
+            attempts=job.attempts,
+            result=job.result,
+            error=job.error,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+        )
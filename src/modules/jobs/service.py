@@ -0,0 +1,88 @@
+from typing import Any, Awaitable, Callable, Optional
+from src.exceptions import NotFound
+from src.modules.jobs.config import jobs_config
+from src.modules.jobs.models import Job
+from src.modules.jobs.repository import repository as job_repository
+from src.modules.jobs.schemas import JobDetail
+from src.utils.trace_utils import traced_methods
+
+JobHandler = Callable[[Job], Awaitable[Optional[dict[str, Any]]]]
+
+
+class JobError(Exception):
+    """Raised by a job handler when the job can't succeed, so it fails without being retried."""
+
+
+@traced_methods
+class JobService:
+    def __init__(self) -> None:
+        self._handlers: dict[str, JobHandler] = {}
+
+    def handler(self, type: str) -> Callable[[JobHandler], JobHandler]:
+        """Register the decorated coroutine function as the handler of a job type.
+
+        The handler receives the claimed job and returns the JSON-serializable result. Raising
+        `JobError` fails the job, any other exception schedules a retry.
+
+        Args:
+            type (str): The job type processed by the handler.
+
+        Returns:
+            Callable[[JobHandler], JobHandler]: The decorator.
+        """
+
+        def register(handler: JobHandler) -> JobHandler:
+            self._handlers[type] = handler
+            return handler
+
+        return register
+
+    def get_handler(self, type: str) -> Optional[JobHandler]:
+        """Find the handler of a job type.
+
+        Args:
+            type (str): The job type.
+
+        Returns:
+            Optional[JobHandler]: The handler, or None if no handler is registered.
+        """
+        return self._handlers.get(type)
+
+    async def enqueue(
+        self, user_id: Optional[int], type: str, payload: dict[str, Any]
+    ) -> JobDetail:
+        """Enqueue a job to be processed by a job worker.
+
+        Args:
+            user_id (Optional[int]): The unique ID of the user enqueuing the job, if any.
+            type (str): The job type.
+            payload (dict[str, Any]): The JSON-serializable arguments of the handler.
+
+        Returns:
+            JobDetail: The status of the enqueued job.
+        """
+        job = await job_repository.create_job(
+            user_id, type, payload, jobs_config.JOB_MAX_ATTEMPTS
+        )
+        return JobDetail.from_model(job)
+
+    async def get_job(self, user_id: int, job_id: int) -> JobDetail:
+        """Retrieve the status of a job enqueued by a user.
+
+        Args:
+            user_id (int): The unique ID of the user who enqueued the job.
+            job_id (int): The unique ID of the job.
+
+        Returns:
+            JobDetail: The status of the job.
+
+        Raises:
+            NotFound: If the user has no such job.
+        """
+        job = await job_repository.get_job(job_id, user_id)
+        if not job:
+            raise NotFound("Job not found")
+        return JobDetail.from_model(job)
+
+
+service = JobService()
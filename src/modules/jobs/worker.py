@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import logging.config
+import os
+import random
+import signal
+import socket
+from datetime import datetime, timedelta
+from typing import Optional
+from src.modules.jobs.config import jobs_config
+from src.modules.jobs.constants import JobStatus
+from src.modules.jobs.models import Job
+from src.modules.jobs.repository import repository as job_repository
+from src.modules.jobs.service import JobError, service as job_service
+from src.utils.db_utils import close_db, init_db
+
+# The models referenced by foreign keys and the modules registering job handlers, imported
+# by the worker process as it doesn't load the application.
+import src.modules.auth.models  # noqa: F401
+import src.modules.weight.jobs  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """Compute the delay before retrying a failed job.
+
+    The delay grows exponentially with the attempts up to a cap, randomized ("equal jitter"),
+    so jobs failing together, e.g. during a database outage, don't retry in lockstep.
+
+    Args:
+        attempts (int): The number of attempts made so far.
+
+    Returns:
+        timedelta: The delay of the next attempt.
+    """
+    delay = min(
+        jobs_config.JOB_RETRY_MAX_DELAY,
+        jobs_config.JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1),
+    )
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+class JobWorker:
+    """Claims due jobs from the job table and processes them concurrently on the event loop.
+
+    Attributes:
+        worker_id (str): The identifier of the worker, recorded on the claimed jobs.
+        concurrency (int): The maximum number of jobs processed at the same time.
+        poll_interval (float): The time in seconds to wait when no job is due.
+    """
+
+    def __init__(
+        self, concurrency: int, poll_interval: float, worker_id: Optional[str] = None
+    ) -> None:
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    async def run_once(self) -> int:
+        """Claim as many due jobs as there are free slots and start processing them.
+
+        Returns:
+            int: The number of claimed jobs.
+        """
+        free_slots = self.concurrency - len(self._tasks)
+        if free_slots <= 0:
+            return 0
+
+        jobs = await job_repository.claim_jobs(
+            self.worker_id,
+            free_slots,
+            timedelta(seconds=jobs_config.JOB_LOCK_TIMEOUT),
+        )
+        for job in jobs:
+            task = asyncio.create_task(self._process(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(jobs)
+
+    async def drain(self) -> None:
+        """Wait until all jobs being processed are finished.
+
+        Returns:
+            None
+        """
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def run(self) -> None:
+        """Process jobs until the worker is stopped, then finish the jobs being processed.
+
+        Returns:
+            None
+        """
+        logger.info(
+            "Job worker %s started with concurrency %d",
+            self.worker_id,
+            self.concurrency,
+        )
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.run_once()
+            except Exception:
+                logger.exception("Failed to claim jobs")
+                claimed = 0
+
+            if len(self._tasks) >= self.concurrency:
+                # All slots are taken, claim more jobs once one of them finishes.
+                await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+            elif not claimed:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        await self.drain()
+        logger.info("Job worker %s stopped", self.worker_id)
+
+    def stop(self) -> None:
+        """Stop claiming new jobs, `run` returns once the jobs being processed are finished.
+
+        Returns:
+            None
+        """
+        self._stopping.set()
+
+    async def _process(self, job: Job) -> None:
+        handler = job_service.get_handler(job.type)
+        try:
+            if not handler:
+                raise JobError(f"Unknown job type: {job.type}")
+            # The lock of the job kept expiring, e.g. the job crashes its worker every time.
+            if job.attempts > job.max_attempts:
+                raise JobError("Job attempts exhausted")
+            result = await asyncio.wait_for(handler(job), jobs_config.JOB_TIMEOUT)
+        except JobError as e:
+            logger.warning("Job %d (%s) failed: %s", job.id, job.type, e)
+            await job_repository.finish_job(
+                job.id, self.worker_id, JobStatus.FAILED, error=str(e)
+            )
+        except Exception as e:
+            logger.exception(
+                "Job %d (%s) attempt %d failed", job.id, job.type, job.attempts
+            )
+            if job.attempts < job.max_attempts:
+                await job_repository.finish_job(
+                    job.id,
+                    self.worker_id,
+                    JobStatus.PENDING,
+                    error=repr(e),
+                    run_at=datetime.now() + get_retry_delay(job.attempts),
+                )
+            else:
+                await job_repository.finish_job(
+                    job.id, self.worker_id, JobStatus.FAILED, error=repr(e)
+                )
+        else:
+            await job_repository.finish_job(
+                job.id, self.worker_id, JobStatus.SUCCEEDED, result=result
+            )
+
+
+async def main() -> None:
+    """Run a job worker until the process receives ``SIGTERM`` or ``SIGINT``.
+
+    Returns:
+        None
+    """
+    worker = JobWorker(
+        jobs_config.JOB_WORKER_CONCURRENCY, jobs_config.JOB_POLL_INTERVAL
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+
+    await init_db()
+    try:
+        await worker.run()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.config.fileConfig(
+        os.getenv("LOG_CONFIG", "logging.ini"), disable_existing_loggers=False
+    )
+    asyncio.run(main())
@@ -0,0 +1,19 @@
+from pydantic_settings import BaseSettings
+
+
+class WeightConfig(BaseSettings):
+    STREAM_MAX_CONNECTIONS: int = 500
+    STREAM_QUEUE_SIZE: int = 100
+    STREAM_HEARTBEAT_INTERVAL: int = 15
+    STREAM_RETRY_AFTER: int = 5
+
+    OUTLIER_WINDOW: int = 20
+    OUTLIER_MIN_SAMPLES: int = 5
+    OUTLIER_THRESHOLD: float = 3.5
+    OUTLIER_MIN_MAD: float = 0.5
+    OUTLIER_MIN_WEIGHT: float = 20.0
+    OUTLIER_MAX_WEIGHT: float = 400.0
+    OUTLIER_MAX_USERS: int = 10000
+
+
+weight_config = WeightConfig()
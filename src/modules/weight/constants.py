@@ -0,0 +1,25 @@
+import numpy as np
+from src.modules.auth.constants import WeightUnit
+
+# Factors converting the stored weights in kilograms to the given unit.
+WEIGHT_UNIT_FACTORS: dict[WeightUnit, float] = {
+    WeightUnit.KG: 1.0,
+    WeightUnit.LB: 2.20462262185,
+}
+
+# The job type of importing weight measurements from a CSV file.
+IMPORT_JOB_TYPE = "weight.import"
+# The maximum size of an imported CSV file in bytes.
+IMPORT_MAX_SIZE = 5 * 1024 * 1024
+# The job type of re-scoring the weight measurements of a user for outliers.
+RESCORE_JOB_TYPE = "weight.rescore"
+
+# The media type of a binary batch of weight measurements.
+BATCH_MEDIA_TYPE = "application/octet-stream"
+# A record of a binary batch: the UTC date in whole seconds since the epoch and the weight in
+# kilograms, as packed little-endian by ``struct.pack("<qf", ...)``.
+BATCH_RECORD = np.dtype([("date", "<i8"), ("weight", "<f4")])
+# The maximum number of records of a binary batch.
+BATCH_MAX_RECORDS = 10000
+# The range of valid batch dates in seconds since the epoch, i.e. 1970-01-01 to 9999-12-31.
+BATCH_DATE_RANGE = (0, 253402300799)
@@ -0,0 +1,41 @@
+from typing import Any
+from src.modules.jobs.models import Job
+from src.modules.jobs.service import JobError, service as job_service
+from src.modules.weight.constants import IMPORT_JOB_TYPE, RESCORE_JOB_TYPE
+from src.modules.weight.service import service as weight_service
+
+
+@job_service.handler(IMPORT_JOB_TYPE)
+async def import_weight_measurements(job: Job) -> dict[str, Any]:
+    """Import the weight measurements of a CSV file uploaded by the user.
+
+    Args:
+        job (Job): The import job, its payload contains the CSV file.
+
+    Returns:
+        dict[str, Any]: The number of imported measurements.
+
+    Raises:
+        JobError: If the file is invalid, retrying wouldn't help.
+    """
+    try:
+        imported = await weight_service.import_weight_measurements(
+            job.user_id, job.payload["csv"]
+        )
+    except ValueError as e:
+        raise JobError(str(e)) from e
+    return {"imported": imported}
+
+
+@job_service.handler(RESCORE_JOB_TYPE)
+async def rescore_weight_measurements(job: Job) -> dict[str, Any]:
+    """Re-score the weight measurements of the user for outliers.
+
+    Args:
+        job (Job): The re-scoring job.
+
+    Returns:
+        dict[str, Any]: The number of measurements whose flag changed.
+    """
+    changed = await weight_service.rescore_weight_measurements(job.user_id)
+    return {"changed": changed}
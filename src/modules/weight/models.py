@@ -1,23 +1,40 @@
 import datetime
+from typing import Optional
 from src.utils.db_utils import Base
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 
 class WeightMeasurement(Base):
     """Represents a weight measurement entry recorded by a user.
 
+    Deleted measurements are kept as tombstones with ``deleted_at`` set, so clients
+    synchronizing their local copy learn about the deletion. Implausible measurements,
+    e.g. garbage readings of a scale, are kept with ``flagged`` set and excluded from analytics.
+
     Attributes:
         __tablename__ (str): Name of the SQL table that stores weight measurements.
         id (Mapped[int]): Unique identifier for the weight measurement entry.
         user_id (Mapped[int]): The ID of the user who recorded the weight.
         date (Mapped[datetime.datetime]): The date of the weight measurement entry.
         weight (Mapped[float]): The weight value recorded by the user.
+        flagged (Mapped[bool]): Whether the measurement was detected as an outlier.
+        deleted_at (Mapped[Optional[datetime.datetime]]): The time of the deletion, if deleted.
     """
 
     __tablename__ = "weight_measurement"
+    # Supports reading the changes of a user in the order of their modification.
+    __table_args__ = (
+        Index(
+            "ix_weight_measurement_user_id_updated_at", "user_id", "updated_at", "id"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
     date: Mapped[datetime.datetime] = mapped_column(nullable=False)
     weight: Mapped[float] = mapped_column(nullable=False)
+    flagged: Mapped[bool] = mapped_column(nullable=False, default=False)
+    deleted_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        nullable=True, default=None
+    )
@@ -0,0 +1,154 @@
+import statistics
+import warnings
+from collections import OrderedDict, deque
+from typing import Sequence
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from src.modules.weight.config import weight_config
+from src.modules.weight.repository import repository as weight_repository
+
+# Scales the median absolute deviation to the standard deviation of normally distributed weights.
+MAD_SCALE = 0.6745
+
+
+def is_outlier(weight: float, window: Sequence[float]) -> bool:
+    """Decide whether a weight is an outlier against the recent weights of the user.
+
+    The weight is compared to the median of the window using the modified z-score, which
+    relies on the median absolute deviation, so earlier garbage readings don't skew it.
+
+    Args:
+        weight (float): The scored weight.
+        window (Sequence[float]): The recent accepted weights of the user.
+
+    Returns:
+        bool: Whether the weight should be flagged.
+    """
+    if (
+        not weight_config.OUTLIER_MIN_WEIGHT
+        <= weight
+        <= weight_config.OUTLIER_MAX_WEIGHT
+    ):
+        return True
+    # Too short a history to tell a garbage reading from a real change
+    if len(window) < weight_config.OUTLIER_MIN_SAMPLES:
+        return False
+    median = statistics.median(window)
+    mad = statistics.median(abs(w - median) for w in window)
+    # Steady weights have a near-zero deviation, the floor keeps normal fluctuation accepted
+    score = MAD_SCALE * abs(weight - median) / max(mad, weight_config.OUTLIER_MIN_MAD)
+    return score > weight_config.OUTLIER_THRESHOLD
+
+
+def find_outliers(weights: np.ndarray) -> np.ndarray:
+    """Score a whole history of weights at once, each against the weights preceding it.
+
+    The vectorized counterpart of `is_outlier` for re-scoring existing histories. The window of a
+    weight holds the preceding weights within the physical bounds, including flagged ones, as the
+    flags depend on each other; the median and the MAD are robust to the few outliers left in it.
+
+    Args:
+        weights (np.ndarray): The weights of a user ordered by the date.
+
+    Returns:
+        np.ndarray: The boolean mask of the weights to flag.
+    """
+    size = weight_config.OUTLIER_WINDOW
+    flagged = (weights < weight_config.OUTLIER_MIN_WEIGHT) | (
+        weights > weight_config.OUTLIER_MAX_WEIGHT
+    )
+    if len(weights) <= weight_config.OUTLIER_MIN_SAMPLES:
+        return flagged
+
+    # Row i holds the `size` weights preceding weight i, padded with NaN at the start
+    preceding = np.concatenate(
+        [np.full(size, np.nan), np.where(flagged, np.nan, weights)]
+    )
+    windows = sliding_window_view(preceding[:-1], size)
+    with warnings.catch_warnings():
+        # The first rows have no weights at all, their median is NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(windows, axis=1)
+        mad = np.nanmedian(np.abs(windows - median[:, np.newaxis]), axis=1)
+    samples = np.count_nonzero(~np.isnan(windows), axis=1)
+    score = (
+        MAD_SCALE
+        * np.abs(weights - median)
+        / np.fmax(mad, weight_config.OUTLIER_MIN_MAD)
+    )
+    return flagged | (
+        (samples >= weight_config.OUTLIER_MIN_SAMPLES)
+        & (score > weight_config.OUTLIER_THRESHOLD)
+    )
+
+
+class OutlierDetector:
+    """Flags implausible weight measurements as they are ingested.
+
+    The recent accepted weights of each user are held in a ring buffer, so scoring a measurement
+    doesn't read the history again. The buffers of the least recently active users are evicted
+    to bound the memory, an evicted or unknown user's buffer is loaded from the database.
+
+    The buffers are local to the worker: measurements saved through other workers reach them only
+    after eviction or invalidation, which the robust statistics tolerate.
+
+    Attributes:
+        window (int): The number of recent weights a measurement is scored against.
+        max_users (int): The maximum number of users whose buffers are held.
+    """
+
+    def __init__(self, window: int, max_users: int) -> None:
+        self.window = window
+        self.max_users = max_users
+        self._windows: OrderedDict[int, deque[float]] = OrderedDict()
+
+    async def score(self, user_id: int, weights: Sequence[float]) -> list[bool]:
+        """Score new weights of a user in order and remember the accepted ones.
+
+        Args:
+            user_id (int): The unique ID of the user.
+            weights (Sequence[float]): The new weights in the order of their ingestion.
+
+        Returns:
+            list[bool]: Whether each weight should be flagged.
+        """
+        window = self._windows.get(user_id)
+        if window is None:
+            recent = await weight_repository.get_recent_weights(user_id, self.window)
+            # Another request of the user may have loaded the buffer meanwhile
+            window = self._windows.setdefault(user_id, deque(recent, self.window))
+        self._windows.move_to_end(user_id)
+        while len(self._windows) > self.max_users:
+            self._windows.popitem(last=False)
+
+        flags = []
+        for weight in weights:
+            flagged = is_outlier(weight, window)
+            if not flagged:
+                window.append(weight)
+            flags.append(flagged)
+        return flags
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop the buffer of a user whose measurements were changed other than by appending.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            None
+        """
+        self._windows.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop the buffers of all users.
+
+        Returns:
+            None
+        """
+        self._windows.clear()
+
+
+outlier_detector = OutlierDetector(
+    weight_config.OUTLIER_WINDOW, weight_config.OUTLIER_MAX_USERS
+)
@@ -1,11 +1,47 @@
-from typing import List, Optional
-from datetime import date
-from sqlalchemy import select
+from typing import Any, List, Optional, Sequence
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Numeric,
+    cast,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.sql.elements import ColumnElement
 from src.modules.weight.models import WeightMeasurement
-from src.modules.weight.schemas import WeightMeasurementCreate
+from src.modules.weight.config import weight_config
+from src.modules.weight.schemas import (
+    WeightMeasurementBrief,
+    WeightMeasurementCreate,
+    WeightMeasurementUpdate,
+)
 from src.utils.db_utils import async_session
+from src.utils.notify_utils import NotificationHub
+from src.utils.trace_utils import traced_methods
 
 
+def at_time_zone(value: Any, timezone: str) -> ColumnElement:
+    """Build the SQL ``value AT TIME ZONE timezone`` expression.
+
+    Applied to a ``timestamp``, it interprets the value as local time of the timezone and returns
+    a ``timestamptz``; applied to a ``timestamptz``, it returns the local time in the timezone.
+
+    Args:
+        value (Any): The converted expression.
+        timezone (str): The IANA name of the timezone.
+
+    Returns:
+        ColumnElement: The SQL expression.
+    """
+    return value.op("AT TIME ZONE")(timezone)
+
+
+@traced_methods
 class WeightRepository:
     async def get_weight_measurements(
         self,
@@ -26,7 +62,8 @@ class WeightRepository:
         async with async_session() as session:
             # Construct the base query to retrieve weight measurements for a specific user
             query = select(WeightMeasurement).where(
-                WeightMeasurement.user_id == user_id
+                WeightMeasurement.user_id == user_id,
+                WeightMeasurement.deleted_at.is_(None),
             )
             # Apply optional date filters if provided
             if from_date:
@@ -38,14 +75,118 @@ class WeightRepository:
             result = await session.execute(query)
             return result.scalars().all()
 
+    async def get_latest_weight_measurement(
+        self, user_id: int
+    ) -> Optional[WeightMeasurement]:
+        """Retrieve the most recent weight measurement of a user, skipping outliers.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            Optional[WeightMeasurement]: The measurement with the latest date, or None if the user has none.
+        """
+        query = (
+            select(WeightMeasurement)
+            .where(
+                WeightMeasurement.user_id == user_id,
+                WeightMeasurement.deleted_at.is_(None),
+                WeightMeasurement.flagged.is_(False),
+            )
+            .order_by(WeightMeasurement.date.desc())
+            .limit(1)
+        )
+        async with async_session() as session:
+            result = await session.execute(query)
+            return result.scalars().first()
+
+    async def get_weight_series(
+        self, user_id: int, from_date: datetime
+    ) -> List[tuple[datetime, float]]:
+        """Retrieve the dates and weights of a user's measurements since a date, ordered by the date.
+
+        Outliers are skipped, the series feeds the analytics.
+
+        Args:
+            user_id (int): The unique ID of the user.
+            from_date (datetime): The date of the first included measurement.
+
+        Returns:
+            List[tuple[datetime, float]]: The dates and the weights of the measurements.
+        """
+        # Fetch the two needed columns only, not whole entities
+        query = (
+            select(WeightMeasurement.date, WeightMeasurement.weight)
+            .where(
+                WeightMeasurement.user_id == user_id,
+                WeightMeasurement.deleted_at.is_(None),
+                WeightMeasurement.flagged.is_(False),
+                WeightMeasurement.date >= from_date,
+            )
+            .order_by(WeightMeasurement.date)
+        )
+        async with async_session() as session:
+            result = await session.execute(query)
+            return [tuple(row) for row in result.all()]
+
+    async def get_recent_weights(self, user_id: int, limit: int) -> List[float]:
+        """Retrieve the latest weights of a user, skipping outliers.
+
+        Args:
+            user_id (int): The unique ID of the user.
+            limit (int): The maximum number of weights to retrieve.
+
+        Returns:
+            List[float]: The weights ordered by the date of their measurement.
+        """
+        query = (
+            select(WeightMeasurement.weight)
+            .where(
+                WeightMeasurement.user_id == user_id,
+                WeightMeasurement.deleted_at.is_(None),
+                WeightMeasurement.flagged.is_(False),
+            )
+            .order_by(WeightMeasurement.date.desc())
+            .limit(limit)
+        )
+        async with async_session() as session:
+            result = await session.execute(query)
+            return result.scalars().all()[::-1]
+
+    async def get_weight_history(self, user_id: int) -> List[tuple[int, float, bool]]:
+        """Retrieve the IDs, weights and flags of all measurements of a user, ordered by the date.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            List[tuple[int, float, bool]]: The IDs, the weights and the flags of the measurements.
+        """
+        query = (
+            select(
+                WeightMeasurement.id,
+                WeightMeasurement.weight,
+                WeightMeasurement.flagged,
+            )
+            .where(
+                WeightMeasurement.user_id == user_id,
+                WeightMeasurement.deleted_at.is_(None),
+            )
+            .order_by(WeightMeasurement.date, WeightMeasurement.id)
+        )
+        async with async_session() as session:
+            result = await session.execute(query)
+            return [tuple(row) for row in result.all()]
+
     async def save_weight_measurement(
-        self, user_id: int, data: WeightMeasurementCreate
+        self, user_id: int, data: WeightMeasurementCreate, flagged: bool = False
     ) -> WeightMeasurement:
         """Save a new weight measurement for a user.
 
         Args:
             user_id (int): The unique ID of the user for whom the measurement is being saved.
             data (WeightMeasurementCreate): The Pydantic schema object representing the new measurement data.
+            flagged (bool): Whether the measurement was detected as an outlier.
 
         Returns:
             WeightMeasurement: The newly created weight measurement record.
@@ -55,11 +196,322 @@ class WeightRepository:
                 user_id=user_id,
                 date=data.date,
                 weight=data.weight,
+                flagged=flagged,
             )
             session.add(measurement)
+            await session.flush()
+            # Push the new measurement to the user's open streams once it's committed
+            await measurement_notifications.notify(
+                session,
+                user_id,
+                "measurement:"
+                + WeightMeasurementBrief.from_model(measurement).model_dump_json(),
+            )
             await session.commit()
             await session.refresh(measurement)
             return measurement
 
+    async def save_weight_measurements(
+        self,
+        user_id: int,
+        dates: Sequence[datetime],
+        weights: Sequence[float],
+        flags: Sequence[bool],
+    ) -> int:
+        """Save many new weight measurements of a user at once.
+
+        The rows are inserted by a single bulk ``INSERT`` instead of one statement per measurement.
+        The measurements are passed as columns, so bulk sources don't build an object per row.
+        The user's open streams get a single notification to synchronize, as the measurements
+        wouldn't fit into the payload of one.
+
+        Args:
+            user_id (int): The unique ID of the user for whom the measurements are being saved.
+            dates (Sequence[datetime]): The dates of the measurements.
+            weights (Sequence[float]): The weights of the measurements.
+            flags (Sequence[bool]): Whether each measurement was detected as an outlier.
+
+        Returns:
+            int: The number of saved measurements.
+        """
+        if not dates:
+            return 0
+        async with async_session() as session:
+            await session.execute(
+                insert(WeightMeasurement),
+                [
+                    {"user_id": user_id, "date": d, "weight": w, "flagged": f}
+                    for d, w, f in zip(dates, weights, flags)
+                ],
+            )
+            await measurement_notifications.notify(
+                session, user_id, f'sync:{{"saved":{len(dates)}}}'
+            )
+            await session.commit()
+            return len(dates)
+
+    async def update_weight_measurement(
+        self, user_id: int, measurement_id: int, data: WeightMeasurementUpdate
+    ) -> Optional[WeightMeasurement]:
+        """Update the provided fields of a user's weight measurement in a single statement.
+
+        A weight corrected by the user clears the outlier flag.
+
+        Args:
+            user_id (int): The unique ID of the user owning the measurement.
+            measurement_id (int): The unique ID of the measurement.
+            data (WeightMeasurementUpdate): The Pydantic schema object representing the changed fields.
+
+        Returns:
+            Optional[WeightMeasurement]: The updated measurement, or None if the user has no such measurement.
+        """
+        values = data.model_dump(exclude_none=True)
+        if data.weight is not None:
+            values["flagged"] = False
+        query = (
+            update(WeightMeasurement)
+            .where(
+                WeightMeasurement.id == measurement_id,
+                WeightMeasurement.user_id == user_id,
+                WeightMeasurement.deleted_at.is_(None),
+            )
+            .values(**values, updated_at=datetime.now())
+            .returning(WeightMeasurement)
+        )
+        async with async_session() as session:
+            result = await session.execute(query)
+            await session.commit()
+            return result.scalars().one_or_none()
+
+    async def delete_weight_measurements(
+        self,
+        user_id: int,
+        measurement_id: Optional[int] = None,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ) -> int:
+        """Soft-delete a user's weight measurement or all of them within a date range.
+
+        The measurements are turned into tombstones by a single set-based ``UPDATE`` regardless
+        of their number, and their ``updated_at`` is bumped so synchronizing clients and caches
+        learn about the deletion.
+
+        Args:
+            user_id (int): The unique ID of the user owning the measurements.
+            measurement_id (Optional[int]): The unique ID of a single measurement to delete.
+            from_date (Optional[date]): The first date of the deleted range.
+            to_date (Optional[date]): The last date of the deleted range, inclusive.
+
+        Returns:
+            int: The number of deleted measurements.
+        """
+        now = datetime.now()
+        query = (
+            update(WeightMeasurement)
+            .where(
+                WeightMeasurement.user_id == user_id,
+                WeightMeasurement.deleted_at.is_(None),
+            )
+            .values(deleted_at=now, updated_at=now)
+            # The matched rows are known to the database only, skip syncing the session.
+            .execution_options(synchronize_session=False)
+        )
+        # Apply the optional filters, the range includes the whole end date
+        if measurement_id is not None:
+            query = query.where(WeightMeasurement.id == measurement_id)
+        if from_date:
+            query = query.where(WeightMeasurement.date >= from_date)
+        if to_date:
+            query = query.where(WeightMeasurement.date < to_date + timedelta(days=1))
+
+        async with async_session() as session:
+            result = await session.execute(query)
+            await session.commit()
+            return result.rowcount
+
+    async def set_weight_measurement_flags(self, flags: dict[int, bool]) -> None:
+        """Change the outlier flags of weight measurements.
+
+        The rows are updated by a single ``executemany`` of the primary key ``UPDATE``, and their
+        ``updated_at`` is bumped so synchronizing clients learn about the new flags.
+
+        Args:
+            flags (dict[int, bool]): The new flags by the unique IDs of the measurements.
+
+        Returns:
+            None
+        """
+        if not flags:
+            return
+        now = datetime.now()
+        async with async_session() as session:
+            await session.execute(
+                update(WeightMeasurement),
+                [
+                    {"id": measurement_id, "flagged": flagged, "updated_at": now}
+                    for measurement_id, flagged in flags.items()
+                ],
+            )
+            await session.commit()
+
+    async def get_daily_weights(
+        self,
+        user_id: int,
+        timezone: str,
+        unit_factor: float,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ) -> List[dict[str, Any]]:
+        """Aggregate the weight measurements of a user per day of the user's timezone.
+
+        The bucketing and the unit conversion are done by the database, so the rows are ready
+        to be returned without any per-measurement processing. Outliers are skipped.
+
+        Args:
+            user_id (int): The unique ID of the user whose measurements are being aggregated.
+            timezone (str): The IANA name of the timezone defining the user's days.
+            unit_factor (float): The factor converting kilograms to the requested unit.
+            from_date (Optional[date]): The first local day to aggregate.
+            to_date (Optional[date]): The last local day to aggregate, inclusive.
+
+        Returns:
+            List[dict[str, Any]]: The aggregated weights per day, ordered by the day.
+        """
+        # The dates are stored as naive UTC, convert them to the user's local time.
+        local_day = cast(
+            at_time_zone(at_time_zone(WeightMeasurement.date, "UTC"), timezone), Date
+        )
+        weight = WeightMeasurement.weight * unit_factor
+
+        def round_weight(value: ColumnElement) -> ColumnElement:
+            return func.round(cast(value, Numeric), 2)
+
+        def start_of_day(day: date) -> ColumnElement:
+            # The local midnight converted to naive UTC, so the range filter can use the index.
+            midnight = literal(datetime.combine(day, time()), DateTime)
+            return at_time_zone(at_time_zone(midnight, timezone), "UTC")
+
+        query = (
+            select(
+                local_day.label("day"),
+                func.count().label("measurements"),
+                round_weight(func.avg(weight)).label("weight"),
+                round_weight(func.min(weight)).label("min_weight"),
+                round_weight(func.max(weight)).label("max_weight"),
+            )
+            .where(
+                WeightMeasurement.user_id == user_id,
+                WeightMeasurement.deleted_at.is_(None),
+                WeightMeasurement.flagged.is_(False),
+            )
+            .group_by(local_day)
+            .order_by(local_day)
+        )
+        if from_date:
+            query = query.where(WeightMeasurement.date >= start_of_day(from_date))
+        if to_date:
+            query = query.where(
+                WeightMeasurement.date < start_of_day(to_date + timedelta(days=1))
+            )
+
+        async with async_session() as session:
+            result = await session.execute(query)
+            return [dict(row) for row in result.mappings()]
+
+    async def get_weight_summaries(
+        self, user_ids: List[int], from_date: datetime
+    ) -> List[dict[str, Any]]:
+        """Summarize the weight measurements of multiple users within a window in a single query.
+
+        Window functions compute the latest, first, minimal and maximal weight per user, so
+        every row of a user carries the same values and ``DISTINCT`` collapses them into one.
+        Outliers are skipped.
+
+        Args:
+            user_ids (List[int]): The unique IDs of the users to summarize.
+            from_date (datetime): The start of the window.
+
+        Returns:
+            List[dict[str, Any]]: One summary per user with at least one measurement within the window.
+        """
+        user_window = {"partition_by": WeightMeasurement.user_id}
+        newest_first = {**user_window, "order_by": WeightMeasurement.date.desc()}
+        oldest_first = {**user_window, "order_by": WeightMeasurement.date.asc()}
+        query = (
+            select(
+                WeightMeasurement.user_id,
+                func.count().over(**user_window).label("measurements"),
+                func.first_value(WeightMeasurement.date)
+                .over(**newest_first)
+                .label("latest_date"),
+                func.first_value(WeightMeasurement.weight)
+                .over(**newest_first)
+                .label("latest_weight"),
+                func.first_value(WeightMeasurement.date)
+                .over(**oldest_first)
+                .label("first_date"),
+                func.first_value(WeightMeasurement.weight)
+                .over(**oldest_first)
+                .label("first_weight"),
+                func.min(WeightMeasurement.weight)
+                .over(**user_window)
+                .label("min_weight"),
+                func.max(WeightMeasurement.weight)
+                .over(**user_window)
+                .label("max_weight"),
+            )
+            .where(
+                WeightMeasurement.user_id.in_(user_ids),
+                WeightMeasurement.date >= from_date,
+                WeightMeasurement.deleted_at.is_(None),
+                WeightMeasurement.flagged.is_(False),
+            )
+            .distinct()
+        )
+
+        async with async_session() as session:
+            result = await session.execute(query)
+            return [dict(row) for row in result.mappings()]
+
+    async def get_changed_weight_measurements(
+        self,
+        user_id: int,
+        after: Optional[tuple[datetime, int]],
+        limit: int,
+    ) -> List[WeightMeasurement]:
+        """Retrieve the weight measurements of a user modified after the given position, including tombstones.
+
+        The measurements are ordered by ``(updated_at, id)``, so the query is a range scan
+        of the ``(user_id, updated_at, id)`` index regardless of the size of the history.
+
+        Args:
+            user_id (int): The unique ID of the user whose measurements are being retrieved.
+            after (Optional[tuple[datetime, int]]): The modification time and ID of the last seen measurement.
+            limit (int): The maximum number of measurements to retrieve.
+
+        Returns:
+            List[WeightMeasurement]: The modified measurements in the order of their modification.
+        """
+        query = (
+            select(WeightMeasurement)
+            .where(WeightMeasurement.user_id == user_id)
+            .order_by(WeightMeasurement.updated_at, WeightMeasurement.id)
+            .limit(limit)
+        )
+        if after:
+            query = query.where(
+                tuple_(WeightMeasurement.updated_at, WeightMeasurement.id)
+                > tuple_(*after)
+            )
+
+        async with async_session() as session:
+            result = await session.execute(query)
+            return result.scalars().all()
+
 
+measurement_notifications = NotificationHub(
+    "weight_measurement",
+    weight_config.STREAM_MAX_CONNECTIONS,
+    weight_config.STREAM_QUEUE_SIZE,
+)
 repository = WeightRepository()
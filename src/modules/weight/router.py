@@ -1,8 +1,28 @@
 from datetime import date
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 from typing import Optional
-from src.modules.weight.schemas import WeightMeasurementBrief, WeightMeasurementCreate
+from src.exceptions import BadRequest
+from src.modules.jobs.schemas import JobDetail
+from src.modules.weight.constants import (
+    BATCH_MAX_RECORDS,
+    BATCH_MEDIA_TYPE,
+    BATCH_RECORD,
+    IMPORT_MAX_SIZE,
+)
+from src.modules.weight.schemas import (
+    WeightBatchResult,
+    WeightDailySeries,
+    WeightMeasurementBrief,
+    WeightMeasurementCreate,
+    WeightMeasurementDeleteResult,
+    WeightMeasurementUpdate,
+    WeightSummary,
+    WeightSummaryRequest,
+    WeightSyncResponse,
+)
 from src.schemas import ListResponse
+from src.modules.auth.constants import UserRole
 from src.modules.auth.schemas import UserDetail
 from src.modules.auth.dependencies import access_token_validation
 from src.modules.weight.service import service as weight_service
@@ -38,6 +58,31 @@ async def get_weight(
     return ListResponse(items=measurement)
 
 
+@router.get(
+    "/daily",
+    summary="Get daily weights",
+    description="Get weight measurements aggregated per day of the user's timezone, in the user's preferred unit.",
+)
+async def get_daily_weight(
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    user: UserDetail = Depends(access_token_validation()),
+) -> WeightDailySeries:
+    """Retrieve the authenticated user's weight measurements aggregated per local day.
+
+    Args:
+        from_date (Optional[date]): The first day in the user's timezone. Defaults to None.
+        to_date (Optional[date]): The last day in the user's timezone, inclusive. Defaults to None.
+        user (UserDetail): The authenticated user requesting their daily weights.
+
+    Returns:
+        WeightDailySeries: A response containing the daily weights, ready to be rendered.
+    """
+    return await weight_service.get_daily_weights(
+        user.id, user.timezone, user.weight_unit, from_date, to_date
+    )
+
+
 @router.post(
     "/",
     summary="Create a weight measurement",
@@ -58,3 +103,258 @@ async def create_weight_measurement(
     """
     # Save the weight measurement using the weight service
     return await weight_service.save_weight_measurement(user.id, measurement)
+
+
+@router.post(
+    "/batch",
+    summary="Create a batch of weight measurements",
+    description="Create many weight measurements for the authenticated user from a compact binary body, "
+    f"intended for scale gateways. The body consists of {BATCH_RECORD.itemsize}-byte little-endian records "
+    "of the UTC date in seconds since the epoch (int64) and the weight in kilograms (float32), "
+    f"at most {BATCH_MAX_RECORDS} records.",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                BATCH_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}
+            },
+        }
+    },
+)
+async def create_weight_measurement_batch(
+    request: Request,
+    user: UserDetail = Depends(access_token_validation()),
+) -> WeightBatchResult:
+    """Create a batch of weight measurements for the authenticated user.
+
+    Args:
+        request (Request): The request with the packed records as its body.
+        user (UserDetail): The authenticated user creating the weight measurements.
+
+    Returns:
+        WeightBatchResult: A response containing the number of saved and flagged measurements.
+
+    Raises:
+        BadRequest: If the batch is too large.
+    """
+    # Stop reading once the limit is exceeded, instead of buffering an arbitrarily large body
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > BATCH_MAX_RECORDS * BATCH_RECORD.itemsize:
+            raise BadRequest("The batch is too large")
+    return await weight_service.save_weight_measurement_batch(user.id, body)
+
+
+@router.post(
+    "/import",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Import weight measurements",
+    description="Import weight measurements from a CSV file with the `date` and `weight` columns. "
+    "The file is imported in the background, poll the returned job for the result.",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/csv": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_weight_measurements(
+    request: Request,
+    user: UserDetail = Depends(access_token_validation()),
+) -> JobDetail:
+    """Enqueue the import of weight measurements for the authenticated user.
+
+    Args:
+        request (Request): The request with the CSV file as its body.
+        user (UserDetail): The authenticated user importing the weight measurements.
+
+    Returns:
+        JobDetail: A response containing the import job, processed by a job worker.
+
+    Raises:
+        BadRequest: If the file is too large or isn't UTF-8 encoded.
+    """
+    # Stop reading once the limit is exceeded, instead of buffering an arbitrarily large body
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > IMPORT_MAX_SIZE:
+            raise BadRequest("The imported file is too large")
+    try:
+        content = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BadRequest("The imported file must be UTF-8 encoded")
+    # Parsing and inserting a large file could exceed the request timeout, a job worker does it
+    return await weight_service.enqueue_import(user.id, content)
+
+
+@router.post(
+    "/rescore",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Re-score weight measurements for outliers",
+    description="Re-score all weight measurements of the authenticated user for outliers, e.g. after "
+    "the detection settings changed. The measurements are scored in the background, poll the returned job for the result.",
+)
+async def rescore_weight_measurements(
+    user: UserDetail = Depends(access_token_validation()),
+) -> JobDetail:
+    """Enqueue the re-scoring of the authenticated user's weight measurements.
+
+    Args:
+        user (UserDetail): The authenticated user whose weight measurements are re-scored.
+
+    Returns:
+        JobDetail: A response containing the re-scoring job, processed by a job worker.
+    """
+    return await weight_service.enqueue_rescore(user.id)
+
+
+@router.delete(
+    "/",
+    summary="Delete weight measurements within a date range",
+    description="Delete all weight measurements of the authenticated user within the specified date range.",
+)
+async def delete_weight_measurements(
+    from_date: date,
+    to_date: date,
+    user: UserDetail = Depends(access_token_validation()),
+) -> WeightMeasurementDeleteResult:
+    """Delete the authenticated user's weight measurements within a date range.
+
+    Args:
+        from_date (date): The start date of the deleted range.
+        to_date (date): The end date of the deleted range.
+        user (UserDetail): The authenticated user deleting their weight measurements.
+
+    Returns:
+        WeightMeasurementDeleteResult: A response containing the number of deleted measurements.
+    """
+    deleted = await weight_service.delete_weight_measurements(
+        user.id, from_date, to_date
+    )
+    return WeightMeasurementDeleteResult(deleted=deleted)
+
+
+@router.patch(
+    "/{measurement_id}",
+    summary="Update a weight measurement",
+    description="Update the date or the weight of a weight measurement of the authenticated user.",
+)
+async def update_weight_measurement(
+    measurement_id: int,
+    measurement: WeightMeasurementUpdate,
+    user: UserDetail = Depends(access_token_validation()),
+) -> WeightMeasurementBrief:
+    """Update a weight measurement of the authenticated user.
+
+    Args:
+        measurement_id (int): The unique ID of the updated measurement.
+        measurement (WeightMeasurementUpdate): The changed fields of the weight measurement.
+        user (UserDetail): The authenticated user updating the weight measurement.
+
+    Returns:
+        WeightMeasurementBrief: A response containing the updated weight measurement.
+    """
+    return await weight_service.update_weight_measurement(
+        user.id, measurement_id, measurement
+    )
+
+
+@router.delete(
+    "/{measurement_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a weight measurement",
+    description="Delete a weight measurement of the authenticated user.",
+)
+async def delete_weight_measurement(
+    measurement_id: int,
+    user: UserDetail = Depends(access_token_validation()),
+) -> None:
+    """Delete a weight measurement of the authenticated user.
+
+    Args:
+        measurement_id (int): The unique ID of the deleted measurement.
+        user (UserDetail): The authenticated user deleting the weight measurement.
+
+    Returns:
+        None
+    """
+    await weight_service.delete_weight_measurement(user.id, measurement_id)
+
+
+@router.get(
+    "/sync",
+    summary="Synchronize weight measurements",
+    description="Get the weight measurements created, updated or deleted since the cursor returned by the previous synchronization.",
+)
+async def sync_weight(
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    user: UserDetail = Depends(access_token_validation()),
+) -> WeightSyncResponse:
+    """Retrieve the changes of the authenticated user's weight measurements since the cursor.
+
+    Args:
+        cursor (Optional[str]): The cursor returned by the previous synchronization. Defaults to None, fetching everything.
+        limit (int): The maximum number of changes to return. Defaults to 500.
+        user (UserDetail): The authenticated user synchronizing their weight measurements.
+
+    Returns:
+        WeightSyncResponse: A response containing the changes and the cursor of the next synchronization.
+    """
+    # Fetch only the changes since the cursor, so the traffic is proportional to the changes, not the history
+    return await weight_service.sync_weight_measurements(user.id, cursor, limit)
+
+
+@router.get(
+    "/stream",
+    summary="Stream new weight measurements",
+    description="Stream the weight measurements created by the authenticated user as server-sent events, "
+    "so dashboards don't have to poll. Batches and imports send a single `sync` event instead of one "
+    "event per measurement. Missed events can be fetched through the synchronization.",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_weight(
+    user: UserDetail = Depends(access_token_validation()),
+) -> StreamingResponse:
+    """Stream the new weight measurements of the authenticated user.
+
+    Args:
+        user (UserDetail): The authenticated user subscribing to their weight measurements.
+
+    Returns:
+        StreamingResponse: The ``text/event-stream`` response with a ``measurement`` event per new measurement
+            and a ``sync`` event per batch.
+    """
+    events = weight_service.stream_weight_measurements(user.id)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Reverse proxies must not buffer the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/summaries",
+    summary="Get weight summaries of multiple users",
+    description="Get the latest weight and the change within a recent window for multiple users. Requires the coach role.",
+)
+async def get_weight_summaries(
+    body: WeightSummaryRequest,
+    _: UserDetail = Depends(access_token_validation(required_roles=[UserRole.COACH])),
+) -> ListResponse[WeightSummary]:
+    """Summarize the recent weight measurements of the requested users.
+
+    Args:
+        body (WeightSummaryRequest): The IDs of the users and the length of the window in days.
+        _ (UserDetail): The authenticated coach requesting the summaries.
+
+    Returns:
+        ListResponse[WeightSummary]: A response containing one summary per requested user.
+    """
+    # Summarize all requested users at once using the weight service
+    summaries = await weight_service.get_weight_summaries(body.user_ids, body.days)
+    return ListResponse(items=summaries)
@@ -1,4 +1,7 @@
 import datetime
+from typing import Optional
+from pydantic import Field, model_validator
+from src.modules.auth.constants import WeightUnit
 from src.modules.weight.models import WeightMeasurement
 from src.schemas import CustomSchema
 
@@ -7,12 +10,16 @@ class WeightMeasurementBrief(CustomSchema):
     """Schema representing information about a weight measurement.
 
     Attributes:
+        id (int): The unique ID of the weight measurement.
         date (datetime.datetime): The date of the weight measurement.
         weight (float): The weight value recorded by the user.
+        flagged (bool): Whether the measurement is an outlier, excluded from analytics.
     """
 
+    id: int
     date: datetime.datetime
     weight: float
+    flagged: bool
 
     @staticmethod
     def from_model(measurement: WeightMeasurement) -> "WeightMeasurementBrief":
@@ -25,8 +32,10 @@ class WeightMeasurementBrief(CustomSchema):
             WeightMeasurementBrief: A brief representation of the weight measurement.
         """
         return WeightMeasurementBrief(
+            id=measurement.id,
             date=measurement.date,
             weight=measurement.weight,
+            flagged=measurement.flagged,
         )
 
 
@@ -40,3 +49,173 @@ class WeightMeasurementCreate(CustomSchema):
 
     date: datetime.datetime
     weight: float
+
+
+class WeightMeasurementUpdate(CustomSchema):
+    """Schema representing a partial update of a weight measurement.
+
+    Attributes:
+        date (Optional[datetime.datetime]): The new date of the weight measurement.
+        weight (Optional[float]): The new weight value.
+    """
+
+    date: Optional[datetime.datetime] = None
+    weight: Optional[float] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "WeightMeasurementUpdate":
+        """Reject updates without any changed field, they would only bump the modification time.
+
+        Returns:
+            WeightMeasurementUpdate: The validated update.
+
+        Raises:
+            ValueError: If no field is provided.
+        """
+        if self.date is None and self.weight is None:
+            raise ValueError("At least one of date and weight must be provided")
+        return self
+
+
+class WeightMeasurementDeleteResult(CustomSchema):
+    """Schema representing the result of a bulk deletion of weight measurements.
+
+    Attributes:
+        deleted (int): The number of deleted weight measurements.
+    """
+
+    deleted: int
+
+
+class WeightBatchResult(CustomSchema):
+    """Schema representing the result of saving a binary batch of weight measurements.
+
+    Attributes:
+        saved (int): The number of saved weight measurements.
+        flagged (int): The number of saved weight measurements flagged as outliers.
+    """
+
+    saved: int
+    flagged: int
+
+
+class WeightSummaryRequest(CustomSchema):
+    """Schema representing a request for weight summaries of multiple users.
+
+    Attributes:
+        user_ids (list[int]): The IDs of the users to summarize.
+        days (int): The length of the summarized window in days, ending now.
+    """
+
+    user_ids: list[int] = Field(..., min_length=1, max_length=1000)
+    days: int = Field(30, ge=1, le=366)
+
+
+class WeightSummary(CustomSchema):
+    """Schema representing a summary of a user's weight measurements within a window.
+
+    The weight fields are empty if the user has no measurements within the window.
+
+    Attributes:
+        user_id (int): The ID of the summarized user.
+        measurements (int): The number of measurements within the window.
+        latest_date (Optional[datetime.datetime]): The date of the latest measurement.
+        latest_weight (Optional[float]): The latest weight.
+        first_date (Optional[datetime.datetime]): The date of the first measurement within the window.
+        first_weight (Optional[float]): The first weight within the window.
+        min_weight (Optional[float]): The minimal weight within the window.
+        max_weight (Optional[float]): The maximal weight within the window.
+        change (Optional[float]): The difference between the latest and the first weight.
+    """
+
+    user_id: int
+    measurements: int = 0
+    latest_date: Optional[datetime.datetime] = None
+    latest_weight: Optional[float] = None
+    first_date: Optional[datetime.datetime] = None
+    first_weight: Optional[float] = None
+    min_weight: Optional[float] = None
+    max_weight: Optional[float] = None
+    change: Optional[float] = None
+
+
+class WeightMeasurementChange(CustomSchema):
+    """Schema representing a created, updated or deleted weight measurement.
+
+    Attributes:
+        id (int): The unique ID of the weight measurement.
+        date (datetime.datetime): The date of the weight measurement.
+        weight (float): The weight value recorded by the user.
+        flagged (bool): Whether the measurement is an outlier, excluded from analytics.
+        deleted (bool): Whether the measurement was deleted and should be removed by the client.
+    """
+
+    id: int
+    date: datetime.datetime
+    weight: float
+    flagged: bool
+    deleted: bool
+
+    @staticmethod
+    def from_model(measurement: WeightMeasurement) -> "WeightMeasurementChange":
+        """Convert a weight measurement model instance into a change representation.
+
+        Args:
+            measurement (WeightMeasurement): The weight measurement model instance.
+
+        Returns:
+            WeightMeasurementChange: A change representation of the weight measurement.
+        """
+        return WeightMeasurementChange(
+            id=measurement.id,
+            date=measurement.date,
+            weight=measurement.weight,
+            flagged=measurement.flagged,
+            deleted=measurement.deleted_at is not None,
+        )
+
+
+class WeightSyncResponse(CustomSchema):
+    """Schema representing a page of weight measurement changes.
+
+    Attributes:
+        items (list[WeightMeasurementChange]): The changes in the order of their modification.
+        cursor (Optional[str]): The cursor to pass to the next synchronization, if any change was seen.
+        has_more (bool): Whether more changes are available right away.
+    """
+
+    items: list[WeightMeasurementChange]
+    cursor: Optional[str] = None
+    has_more: bool
+
+
+class WeightDailyBucket(CustomSchema):
+    """Schema representing the weight measurements of a single day.
+
+    Attributes:
+        day (datetime.date): The day in the user's timezone.
+        measurements (int): The number of measurements within the day.
+        weight (float): The average weight of the day.
+        min_weight (float): The minimal weight of the day.
+        max_weight (float): The maximal weight of the day.
+    """
+
+    day: datetime.date
+    measurements: int
+    weight: float
+    min_weight: float
+    max_weight: float
+
+
+class WeightDailySeries(CustomSchema):
+    """Schema representing the weight measurements of a user aggregated per day.
+
+    Attributes:
+        timezone (str): The IANA name of the timezone defining the days.
+        unit (WeightUnit): The unit of the weights.
+        items (list[WeightDailyBucket]): The aggregated weights, ordered by the day.
+    """
+
+    timezone: str
+    unit: WeightUnit
+    items: list[WeightDailyBucket]
@@ -1,10 +1,50 @@
-from datetime import date
-from typing import List, Optional
-from src.modules.weight.schemas import WeightMeasurementCreate, WeightMeasurementBrief
-from src.modules.weight.repository import repository as weight_repository
+import asyncio
+import csv
+import io
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, List, Optional
+import numpy as np
+from pydantic import ValidationError
+from src.exceptions import BadRequest, NotFound, ServiceUnavailable
+from src.modules.auth.constants import WeightUnit
+from src.modules.goals.service import service as goal_service
+from src.modules.jobs.schemas import JobDetail
+from src.modules.jobs.service import service as job_service
+from src.modules.weight.constants import (
+    BATCH_DATE_RANGE,
+    BATCH_RECORD,
+    IMPORT_JOB_TYPE,
+    RESCORE_JOB_TYPE,
+    WEIGHT_UNIT_FACTORS,
+)
+from src.modules.weight.schemas import (
+    WeightBatchResult,
+    WeightDailyBucket,
+    WeightDailySeries,
+    WeightMeasurementChange,
+    WeightMeasurementCreate,
+    WeightMeasurementBrief,
+    WeightMeasurementUpdate,
+    WeightSummary,
+    WeightSyncResponse,
+)
+from src.modules.weight.config import weight_config
+from src.modules.weight.outliers import find_outliers, outlier_detector
+from src.modules.weight.repository import (
+    measurement_notifications,
+    repository as weight_repository,
+)
+from src.utils.cursor_utils import decode_cursor, encode_cursor
+from src.utils.trace_utils import traced_methods
 
 
+@traced_methods
 class WeightService:
+    # Changes made within this interval are sent again by the next synchronization. Modification
+    # times come from the workers' clocks and become visible only once their transaction commits,
+    # so a row may appear with an ``updated_at`` older than the newest one already sent.
+    SYNC_OVERLAP = timedelta(seconds=5)
+
     async def get_weight_measurements(
         self,
         user_id: int,
@@ -33,6 +73,9 @@ class WeightService:
     ) -> WeightMeasurementBrief:
         """Save a new weight measurement for a user.
 
+        An implausible weight, e.g. a garbage reading of a scale, is saved flagged as an outlier
+        and doesn't count towards the goal.
+
         Args:
             user_id (int): The unique ID of the user for whom the measurement is being saved.
             data (WeightMeasurementCreate): The Pydantic schema object representing the new measurement data.
@@ -40,9 +83,384 @@ class WeightService:
         Returns:
             WeightMeasurementBrief: The newly created weight measurement, formatted as a brief response.
         """
+        # Score against the user's recent weights held in memory, not a query of the history
+        [flagged] = await outlier_detector.score(user_id, [data.weight])
         # Save the weight measurement using the repository and return it as a brief schema object
-        measurement = await weight_repository.save_weight_measurement(user_id, data)
+        measurement = await weight_repository.save_weight_measurement(
+            user_id, data, flagged
+        )
+        if not flagged:
+            # Advance the goal incrementally instead of recomputing it from the history on every read
+            await goal_service.record_measurements(
+                user_id, [(measurement.date, measurement.weight)]
+            )
+        return WeightMeasurementBrief.from_model(measurement)
+
+    async def save_weight_measurement_batch(
+        self, user_id: int, body: bytes
+    ) -> WeightBatchResult:
+        """Save a binary batch of new weight measurements for a user.
+
+        The records are decoded without copying and validated as whole arrays, instead of
+        parsing and validating a schema object per measurement. Outliers are flagged the same
+        way as for single measurements, in the order of the dates.
+
+        Args:
+            user_id (int): The unique ID of the user for whom the measurements are being saved.
+            body (bytes): The packed little-endian records of the measurements.
+
+        Returns:
+            WeightBatchResult: The number of saved and flagged measurements.
+
+        Raises:
+            BadRequest: If the body isn't a whole number of records or a record is invalid.
+        """
+        if len(body) % BATCH_RECORD.itemsize:
+            raise BadRequest(
+                f"The batch must consist of {BATCH_RECORD.itemsize}-byte records"
+            )
+        records = np.frombuffer(body, dtype=BATCH_RECORD)
+        if not len(records):
+            return WeightBatchResult(saved=0, flagged=0)
+        # Gateways may forward the readings of several scales interleaved, sorting copies the records
+        if (np.diff(records["date"]) < 0).any():
+            records = records[np.argsort(records["date"], kind="stable")]
+        dates, weights = records["date"], records["weight"]
+
+        invalid = (
+            (dates < BATCH_DATE_RANGE[0])
+            | (dates > BATCH_DATE_RANGE[1])
+            | ~np.isfinite(weights)
+        )
+        if invalid.any():
+            raise BadRequest(
+                f"The batch has {np.count_nonzero(invalid)} invalid records"
+            )
+
+        # Round away the float32 noise, e.g. 80.1 is stored as 80.09999847
+        weights = np.round(weights.astype(np.float64), 2).tolist()
+        # Whole seconds convert to naive UTC datetimes without microseconds
+        dates = dates.astype("datetime64[s]").tolist()
+        flags = await outlier_detector.score(user_id, weights)
+        saved = await weight_repository.save_weight_measurements(
+            user_id, dates, weights, flags
+        )
+        await goal_service.record_measurements(
+            user_id,
+            [(d, w) for d, w, flagged in zip(dates, weights, flags) if not flagged],
+        )
+        return WeightBatchResult(saved=saved, flagged=sum(flags))
+
+    def stream_weight_measurements(self, user_id: int) -> AsyncIterator[str]:
+        """Subscribe to the new weight measurements of a user as a stream of server-sent events.
+
+        Args:
+            user_id (int): The unique ID of the user whose new measurements are streamed.
+
+        Returns:
+            AsyncIterator[str]: The events, a ``measurement`` event per saved measurement and a
+                ``sync`` event per bulk save, whose measurements are fetched through the
+                synchronization. The stream ends when the subscriber falls behind or the worker
+                shuts down.
+
+        Raises:
+            ServiceUnavailable: If the worker has no free stream slot.
+        """
+        # Subscribe before the response starts, so a full worker can still answer with an error
+        queue = measurement_notifications.subscribe(user_id)
+        if queue is None:
+            raise ServiceUnavailable(
+                "Too many open streams", weight_config.STREAM_RETRY_AFTER
+            )
+        return self._stream_events(user_id, queue)
+
+    async def _stream_events(
+        self, user_id: int, queue: asyncio.Queue
+    ) -> AsyncIterator[str]:
+        try:
+            yield f"retry: {weight_config.STREAM_RETRY_AFTER * 1000}\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(
+                        queue.get(), weight_config.STREAM_HEARTBEAT_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    # Keep idle connections from being closed by proxies
+                    yield ": heartbeat\n\n"
+                    continue
+                if payload is None:
+                    return
+                event, _, data = payload.partition(":")
+                yield f"event: {event}\ndata: {data}\n\n"
+        finally:
+            measurement_notifications.unsubscribe(user_id, queue)
+
+    async def enqueue_import(self, user_id: int, content: str) -> JobDetail:
+        """Enqueue the import of weight measurements from a CSV file as a background job.
+
+        Args:
+            user_id (int): The unique ID of the user importing the measurements.
+            content (str): The CSV file with the ``date`` and ``weight`` columns.
+
+        Returns:
+            JobDetail: The status of the enqueued import job.
+        """
+        return await job_service.enqueue(user_id, IMPORT_JOB_TYPE, {"csv": content})
+
+    async def import_weight_measurements(self, user_id: int, content: str) -> int:
+        """Import weight measurements of a user from a CSV file.
+
+        All rows are validated before any measurement is saved, so a failed import saves nothing.
+        Imported files usually backfill older history, so the whole history is re-scored for
+        outliers afterwards instead of scoring the rows against the latest weights.
+
+        Args:
+            user_id (int): The unique ID of the user importing the measurements.
+            content (str): The CSV file with the ``date`` and ``weight`` columns.
+
+        Returns:
+            int: The number of imported measurements.
+
+        Raises:
+            ValueError: If the file is missing a column or a row is invalid.
+        """
+        reader = csv.DictReader(io.StringIO(content))
+        missing = {"date", "weight"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+
+        measurements = []
+        for row in reader:
+            try:
+                measurements.append(
+                    WeightMeasurementCreate(date=row["date"], weight=row["weight"])
+                )
+            except ValidationError as e:
+                errors = "; ".join(error["msg"] for error in e.errors())
+                raise ValueError(f"Invalid row on line {reader.line_num}: {errors}")
+        # Insert the whole file with a single bulk statement and update the goal once
+        imported = await weight_repository.save_weight_measurements(
+            user_id,
+            [m.date for m in measurements],
+            [m.weight for m in measurements],
+            [False] * len(measurements),
+        )
+        await self.rescore_weight_measurements(user_id)
+        return imported
+
+    async def enqueue_rescore(self, user_id: int) -> JobDetail:
+        """Enqueue the re-scoring of a user's weight measurements for outliers as a background job.
+
+        Args:
+            user_id (int): The unique ID of the user whose measurements are re-scored.
+
+        Returns:
+            JobDetail: The status of the enqueued job.
+        """
+        return await job_service.enqueue(user_id, RESCORE_JOB_TYPE, {})
+
+    async def rescore_weight_measurements(self, user_id: int) -> int:
+        """Re-score the whole history of a user for outliers and update the changed flags.
+
+        Args:
+            user_id (int): The unique ID of the user whose measurements are re-scored.
+
+        Returns:
+            int: The number of measurements whose flag changed.
+        """
+        history = await weight_repository.get_weight_history(user_id)
+        if not history:
+            return 0
+        ids, weights, flags = zip(*history)
+        # Score all measurements in a single vectorized pass instead of one window at a time
+        outliers = find_outliers(np.array(weights, dtype=np.float64))
+        changes = {
+            measurement_id: bool(outlier)
+            for measurement_id, flagged, outlier in zip(ids, flags, outliers)
+            if flagged != outlier
+        }
+        await weight_repository.set_weight_measurement_flags(changes)
+        outlier_detector.invalidate(user_id)
+        await goal_service.rebuild(user_id)
+        return len(changes)
+
+    async def update_weight_measurement(
+        self, user_id: int, measurement_id: int, data: WeightMeasurementUpdate
+    ) -> WeightMeasurementBrief:
+        """Update a weight measurement of a user.
+
+        Args:
+            user_id (int): The unique ID of the user owning the measurement.
+            measurement_id (int): The unique ID of the measurement.
+            data (WeightMeasurementUpdate): The Pydantic schema object representing the changed fields.
+
+        Returns:
+            WeightMeasurementBrief: The updated weight measurement, formatted as a brief response.
+
+        Raises:
+            NotFound: If the user has no such measurement.
+        """
+        measurement = await weight_repository.update_weight_measurement(
+            user_id, measurement_id, data
+        )
+        if not measurement:
+            raise NotFound("Weight measurement not found")
+        outlier_detector.invalidate(user_id)
+        await goal_service.rebuild(user_id)
         return WeightMeasurementBrief.from_model(measurement)
 
+    async def delete_weight_measurement(
+        self, user_id: int, measurement_id: int
+    ) -> None:
+        """Delete a weight measurement of a user.
+
+        Args:
+            user_id (int): The unique ID of the user owning the measurement.
+            measurement_id (int): The unique ID of the measurement.
+
+        Returns:
+            None
+
+        Raises:
+            NotFound: If the user has no such measurement.
+        """
+        deleted = await weight_repository.delete_weight_measurements(
+            user_id, measurement_id=measurement_id
+        )
+        if not deleted:
+            raise NotFound("Weight measurement not found")
+        outlier_detector.invalidate(user_id)
+        await goal_service.rebuild(user_id)
+
+    async def delete_weight_measurements(
+        self, user_id: int, from_date: date, to_date: date
+    ) -> int:
+        """Delete all weight measurements of a user within a date range.
+
+        Args:
+            user_id (int): The unique ID of the user owning the measurements.
+            from_date (date): The start date of the deleted range.
+            to_date (date): The end date of the deleted range.
+
+        Returns:
+            int: The number of deleted measurements.
+
+        Raises:
+            BadRequest: If the range ends before it starts.
+        """
+        if to_date < from_date:
+            raise BadRequest("The end of the range precedes its start")
+        # Delete the whole range with a single statement instead of one per measurement
+        deleted = await weight_repository.delete_weight_measurements(
+            user_id, from_date=from_date, to_date=to_date
+        )
+        if deleted:
+            outlier_detector.invalidate(user_id)
+            await goal_service.rebuild(user_id)
+        return deleted
+
+    async def get_daily_weights(
+        self,
+        user_id: int,
+        timezone: str,
+        unit: WeightUnit,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ) -> WeightDailySeries:
+        """Retrieve the weight measurements of a user aggregated per day of the user's timezone.
+
+        Args:
+            user_id (int): The unique ID of the user whose measurements are being aggregated.
+            timezone (str): The IANA name of the timezone defining the user's days.
+            unit (WeightUnit): The unit of the returned weights.
+            from_date (Optional[date]): The first local day to aggregate.
+            to_date (Optional[date]): The last local day to aggregate, inclusive.
+
+        Returns:
+            WeightDailySeries: The aggregated weights per day, ordered by the day.
+        """
+        # Bucket and convert the measurements in the database, the rows map directly to the response
+        rows = await weight_repository.get_daily_weights(
+            user_id, timezone, WEIGHT_UNIT_FACTORS[unit], from_date, to_date
+        )
+        return WeightDailySeries(
+            timezone=timezone,
+            unit=unit,
+            items=[WeightDailyBucket(**row) for row in rows],
+        )
+
+    async def get_weight_summaries(
+        self, user_ids: List[int], days: int
+    ) -> List[WeightSummary]:
+        """Summarize the recent weight measurements of multiple users.
+
+        Args:
+            user_ids (List[int]): The unique IDs of the users to summarize.
+            days (int): The length of the summarized window in days, ending now.
+
+        Returns:
+            List[WeightSummary]: One summary per requested user, in the requested order.
+        """
+        # Fetch the summaries of all users with a single query instead of one query per user
+        rows = await weight_repository.get_weight_summaries(
+            user_ids, datetime.now() - timedelta(days=days)
+        )
+        rows_by_user = {row["user_id"]: row for row in rows}
+
+        summaries = []
+        for user_id in dict.fromkeys(user_ids):
+            row = rows_by_user.get(user_id)
+            # Users without measurements within the window get an empty summary
+            if not row:
+                summaries.append(WeightSummary(user_id=user_id))
+                continue
+            change = round(row["latest_weight"] - row["first_weight"], 2)
+            summaries.append(WeightSummary(**row, change=change))
+        return summaries
+
+    async def sync_weight_measurements(
+        self, user_id: int, cursor: Optional[str], limit: int
+    ) -> WeightSyncResponse:
+        """Retrieve the weight measurements of a user created, updated or deleted since the cursor.
+
+        Args:
+            user_id (int): The unique ID of the user whose measurements are being synchronized.
+            cursor (Optional[str]): The cursor returned by the previous synchronization, or None to fetch everything.
+            limit (int): The maximum number of changes to return.
+
+        Returns:
+            WeightSyncResponse: The changes and the cursor of the next synchronization.
+
+        Raises:
+            BadRequest: If the cursor is malformed.
+        """
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise BadRequest("Invalid sync cursor")
+
+        # Fetch one extra measurement to find out whether another page follows
+        measurements = await weight_repository.get_changed_weight_measurements(
+            user_id, after, limit + 1
+        )
+        has_more = len(measurements) > limit
+        measurements = measurements[:limit]
+        if not measurements:
+            return WeightSyncResponse(items=[], cursor=cursor, has_more=False)
+
+        position = (measurements[-1].updated_at, measurements[-1].id)
+        # On the last page, hold the cursor back so changes still being committed aren't skipped;
+        # the client receives the recent changes again and applies them idempotently
+        if not has_more:
+            position = min(position, (datetime.now() - self.SYNC_OVERLAP, 0))
+            if after:
+                position = max(position, after)
+
+        return WeightSyncResponse(
+            items=[WeightMeasurementChange.from_model(m) for m in measurements],
+            cursor=encode_cursor(*position),
+            has_more=has_more,
+        )
+
 
 service = WeightService()
@@ -0,0 +1,139 @@
+"""Generate the OpenAPI schema of the application to a file, served by the workers as it is.
+
+Usage:
+    python -m src.openapi --output openapi.json
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi import FastAPI
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, Response
+
+logger = logging.getLogger(__name__)
+
+
+class StaticOpenAPI:
+    """Serves the OpenAPI schema of an application as precomputed bytes.
+
+    FastAPI generates the schema on the first request for it in every worker and encodes it to
+    JSON on every request. The schema is instead read from the file written by the build step,
+    or generated once if there's no such file, and the bytes are sent as they are.
+
+    Attributes:
+        app (FastAPI): The documented application.
+        path (Optional[str]): The path of the precomputed schema file.
+    """
+
+    def __init__(self, app: FastAPI, path: Optional[str] = None) -> None:
+        self.app = app
+        self.path = path
+        self._body: Optional[bytes] = None
+
+    def load(self) -> bytes:
+        """Load the schema, from the precomputed file if there is one, unless already loaded.
+
+        Returns:
+            bytes: The JSON encoded schema.
+        """
+        if self._body is None:
+            if self.path and Path(self.path).is_file():
+                self._body = Path(self.path).read_bytes()
+            else:
+                if self.path:
+                    logger.warning(
+                        "The OpenAPI schema file %s is missing, generating the schema",
+                        self.path,
+                    )
+                self._body = encode_schema(self.app.openapi())
+        return self._body
+
+    async def endpoint(self, _: Request) -> Response:
+        """Serve the schema.
+
+        Returns:
+            Response: The JSON encoded schema.
+        """
+        return Response(self.load(), media_type="application/json")
+
+
+def encode_schema(schema: dict[str, Any]) -> bytes:
+    """Encode a schema to compact JSON.
+
+    Args:
+        schema (dict[str, Any]): The OpenAPI schema.
+
+    Returns:
+        bytes: The encoded schema.
+    """
+    return json.dumps(schema, separators=(",", ":")).encode()
+
+
+def setup_docs(
+    app: FastAPI,
+    openapi_url: str,
+    docs_url: Optional[str],
+    redoc_url: Optional[str],
+    schema_path: Optional[str] = None,
+) -> StaticOpenAPI:
+    """Serve the schema and the interactive docs of an application created without them.
+
+    Args:
+        app (FastAPI): The application, created with ``openapi_url=None``.
+        openapi_url (str): The path of the schema.
+        docs_url (Optional[str]): The path of the Swagger UI, None to disable it.
+        redoc_url (Optional[str]): The path of ReDoc, None to disable it.
+        schema_path (Optional[str]): The path of the precomputed schema file.
+
+    Returns:
+        StaticOpenAPI: The served schema.
+    """
+    schema = StaticOpenAPI(app, schema_path)
+    app.add_route(openapi_url, schema.endpoint, include_in_schema=False)
+
+    def get_schema_url(request: Request) -> str:
+        # Behind a proxy mounting the application on a sub-path, like FastAPI's own docs
+        return request.scope.get("root_path", "").rstrip("/") + openapi_url
+
+    if docs_url:
+
+        async def swagger_ui(request: Request) -> HTMLResponse:
+            return get_swagger_ui_html(
+                openapi_url=get_schema_url(request), title=f"{app.title} - Swagger UI"
+            )
+
+        app.add_route(docs_url, swagger_ui, include_in_schema=False)
+
+    if redoc_url:
+
+        async def redoc(request: Request) -> HTMLResponse:
+            return get_redoc_html(
+                openapi_url=get_schema_url(request), title=f"{app.title} - ReDoc"
+            )
+
+        app.add_route(redoc_url, redoc, include_in_schema=False)
+
+    return schema
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="openapi.json")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from src.main import app
+
+    args = parse_args()
+    Path(args.output).write_bytes(encode_schema(app.openapi()))
@@ -0,0 +1,156 @@
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Compression levels trading a little ratio for speed, the responses are compressed on the fly.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+class Compressor:
+    """Base class of incremental compressors of a single response body."""
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress the next chunk of the body.
+
+        Args:
+            data (bytes): The chunk of the body.
+            final (bool): Whether the chunk is the last one, finishing the compressed stream.
+
+        Returns:
+            bytes: The compressed data that can be sent right away.
+        """
+        raise NotImplementedError
+
+
+class GzipCompressor(Compressor):
+    def __init__(self) -> None:
+        # wbits=31 produces the gzip container instead of raw zlib data.
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+class BrotliCompressor(Compressor):
+    def __init__(self) -> None:
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        compressed = self._compressor.process(data)
+        if final:
+            return compressed + self._compressor.finish()
+        return compressed + self._compressor.flush()
+
+
+class ZstdCompressor(Compressor):
+    def __init__(self) -> None:
+        import zstandard
+
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        compressed = self._compressor.compress(data)
+        if final:
+            return compressed + self._compressor.flush()
+        return compressed + self._compressor.flush(self._flush_block)
+
+
+def _is_installed(module: str) -> bool:
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+# Supported encodings and their compressors. Brotli and zstd require the optional `brotli`
+# and `zstandard` packages and are only offered when installed.
+COMPRESSORS: dict[str, Callable[[], Compressor]] = {"gzip": GzipCompressor}
+if _is_installed("brotli"):
+    COMPRESSORS["br"] = BrotliCompressor
+if _is_installed("zstandard"):
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+
+def negotiate_encoding(accept_encoding: str, preferred: list[str]) -> Optional[str]:
+    """Choose the content encoding of a response from the ``Accept-Encoding`` request header.
+
+    Args:
+        accept_encoding (str): The value of the ``Accept-Encoding`` header.
+        preferred (list[str]): The available encodings in the order of the server's preference.
+
+    Returns:
+        Optional[str]: The encoding with the highest quality value accepted by the client, ties
+            broken by the server's preference, or None if the response should stay uncompressed.
+    """
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        if name:
+            qualities[name.strip()] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    candidates = [
+        (qualities.get(encoding, wildcard), -index, encoding)
+        for index, encoding in enumerate(preferred)
+    ]
+    quality, _, encoding = max(candidates, default=(0.0, 0, None))
+    return encoding if quality > 0 else None
+
+
+class CompressedBodyCache:
+    """An LRU cache of compressed response bodies bounded by their total size.
+
+    Entries are keyed by the encoding and a digest of the uncompressed body, so hot payloads
+    (e.g. the same weight series requested repeatedly) are compressed once. Hashing is an order
+    of magnitude cheaper than compressing.
+
+    Attributes:
+        max_bytes (int): The maximum total size of the cached compressed bodies.
+        size (int): The current total size of the cached compressed bodies.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        """Return the compressed body, compressing it only if it isn't cached yet.
+
+        Args:
+            encoding (str): The content encoding.
+            body (bytes): The complete uncompressed body.
+
+        Returns:
+            bytes: The compressed body.
+        """
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self._entries.move_to_end(key)
+            return compressed
+
+        compressed = COMPRESSORS[encoding]().compress(body, final=True)
+        # Bodies taking a large share of the cache would only evict the hot entries.
+        if len(compressed) <= self.max_bytes // 8:
+            self._entries[key] = compressed
+            self.size += len(compressed)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return compressed
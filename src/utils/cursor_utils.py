@@ -0,0 +1,38 @@
+import base64
+import binascii
+import datetime
+
+
+def encode_cursor(updated_at: datetime.datetime, id: int) -> str:
+    """Encode the position of a row in an ``(updated_at, id)`` ordering as an opaque cursor.
+
+    Args:
+        updated_at (datetime.datetime): The last modification time of the row.
+        id (int): The unique ID of the row, breaking ties between rows modified at the same time.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    value = f"{updated_at.isoformat()},{id}"
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    """Decode a cursor created by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor.
+
+    Returns:
+        tuple[datetime.datetime, int]: The last modification time and the ID of the row.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        # Restore the padding stripped by `encode_cursor`.
+        value = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        updated_at, id = value.rsplit(",", 1)
+        return datetime.datetime.fromisoformat(updated_at), int(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
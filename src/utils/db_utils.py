@@ -1,16 +1,20 @@
+import asyncio
 import datetime
+import time
 from src.config import db_config
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy import JSON
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
-from typing import Any
+from typing import Any, Optional
 
-# Configure the database URL and initialize the async engine.
+# Configure the database URL; the engine itself is created on application startup (see `init_db`),
+# so importing the application doesn't load the database driver.
 DATABASE_URL = db_config.DATABASE_URL
-engine = create_async_engine(str(DATABASE_URL))
+engine: Optional[AsyncEngine] = None
 
-# Create a session factory for asynchronous database sessions.
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+# Create a session factory for asynchronous database sessions, bound to the engine in `init_db`.
+async_session = async_sessionmaker(expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
@@ -31,10 +35,62 @@ class Base(DeclarativeBase):
     )
 
 
-async def close_db() -> None:
+async def warm_up_pool(connections: int) -> None:
+    """Open the given number of pooled connections, so the first requests don't pay the connection setup.
+
+    Args:
+        connections (int): The number of connections to open concurrently.
+
+    Returns:
+        None
+    """
+
+    async def connect() -> None:
+        async with engine.connect() as connection:
+            await connection.exec_driver_sql("SELECT 1")
+
+    # The connections are checked out at the same time, so the pool has to open all of them.
+    await asyncio.gather(*(connect() for _ in range(connections)))
+
+
+async def init_db(custom_engine: Optional[AsyncEngine] = None) -> None:
+    """Create the asynchronous SQLAlchemy engine, bind the session factory to it and warm up the pool.
+
+    Args:
+        custom_engine (Optional[AsyncEngine]): An engine to use instead of one connecting to `DATABASE_URL`,
+            e.g. an in-memory SQLite engine in tests.
+
+    Returns:
+        None
+    """
+    global engine
+    engine = custom_engine or create_async_engine(
+        str(DATABASE_URL),
+        pool_size=db_config.DATABASE_POOL_SIZE,
+        max_overflow=db_config.DATABASE_MAX_OVERFLOW,
+    )
+    async_session.configure(bind=engine)
+    await warm_up_pool(min(db_config.DATABASE_POOL_WARMUP, db_config.DATABASE_POOL_SIZE))
+
+
+async def close_db(drain_timeout: float = 0) -> None:
     """Close the asynchronous SQLAlchemy engine, releasing any resources.
 
+    Disposing the engine closes only the connections in the pool, so the connections still checked
+    out, e.g. by requests or background tasks finishing during the shutdown, are waited for first.
+
+    Args:
+        drain_timeout (float): The maximum time in seconds to wait for the checked out connections.
+
     Returns:
         None
     """
-    await engine.dispose()
+    if engine:
+        deadline = time.monotonic() + drain_timeout
+        while (
+            isinstance(engine.pool, QueuePool)
+            and engine.pool.checkedout()
+            and time.monotonic() < deadline
+        ):
+            await asyncio.sleep(0.05)
+        await engine.dispose()
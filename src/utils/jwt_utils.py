@@ -1,50 +1,302 @@
 import datetime
+import logging
+import uuid
 import jwt
 
-from typing import Optional
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any, Optional
 from fastapi.security import HTTPBearer
 from fastapi import Request, Response
 from src.modules.auth.config import auth_config
+from src.modules.auth.constants import TokenType
+from src.modules.auth.repository import revocation_store
 
+logger = logging.getLogger(__name__)
 
-def create_token(data: dict, secret: str, duration: int, algorithm: str) -> str:
-    """Create a JWT token with the given payload data, expiration, and algorithm.
+
+class JWTKeySet:
+    """A set of parsed keys used to sign and verify JWT tokens of a single algorithm.
+
+    Keys are parsed into key objects once, so PyJWT doesn't parse a PEM on every call.
+    Tokens are signed with the active key and carry its ``kid`` header; any key of the set
+    verifies them, which allows rotating the signing key without invalidating issued tokens.
+
+    Attributes:
+        algorithm (str): The signing algorithm (e.g., HS256, RS256, EdDSA).
+        signing_kid (Optional[str]): The key ID of the active signing key, if keys are identified.
+        signing_key (Any): The active signing key.
+        verification_keys (dict[Optional[str], Any]): The verification keys by key ID.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        signing_kid: Optional[str],
+        signing_key: Any,
+        verification_keys: dict[Optional[str], Any],
+    ) -> None:
+        self.algorithm = algorithm
+        self.signing_kid = signing_kid
+        self.signing_key = signing_key
+        self.verification_keys = verification_keys
+
+    @property
+    def is_asymmetric(self) -> bool:
+        """bool: Whether the tokens are signed with a private key and verified with a public one."""
+        return not self.algorithm.startswith("HS")
+
+    def sign(self, payload: dict) -> str:
+        """Sign the payload with the active key.
+
+        Args:
+            payload (dict): The claims of the token.
+
+        Returns:
+            str: The encoded token.
+        """
+        headers = {"kid": self.signing_kid} if self.signing_kid else None
+        return jwt.encode(
+            payload, self.signing_key, algorithm=self.algorithm, headers=headers
+        )
+
+    def verify(self, token: str) -> dict:
+        """Verify the token with the key identified by its ``kid`` header and decode it.
+
+        Args:
+            token (str): The encoded token.
+
+        Returns:
+            dict: The decoded payload.
+
+        Raises:
+            jwt.PyJWTError: If the token is malformed, expired, signed by an unknown key or the signature is invalid.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.verification_keys.get(kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown key ID: {kid}")
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+    @cached_property
+    def jwks(self) -> dict[str, list[dict]]:
+        """dict[str, list[dict]]: The public verification keys as a JSON Web Key Set; empty for HMAC algorithms, whose keys are secret."""
+        if not self.is_asymmetric:
+            return {"keys": []}
+        algorithm = jwt.get_algorithm_by_name(self.algorithm)
+        return {
+            "keys": [
+                {
+                    **algorithm.to_jwk(key, as_dict=True),
+                    "kid": kid,
+                    "alg": self.algorithm,
+                    "use": "sig",
+                }
+                for kid, key in self.verification_keys.items()
+            ]
+        }
+
+
+def load_key_set(algorithm: str, keys_dir: str, active_kid: Optional[str]) -> JWTKeySet:
+    """Load an asymmetric key set from a directory of PEM files.
+
+    Private keys are stored as ``<kid>.pem``; public keys of retired signing keys, still
+    needed to verify issued tokens, as ``<kid>.pub.pem``.
+
+    Args:
+        algorithm (str): The signing algorithm (e.g., RS256, ES256, EdDSA).
+        keys_dir (str): The directory containing the keys.
+        active_kid (Optional[str]): The key ID of the signing key, optional if there is a single private key.
+
+    Returns:
+        JWTKeySet: The parsed key set.
+
+    Raises:
+        ValueError: If the directory doesn't exist or the active signing key can't be determined.
+    """
+    if not Path(keys_dir).is_dir():
+        raise ValueError(f"The JWT keys directory {keys_dir} doesn't exist")
+    jwt_algorithm = jwt.get_algorithm_by_name(algorithm)
+    private_keys = {}
+    public_keys = {}
+    for path in sorted(Path(keys_dir).glob("*.pem")):
+        key = jwt_algorithm.prepare_key(path.read_bytes())
+        if path.name.endswith(".pub.pem"):
+            public_keys[path.name.removesuffix(".pub.pem")] = key
+        else:
+            private_keys[path.stem] = key
+            public_keys[path.stem] = key.public_key()
+
+    if not active_kid and len(private_keys) == 1:
+        active_kid = next(iter(private_keys))
+    if active_kid not in private_keys:
+        raise ValueError(
+            f"No private key for the active key ID {active_kid!r} in {keys_dir}"
+        )
+    return JWTKeySet(algorithm, active_kid, private_keys[active_kid], public_keys)
+
+
+@lru_cache
+def get_key_set(token_type: TokenType) -> JWTKeySet:
+    """Return the process-wide key set used for tokens of the given type.
+
+    HMAC algorithms use the separate access and refresh secrets; asymmetric algorithms share
+    the key set loaded from ``JWT_KEYS_DIR``, with the ``type`` claim telling the tokens apart.
+
+    Args:
+        token_type (TokenType): The type of the token.
+
+    Returns:
+        JWTKeySet: The key set.
+    """
+    algorithm = auth_config.JWT_ALGORITHM
+    if algorithm.startswith("HS"):
+        secret = (
+            auth_config.JWT_ACCESS_SECRET
+            if token_type == TokenType.ACCESS
+            else auth_config.JWT_REFRESH_SECRET
+        ).encode()
+        return JWTKeySet(algorithm, None, secret, {None: secret})
+    return _load_configured_key_set()
+
+
+@lru_cache
+def _load_configured_key_set() -> JWTKeySet:
+    if not auth_config.JWT_KEYS_DIR:
+        raise ValueError(
+            f"JWT_KEYS_DIR must be set for the {auth_config.JWT_ALGORITHM} algorithm"
+        )
+    return load_key_set(
+        auth_config.JWT_ALGORITHM, auth_config.JWT_KEYS_DIR, auth_config.JWT_ACTIVE_KID
+    )
+
+
+def load_key_sets() -> None:
+    """Load and validate the key sets of all token types.
+
+    Called on application startup, so a misconfigured worker fails to boot instead of
+    failing every authenticated request.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the keys are misconfigured.
+    """
+    for token_type in TokenType:
+        get_key_set(token_type)
+
+
+def create_token(data: dict, duration: int, token_type: TokenType) -> str:
+    """Create a JWT token with the given payload data, expiration, and type.
+
+    Every token gets a unique ``jti`` (JWT ID) claim, so it can be revoked individually. Tokens
+    issued by a sign-in and their rotations share the ``fid`` (family ID) claim given in the data,
+    so they can be revoked together.
 
     Args:
         data (dict): The payload data to encode into the token.
-        secret (str): The secret key used to sign the token.
         duration (int): The expiration duration in minutes for the token.
-        algorithm (str): The algorithm used to sign the token (e.g., HS256).
+        token_type (TokenType): The type of the token, selecting the signing key.
 
     Returns:
         str: The generated JWT token as a string.
     """
     now = datetime.datetime.now()
-    # Add "exp" (expiration) and "iat" (issued at) claims to the payload and encode.
-    return jwt.encode(
-        {**data, "exp": now + datetime.timedelta(minutes=duration), "iat": now},
-        secret,
-        algorithm=algorithm,
+    # Add "exp" (expiration), "iat" (issued at), "jti" (JWT ID) and "type" claims to the payload and sign.
+    return get_key_set(token_type).sign(
+        {
+            **data,
+            "exp": now + datetime.timedelta(minutes=duration),
+            "iat": now,
+            "jti": uuid.uuid4().hex,
+            "type": token_type.value,
+        }
     )
 
 
-def decode_token(token: str, secret: str, algorithm: str) -> Optional[dict]:
+def decode_token(token: str, token_type: TokenType) -> Optional[dict]:
     """Decode a JWT token, returning the payload if the token is valid.
 
     Args:
         token (str): The JWT token to decode.
-        secret (str): The secret key used to verify the token.
-        algorithm (str): The algorithm used to verify the token (e.g., HS256).
+        token_type (TokenType): The expected type of the token.
 
     Returns:
         Optional[dict]: The decoded payload if valid, or None if invalid.
     """
     try:
-        # Decode the token with the specified secret and algorithm.
-        return jwt.decode(token, secret, algorithms=[algorithm])
+        # Decode the token with the key set of its type.
+        payload = get_key_set(token_type).verify(token)
     except jwt.PyJWTError:
-        # Handle any JWT errors (e.g., expiration, invalid signature).
+        # Handle any JWT errors (e.g., expiration, invalid signature, unknown key).
         return None
+    # Reject tokens of another type, e.g. a refresh token used as an access token.
+    return payload if payload.get("type") == token_type.value else None
+
+
+def get_token_expiration(payload: dict) -> datetime.datetime:
+    """Return the expiration of a decoded token as a naive datetime, like the one it was created from.
+
+    Args:
+        payload (dict): The decoded token payload.
+
+    Returns:
+        datetime.datetime: The expiration of the token.
+    """
+    return datetime.datetime.fromtimestamp(
+        payload["exp"], datetime.timezone.utc
+    ).replace(tzinfo=None)
+
+
+def is_token_revoked(payload: dict) -> bool:
+    """Check whether a decoded token or its family is revoked, using the in-memory mirror only.
+
+    Args:
+        payload (dict): The decoded token payload.
+
+    Returns:
+        bool: True if the token or its family is revoked, False otherwise.
+    """
+    return revocation_store.is_revoked(
+        payload.get("jti")
+    ) or revocation_store.is_revoked(payload.get("fid"))
+
+
+def set_token_cookies(
+    response: Response, access_token: str, refresh_token: str, remember_me: bool
+) -> None:
+    """Set the authentication cookies of the given tokens.
+
+    Args:
+        response (Response): The HTTP response object to set the cookies on.
+        access_token (str): The access token.
+        refresh_token (str): The refresh token.
+        remember_me (bool): Whether the cookies outlive the browser session.
+
+    Returns:
+        None
+    """
+    access_token_age = None
+    refresh_token_age = None
+
+    # Set the token age based on the "remember_me" flag.
+    if remember_me:
+        access_token_age = 60 * auth_config.ACCESS_TOKEN_EXPIRE_MINUTES
+        refresh_token_age = 60 * auth_config.REFRESH_TOKEN_EXPIRE_MINUTES
+
+    response.set_cookie(
+        key="access_token",
+        value=access_token,
+        max_age=access_token_age,
+        httponly=True,
+    )
+    response.set_cookie(
+        key="refresh_token",
+        value=refresh_token,
+        max_age=refresh_token_age,
+        httponly=True,
+    )
 
 
 class HTTPBearerWithCookie(HTTPBearer):
@@ -52,17 +304,18 @@ class HTTPBearerWithCookie(HTTPBearer):
 
     Methods:
         __check_token_from_cookies: Retrieve and decode a token from cookies.
+        __rotate_tokens: Exchange a refresh token for new tokens, revoking the old one.
         __call__: Validate and refresh tokens, falling back to HTTP Bearer.
     """
 
     async def __check_token_from_cookies(
-        self, token_key: str, secret_key: str, request: Request
+        self, token_key: str, token_type: TokenType, request: Request
     ) -> Optional[str]:
         """Retrieve and decode a JWT token from the request cookies.
 
         Args:
             token_key (str): The name of the cookie containing the token.
-            secret_key (str): The secret key used to verify the token.
+            token_type (TokenType): The expected type of the token.
             request (Request): The HTTP request object.
 
         Returns:
@@ -73,11 +326,72 @@ class HTTPBearerWithCookie(HTTPBearer):
         if not token:
             return None
 
-        # Decode the token with the secret and algorithm from the configuration.
-        return decode_token(token, secret_key, auth_config.JWT_ALGORITHM)
+        # Decode the token with the key set of its type.
+        return decode_token(token, token_type)
+
+    async def __rotate_tokens(
+        self, refresh_payload: dict, response: Response
+    ) -> Optional[str]:
+        """Exchange a refresh token for a new access and refresh token pair, revoking the old refresh token.
+
+        The old refresh token can be exchanged once more within a short grace period, so
+        concurrent requests that carry the same cookies don't sign the user out. Its use after
+        the grace period means the token leaked, so the whole token family, i.e. all tokens
+        rotated from the same sign-in, is revoked, which signs out both the user and the attacker.
+
+        Args:
+            refresh_payload (dict): The decoded payload of the refresh token.
+            response (Response): The HTTP response object to set the new cookies on.
+
+        Returns:
+            Optional[str]: The new access token, or None if the refresh token was revoked.
+        """
+        # Refresh tokens are checked against the database, since reuse must be detected across workers.
+        jti = refresh_payload.get("jti")
+        if not jti:
+            return None
+        # Tokens issued before the families were introduced start their own family.
+        family = refresh_payload.get("fid", jti)
+        if await revocation_store.is_revoked_in_db(family):
+            return None
+        if await revocation_store.is_revoked_in_db(jti):
+            logger.warning(
+                "Reuse of a revoked refresh token, revoking its family (user %s)",
+                refresh_payload.get("sub"),
+            )
+            await revocation_store.revoke(
+                family,
+                datetime.datetime.now()
+                + datetime.timedelta(minutes=auth_config.REFRESH_TOKEN_EXPIRE_MINUTES),
+            )
+            return None
+        revoked = await revocation_store.revoke(
+            jti,
+            get_token_expiration(refresh_payload),
+            grace_seconds=auth_config.REFRESH_TOKEN_REUSE_GRACE_SECONDS,
+        )
+        # Within the grace period, only a single other request may exchange the token.
+        if not revoked and not await revocation_store.register_reuse(jti):
+            return None
+
+        remember_me = refresh_payload.get("remember_me", False)
+        access_token = create_token(
+            {"sub": refresh_payload["sub"], "fid": family},
+            auth_config.ACCESS_TOKEN_EXPIRE_MINUTES,
+            TokenType.ACCESS,
+        )
+        refresh_token = create_token(
+            {"sub": refresh_payload["sub"], "fid": family, "remember_me": remember_me},
+            auth_config.REFRESH_TOKEN_EXPIRE_MINUTES,
+            TokenType.REFRESH,
+        )
+
+        # Set the new tokens in the cookies.
+        set_token_cookies(response, access_token, refresh_token, remember_me)
+        return access_token
 
     async def __call__(self, request: Request, response: Response) -> Optional[str]:
-        """Validate the access token from cookies, refresh if necessary, or fall back to HTTP Bearer.
+        """Validate the access token from cookies, rotate the tokens if necessary, or fall back to HTTP Bearer.
 
         Args:
             request (Request): The incoming HTTP request.
@@ -86,36 +400,25 @@ class HTTPBearerWithCookie(HTTPBearer):
         Returns:
             Optional[str]: The valid access token or None if validation fails.
         """
-        # Check if a valid access token is in the cookies; remove if invalid.
+        # Check if a valid, unrevoked access token is in the cookies; remove if invalid.
         payload = await self.__check_token_from_cookies(
-            "access_token", auth_config.JWT_ACCESS_SECRET, request
+            "access_token", TokenType.ACCESS, request
         )
-        if payload:
+        if payload and not is_token_revoked(payload):
             return request.cookies.get("access_token")
         else:
             response.delete_cookie(key="access_token")
 
-        # Check if a valid refresh token is available; remove if invalid.
-        refresh_token = await self.__check_token_from_cookies(
-            "refresh_token", auth_config.JWT_REFRESH_SECRET, request
+        # Check if a valid refresh token is available and rotate it; remove if invalid.
+        refresh_payload = await self.__check_token_from_cookies(
+            "refresh_token", TokenType.REFRESH, request
         )
-        if refresh_token:
-            new_token = create_token(
-                {
-                    "sub": refresh_token["sub"],
-                },
-                auth_config.JWT_ACCESS_SECRET,
-                auth_config.ACCESS_TOKEN_EXPIRE_MINUTES,
-                auth_config.JWT_ALGORITHM,
-            )
-
-            # Set the new access token in the cookies.
-            response.set_cookie(
-                key="access_token",
-                value=new_token,
-                max_age=60 * auth_config.ACCESS_TOKEN_EXPIRE_MINUTES,
-                httponly=True,
-            )
+        new_token = (
+            await self.__rotate_tokens(refresh_payload, response)
+            if refresh_payload
+            else None
+        )
+        if new_token:
             return new_token
         else:
             response.delete_cookie(key="refresh_token")
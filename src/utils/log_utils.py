@@ -0,0 +1,197 @@
+import copy
+import logging
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler
+from typing import IO, Iterator, Optional
+
+from starlette.types import Scope
+from src.utils.query_utils import QueryStats
+
+
+class RequestContext:
+    """The fields of the currently processed request attached to its log records.
+
+    Attributes:
+        request_id (str): The ID of the request, taken from ``X-Request-ID`` or generated.
+        scope (Scope): The ASGI scope of the request, the router adds the matched route to it.
+        queries (QueryStats): The collector of the SQL statements executed by the request.
+        user_id (Optional[int]): The ID of the authenticated user, once known.
+    """
+
+    def __init__(self, request_id: str, scope: Scope, queries: QueryStats) -> None:
+        self.request_id = request_id
+        self.scope = scope
+        self.queries = queries
+        self.user_id: Optional[int] = None
+
+    @property
+    def route(self) -> Optional[str]:
+        """Optional[str]: The path template of the matched route, if routed yet."""
+        route = self.scope.get("route")
+        return getattr(route, "path", None)
+
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar(
+    "request_context", default=None
+)
+
+
+def get_request_context() -> Optional[RequestContext]:
+    """Return the context of the currently processed request.
+
+    Returns:
+        Optional[RequestContext]: The request context, or None outside of a request.
+    """
+    return _request_context.get()
+
+
+@contextmanager
+def bind_request_context(context: RequestContext) -> Iterator[RequestContext]:
+    """Make the context the current request context within the block.
+
+    Args:
+        context (RequestContext): The context of the processed request.
+
+    Yields:
+        RequestContext: The bound context.
+    """
+    token = _request_context.set(context)
+    try:
+        yield context
+    finally:
+        _request_context.reset(token)
+
+
+class RequestContextFilter(logging.Filter):
+    """Adds the fields of the current request to log records, outside of a request they are None.
+
+    The filter has to run in the thread emitting the record, where the context is available.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        if context is None:
+            record.request_id = record.user_id = record.route = None
+            record.db_queries = record.db_ms = None
+            return True
+        record.request_id = context.request_id
+        record.user_id = context.user_id
+        record.route = context.route
+        record.db_queries = context.queries.count
+        record.db_ms = round(context.queries.duration_ms, 2)
+        return True
+
+
+class QueueLogHandler(QueueHandler):
+    """Hands log records over to a background thread writing them to a stream.
+
+    The calling thread, usually the event loop, only resolves the message and enqueues the
+    record; formatting, e.g. to JSON, and the blocking write happen on the listener thread,
+    which writes the records waiting in the queue with a single write. The queue is bounded:
+    when the stream can't keep up, records are dropped and counted instead of blocking the
+    event loop.
+
+    The listener thread doesn't survive a fork, e.g. of Gunicorn workers from a master that
+    configured the logging, so every child process starts its own.
+
+    Attributes:
+        stream (IO[str]): The stream the records are written to.
+        queue_size (int): The maximum number of records waiting to be written.
+        dropped (int): The number of records dropped because the queue was full.
+    """
+
+    BATCH_SIZE = 256
+    CLOSE_TIMEOUT = 5
+
+    def __init__(
+        self, stream: Optional[IO[str]] = None, queue_size: int = 10000
+    ) -> None:
+        super().__init__(queue.Queue(queue_size))
+        self.stream = stream or sys.stderr
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._output_formatter = logging.Formatter()
+        self._thread: Optional[threading.Thread] = None
+        # The record fields have to be read from the context of the emitting thread
+        self.addFilter(RequestContextFilter())
+        self._start()
+        os.register_at_fork(after_in_child=self._restart)
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._listen, name="QueueLogHandler", daemon=True
+        )
+        self._thread.start()
+
+    def _restart(self) -> None:
+        if self._thread is None:
+            return
+        # The queue's locks may have been held by the parent's listener thread at the fork
+        self.queue = queue.Queue(self.queue_size)
+        self.dropped = 0
+        self._start()
+
+    def _listen(self) -> None:
+        while True:
+            records = [self.queue.get()]
+            while len(records) < self.BATCH_SIZE:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            for record in records:
+                # None is the sentinel stopping the listener
+                if record is None:
+                    continue
+                try:
+                    lines.append(self._output_formatter.format(record) + "\n")
+                except Exception:
+                    self.handleError(record)
+            if lines:
+                try:
+                    self.stream.write("".join(lines))
+                    self.stream.flush()
+                except Exception:
+                    self.handleError(records[0])
+            if None in records:
+                return
+
+    def setFormatter(self, fmt: Optional[logging.Formatter]) -> None:
+        # Format on the listener thread, not in the caller's
+        self._output_formatter = fmt or logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the arguments now, they may change before the listener formats the record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: Optional[logging.LogRecord]) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Write the pending records and stop the listener thread.
+
+        Returns:
+            None
+        """
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            try:
+                self.queue.put(None, timeout=self.CLOSE_TIMEOUT)
+                thread.join(self.CLOSE_TIMEOUT)
+            except queue.Full:
+                # The listener runs on a daemon thread, it ends with the process
+                pass
+        super().close()
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Optional
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from src.utils import db_utils
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationHub:
+    """Fans notifications about changes of a user's data out to the subscribers of the worker.
+
+    Notifications are sent through PostgreSQL ``NOTIFY`` within the transaction making the change,
+    so they are delivered to all workers once, and only if, it commits. Every worker holds a single
+    ``LISTEN`` connection, opened outside of the pool so it doesn't take a connection from the
+    requests, and dispatches the notifications to its in-process subscribers. When the hub isn't
+    listening, e.g. on another database, notifications reach the subscribers of the current worker
+    only.
+
+    Each subscriber has a bounded queue. A subscriber that doesn't keep up is disconnected instead
+    of buffering without bounds, clients reconnect and catch up through the delta synchronization.
+
+    Attributes:
+        channel (str): The name of the ``NOTIFY`` channel.
+        max_subscribers (int): The maximum number of subscribers of the worker.
+        queue_size (int): The maximum number of notifications pending for a subscriber.
+    """
+
+    RECONNECT_DELAY = 5
+
+    def __init__(self, channel: str, max_subscribers: int, queue_size: int) -> None:
+        self.channel = channel
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscribers: defaultdict[int, set[asyncio.Queue]] = defaultdict(set)
+        self._count = 0
+        self._listen_task: Optional[asyncio.Task] = None
+        self._listen_engine: Optional[AsyncEngine] = None
+
+    @property
+    def subscribers(self) -> int:
+        """The number of subscribers of the worker."""
+        return self._count
+
+    def subscribe(self, user_id: int) -> Optional[asyncio.Queue]:
+        """Subscribe to the notifications of a user.
+
+        Args:
+            user_id (int): The unique ID of the user.
+
+        Returns:
+            Optional[asyncio.Queue]: The queue receiving the payloads of the notifications, ``None``
+                marks the end of the subscription. None if the worker has no free subscriber slot.
+        """
+        if self._count >= self.max_subscribers:
+            return None
+        queue = asyncio.Queue(self.queue_size)
+        self._subscribers[user_id].add(queue)
+        self._count += 1
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        """Cancel a subscription.
+
+        Args:
+            user_id (int): The unique ID of the user.
+            queue (asyncio.Queue): The queue of the subscription.
+
+        Returns:
+            None
+        """
+        queues = self._subscribers.get(user_id)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        self._count -= 1
+        if not queues:
+            del self._subscribers[user_id]
+
+    def publish(self, user_id: int, payload: str) -> None:
+        """Dispatch a notification to the subscribers of the user in this worker.
+
+        Args:
+            user_id (int): The unique ID of the user.
+            payload (str): The payload of the notification.
+
+        Returns:
+            None
+        """
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                logger.warning("Disconnecting a slow subscriber of user %d", user_id)
+                self._close(user_id, queue)
+
+    async def notify(self, session: AsyncSession, user_id: int, payload: str) -> None:
+        """Notify the subscribers of a user once the transaction of the session commits.
+
+        Args:
+            session (AsyncSession): The session making the change.
+            user_id (int): The unique ID of the user.
+            payload (str): The payload of the notification, shorter than 8000 bytes.
+
+        Returns:
+            None
+        """
+        if self._listen_task:
+            await session.execute(
+                select(func.pg_notify(self.channel, f"{user_id}:{payload}"))
+            )
+            return
+
+        def publish(_) -> None:
+            self.publish(user_id, payload)
+
+        event.listen(session.sync_session, "after_commit", publish, once=True)
+
+    async def start(self) -> None:
+        """Start listening to the notifications of all workers, if the database is PostgreSQL.
+
+        Returns:
+            None
+        """
+        if db_utils.engine.dialect.name == "postgresql":
+            self._listen_engine = create_async_engine(
+                db_utils.engine.url, poolclass=NullPool
+            )
+            self._listen_task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening and end all subscriptions.
+
+        Returns:
+            None
+        """
+        if self._listen_task:
+            self._listen_task.cancel()
+            self._listen_task = None
+        if self._listen_engine:
+            await self._listen_engine.dispose()
+            self._listen_engine = None
+        for user_id, queues in list(self._subscribers.items()):
+            for queue in list(queues):
+                self._close(user_id, queue)
+
+    def _close(self, user_id: int, queue: asyncio.Queue) -> None:
+        self.unsubscribe(user_id, queue)
+        # Drop the pending notifications, so the end of the subscription fits in the queue.
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def _on_notification(
+        self, _connection, _pid: int, _channel: str, payload: str
+    ) -> None:
+        user_id, _, payload = payload.partition(":")
+        self.publish(int(user_id), payload)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._listen_engine.connect() as connection:
+                    raw_connection = await connection.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    terminated = asyncio.Event()
+                    driver_connection.add_termination_listener(
+                        lambda _: terminated.set()
+                    )
+                    await driver_connection.add_listener(
+                        self.channel, self._on_notification
+                    )
+                    try:
+                        await terminated.wait()
+                    finally:
+                        # The connection is closed along with its listener.
+                        await connection.invalidate()
+            except Exception:
+                logger.exception("Lost the connection listening to %s", self.channel)
+            # Notifications sent meanwhile are lost, subscribers catch up when they reconnect.
+            await asyncio.sleep(self.RECONNECT_DELAY)
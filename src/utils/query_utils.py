@@ -0,0 +1,109 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """Accumulates the number of SQL statements and the time spent executing them.
+
+    Statistics are propagated to the parent collector as well, so a collector opened by a
+    test helper still sees the statements counted by the per-request middleware.
+
+    Attributes:
+        count (int): The number of executed SQL statements.
+        duration (float): The total execution time of the statements in seconds.
+        parent (Optional[QueryStats]): The enclosing collector, if any.
+    """
+
+    def __init__(self, parent: Optional["QueryStats"] = None) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.parent = parent
+
+    def record(self, duration: float) -> None:
+        """Record an executed statement in this collector and all enclosing collectors.
+
+        Args:
+            duration (float): The execution time of the statement in seconds.
+
+        Returns:
+            None
+        """
+        stats = self
+        while stats:
+            stats.count += 1
+            stats.duration += duration
+            stats = stats.parent
+
+    @property
+    def duration_ms(self) -> float:
+        """float: The total execution time of the statements in milliseconds."""
+        return self.duration * 1000
+
+
+# The collector of the currently processed request (or test block), if any.
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any
+) -> None:
+    # Keep the start time on the execution context, so it is discarded along with the context
+    # even when the statement fails and `after_cursor_execute` never fires.
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any
+) -> None:
+    start = getattr(context, "_query_start_time", None)
+    stats = _query_stats.get()
+    if stats and start is not None:
+        stats.record(time.perf_counter() - start)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect statistics of the SQL statements executed within the block.
+
+    Yields:
+        QueryStats: The collector of the statements executed within the block.
+    """
+    stats = QueryStats(parent=_query_stats.get())
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+@contextmanager
+def assert_num_queries(expected: int) -> Iterator[QueryStats]:
+    """Assert that exactly the expected number of SQL statements is executed within the block.
+
+    Intended for tests, e.g. to pin down the number of queries issued by a route:
+
+        with assert_num_queries(4):
+            await client.post("/auth/sign-up", json=...)
+
+    Args:
+        expected (int): The expected number of executed statements.
+
+    Yields:
+        QueryStats: The collector of the statements executed within the block.
+
+    Raises:
+        AssertionError: If the number of executed statements differs from the expected one.
+    """
+    with track_queries() as stats:
+        yield stats
+    assert (
+        stats.count == expected
+    ), f"Expected {expected} queries, but {stats.count} were executed"
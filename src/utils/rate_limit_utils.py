@@ -0,0 +1,192 @@
+import time
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+class RateLimitBackend:
+    """Base class of token bucket storages.
+
+    Each key owns a bucket holding up to ``capacity`` tokens that refills at ``capacity / period``
+    tokens per second; every hit takes one token, and a refund gives tokens back.
+    """
+
+    async def consume(
+        self, key: str, capacity: int, period: float, cost: int = 1
+    ) -> float:
+        """Take tokens from the bucket of the key, if it holds at least one token.
+
+        Args:
+            key (str): The identifier of the bucket.
+            capacity (int): The maximum number of tokens in the bucket.
+            period (float): The time in seconds in which an empty bucket refills completely.
+            cost (int): The number of tokens to take, 0 only checks the bucket and a negative
+                cost puts the tokens back, up to the capacity.
+
+        Returns:
+            float: 0 if the bucket held a token, otherwise the number of seconds until a token is available.
+        """
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Token buckets held in the memory of the current process.
+
+    The number of tracked keys is bounded, the least recently used buckets are evicted first,
+    so an attacker cycling through random emails can't exhaust the memory.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def consume(
+        self, key: str, capacity: int, period: float, cost: int = 1
+    ) -> float:
+        now = time.monotonic()
+        rate = capacity / period
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        # Refill the tokens accumulated since the last hit.
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+        retry_after = 0.0
+        if cost < 0:
+            # A refund always succeeds, the bucket never holds more than its capacity.
+            tokens = min(capacity, tokens - cost)
+        elif tokens >= 1:
+            tokens = max(0, tokens - cost)
+        else:
+            retry_after = (1 - tokens) / rate
+
+        # Re-insert the bucket as the most recently used one and evict the oldest if full.
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Token buckets stored in Redis, shared by all workers and instances.
+
+    The bucket update runs as a Lua script, so it costs a single round trip and is atomic
+    across workers.
+
+    Attributes:
+        prefix (str): The prefix of the keys of the buckets.
+    """
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local period = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local rate = capacity / period
+    local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated_at = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+    local retry_after = 0
+    if cost < 0 then
+        tokens = math.min(capacity, tokens - cost)
+    elseif tokens >= 1 then
+        tokens = math.max(0, tokens - cost)
+    else
+        retry_after = (1 - tokens) / rate
+    end
+    redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+    redis.call("EXPIRE", KEYS[1], math.ceil(period))
+    return tostring(retry_after)
+    """
+
+    def __init__(self, redis: "Redis", prefix: str = "rate_limit:") -> None:
+        self.prefix = prefix
+        self._redis = redis
+        self._script = redis.register_script(self.SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisRateLimitBackend":
+        """Create a backend connected to the Redis instance at the URL.
+
+        Args:
+            url (str): The URL of the Redis instance, e.g. ``redis://localhost:6379/0``.
+
+        Returns:
+            RedisRateLimitBackend: The backend.
+        """
+        from redis.asyncio import Redis
+
+        return cls(Redis.from_url(url))
+
+    async def consume(
+        self, key: str, capacity: int, period: float, cost: int = 1
+    ) -> float:
+        retry_after = await self._script(
+            keys=[self.prefix + key], args=[capacity, period, time.time(), cost]
+        )
+        return float(retry_after)
+
+
+class RateLimiter:
+    """A rate limiter checking named limits against a token bucket backend.
+
+    Attributes:
+        backend (RateLimitBackend): The storage of the token buckets.
+        blocked (Counter[str]): The number of rejected hits per limit name.
+    """
+
+    def __init__(self, backend: RateLimitBackend) -> None:
+        self.backend = backend
+        self.blocked: Counter[str] = Counter()
+
+    async def hit(
+        self, name: str, key: str, capacity: int, period: float, cost: int = 1
+    ) -> float:
+        """Register a hit of the key under the named limit.
+
+        Args:
+            name (str): The name of the limit, e.g. ``"sign_in_ip"``.
+            key (str): The limited identity, e.g. a client IP address.
+            capacity (int): The number of hits allowed in a burst.
+            period (float): The time in seconds in which the full capacity is restored.
+            cost (int): The number of hits to register, 0 only checks whether the key is limited.
+
+        Returns:
+            float: 0 if the hit is allowed, otherwise the number of seconds to wait before retrying.
+        """
+        retry_after = await self.backend.consume(
+            f"{name}:{key}", capacity, period, cost
+        )
+        if retry_after:
+            self.blocked[name] += 1
+        return retry_after
+
+    async def refund(
+        self, name: str, key: str, capacity: int, period: float, cost: int = 1
+    ) -> None:
+        """Give back hits of the key registered under the named limit.
+
+        Args:
+            name (str): The name of the limit, e.g. ``"sign_in_email"``.
+            key (str): The limited identity, e.g. an email address.
+            capacity (int): The number of hits allowed in a burst.
+            period (float): The time in seconds in which the full capacity is restored.
+            cost (int): The number of hits to give back.
+        """
+        await self.backend.consume(f"{name}:{key}", capacity, period, -cost)
+
+
+def create_rate_limiter(redis_url: Optional[str], max_keys: int) -> RateLimiter:
+    """Create a rate limiter with a shared Redis backend if configured, or an in-memory one.
+
+    Args:
+        redis_url (Optional[str]): The URL of the shared Redis instance, if any.
+        max_keys (int): The maximum number of keys tracked by the in-memory backend.
+
+    Returns:
+        RateLimiter: The rate limiter.
+    """
+    if redis_url:
+        return RateLimiter(RedisRateLimitBackend.from_url(redis_url))
+    return RateLimiter(InMemoryRateLimitBackend(max_keys))
@@ -0,0 +1,521 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# The W3C trace context header, e.g. ``00-<trace ID>-<parent span ID>-01`` for a sampled trace.
+TRACEPARENT_PATTERN = re.compile(r"00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+
+
+class Span:
+    """A timed operation within a trace.
+
+    Attributes:
+        trace_id (str): The 32 hex digit ID of the trace.
+        span_id (str): The 16 hex digit ID of the span.
+        parent_id (Optional[str]): The ID of the enclosing span, None for the root of a trace.
+        name (str): The name of the operation.
+        start_ns (int): The start as nanoseconds since the epoch.
+        end_ns (Optional[int]): The end as nanoseconds since the epoch, None while running.
+        attributes (dict[str, Any]): The attributes of the operation.
+        error (Optional[str]): The exception that failed the operation, if any.
+        spans (list[Span]): All spans of the trace in the order of their start, shared by its spans.
+    """
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+        "spans",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        spans: list["Span"],
+        start_ns: Optional[int] = None,
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.spans = spans
+        spans.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        """float: The duration of the finished span in milliseconds."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def child(self, name: str, start_ns: Optional[int] = None) -> "Span":
+        """Start a span within this span.
+
+        Args:
+            name (str): The name of the operation.
+            start_ns (Optional[int]): The start as nanoseconds since the epoch, defaults to now.
+
+        Returns:
+            Span: The started span.
+        """
+        return Span(name, self.trace_id, self.span_id, self.spans, start_ns)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def get_current_span() -> Optional[Span]:
+    """Return the innermost running span of the current context.
+
+    Returns:
+        Optional[Span]: The span, or None if the current request isn't traced.
+    """
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Trace the block as a child of the current span.
+
+    Outside of a sampled trace the block runs untraced at the cost of a context variable lookup.
+
+    Args:
+        name (str): The name of the operation.
+        **attributes (Any): The attributes of the operation.
+
+    Yields:
+        Optional[Span]: The span of the block, None if the request isn't traced.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    current = parent.child(name)
+    current.attributes.update(attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+def traced(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Trace every call of a coroutine function as a span.
+
+    Args:
+        name (str): The name of the spans.
+
+    Returns:
+        Callable[[Callable[..., T]], Callable[..., T]]: The decorator.
+    """
+
+    def decorator(function: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(function)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            if _current_span.get() is None:
+                return await function(*args, **kwargs)
+            with span(name):
+                return await function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_methods(cls: type[T]) -> type[T]:
+    """Trace the calls of all public coroutine methods of a class, named ``Class.method``.
+
+    Args:
+        cls (type[T]): The traced class, e.g. a service or a repository.
+
+    Returns:
+        type[T]: The class.
+    """
+    for attribute, value in list(vars(cls).items()):
+        if not attribute.startswith("_") and inspect.iscoroutinefunction(value):
+            setattr(cls, attribute, traced(f"{cls.__name__}.{attribute}")(value))
+    return cls
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any
+) -> None:
+    if context is not None and _current_span.get() is not None:
+        context._trace_start_ns = time.time_ns()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any
+) -> None:
+    parent = _current_span.get()
+    start_ns = getattr(context, "_trace_start_ns", None)
+    if parent is None or start_ns is None:
+        return
+    # Recorded once finished, the statement doesn't become the parent of other spans
+    query = parent.child("db.query", start_ns)
+    query.end_ns = time.time_ns()
+    query.attributes["db.statement"] = statement[:500]
+
+
+def to_otlp(spans: list[Span], service_name: str) -> dict[str, Any]:
+    """Convert the spans of a trace to an OTLP/JSON ``ExportTraceServiceRequest``.
+
+    Args:
+        spans (list[Span]): The finished spans.
+        service_name (str): The name of the traced service.
+
+    Returns:
+        dict[str, Any]: The request body accepted by OTLP/HTTP collectors on ``/v1/traces``.
+    """
+
+    def to_value(value: Any) -> dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    otlp_spans = []
+    for index, s in enumerate(spans):
+        otlp_span = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            # The root span is the server side of the request, its parent may be the caller's
+            "kind": 2 if index == 0 else 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [
+                {"key": key, "value": to_value(value)}
+                for key, value in s.attributes.items()
+            ],
+            "status": ({"code": 2, "message": s.error} if s.error else {"code": 0}),
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        otlp_spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+def format_flame(spans: list[Span]) -> str:
+    """Render the spans of a trace as an indented tree with proportional bars.
+
+    The self time of a span, not covered by its children, is listed where it's significant,
+    e.g. the route's self time is spent parsing the request and serializing the response.
+
+    Args:
+        spans (list[Span]): The finished spans, the first one is the root.
+
+    Returns:
+        str: The breakdown, one line per span.
+    """
+    children: dict[Optional[str], list[Span]] = {}
+    for s in spans:
+        children.setdefault(s.parent_id, []).append(s)
+    root = spans[0]
+    total = max(root.duration_ms, 1e-6)
+    lines = []
+
+    def render(s: Span, depth: int) -> None:
+        bar = "█" * max(1, round(s.duration_ms / total * 40))
+        label = (
+            s.attributes.get("db.statement", s.name) if s.name == "db.query" else s.name
+        )
+        width = 62 - 2 * depth
+        label = " ".join(label.split())[: width - 1]
+        error = f" ! {s.error}" if s.error else ""
+        lines.append(
+            f"{'  ' * depth}{label:<{width}} {s.duration_ms:>9.2f} ms {bar}{error}"
+        )
+        nested = children.get(s.span_id, [])
+        self_ms = s.duration_ms - sum(c.duration_ms for c in nested)
+        if nested and self_ms >= total * 0.05:
+            lines.append(
+                f"{'  ' * (depth + 1)}{'(self)':<{width - 2}} {self_ms:>9.2f} ms"
+            )
+        for child in nested:
+            render(child, depth + 1)
+
+    render(root, 0)
+    return "\n".join(lines)
+
+
+class SpanExporter:
+    """The destination of finished traces."""
+
+    def export(self, spans: list[Span]) -> None:
+        """Export the spans of a finished trace.
+
+        Args:
+            spans (list[Span]): The spans of the trace, the first one is the root.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        """Export the pending traces and release the resources.
+
+        Returns:
+            None
+        """
+
+
+class InMemoryExporter(SpanExporter):
+    """Keeps the most recent traces in memory, e.g. for tests and local debugging.
+
+    Attributes:
+        traces (deque[list[Span]]): The spans of the kept traces, the newest last.
+    """
+
+    def __init__(self, max_traces: int = 1000) -> None:
+        self.traces: deque[list[Span]] = deque(maxlen=max_traces)
+
+    def export(self, spans: list[Span]) -> None:
+        self.traces.append(spans)
+
+
+class FileExporter(SpanExporter):
+    """Appends every trace to a file as a line of OTLP/JSON, which collectors can replay.
+
+    Attributes:
+        path (str): The path of the file.
+        service_name (str): The name of the traced service.
+    """
+
+    def __init__(self, path: str, service_name: str) -> None:
+        self.path = path
+        self.service_name = service_name
+
+    def export(self, spans: list[Span]) -> None:
+        with open(self.path, "a") as file:
+            file.write(json.dumps(to_otlp(spans, self.service_name)) + "\n")
+
+
+class OTLPExporter(SpanExporter):
+    """Sends every trace to an OTLP/HTTP collector as JSON.
+
+    Attributes:
+        endpoint (str): The URL of the collector's traces endpoint, e.g. ``http://localhost:4318/v1/traces``.
+        service_name (str): The name of the traced service.
+        timeout (float): The timeout of a request in seconds.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: list[Span]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(to_otlp(spans, self.service_name)).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class BackgroundExporter(SpanExporter):
+    """Exports the traces through another exporter on a background thread, off the event loop.
+
+    The queue is bounded, traces are dropped and counted when the exporter can't keep up. The
+    thread is started on the first export in every process, so forked workers get their own.
+
+    Attributes:
+        exporter (SpanExporter): The exporter doing the blocking export.
+        queue_size (int): The maximum number of traces waiting to be exported.
+        dropped (int): The number of dropped traces.
+    """
+
+    def __init__(self, exporter: SpanExporter, queue_size: int = 1000) -> None:
+        self.exporter = exporter
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._pid: Optional[int] = None
+        self._queue: queue.Queue[Optional[list[Span]]] = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, spans: list[Span]) -> None:
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._queue = queue.Queue(self.queue_size)
+            self._thread = threading.Thread(
+                target=self._run, name="BackgroundExporter", daemon=True
+            )
+            self._thread.start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while (spans := self._queue.get()) is not None:
+            try:
+                self.exporter.export(spans)
+            except Exception:
+                logger.exception("Failed to export a trace")
+
+    def shutdown(self) -> None:
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join(5)
+            self._thread = None
+            self._pid = None
+        self.exporter.shutdown()
+
+
+class Tracer:
+    """Decides which requests are traced and hands their finished traces to the exporter.
+
+    A request continues the trace of an incoming ``traceparent`` header and its sampling decision,
+    other requests are traced with the sample rate. In debug mode, the breakdown of every traced
+    request is logged.
+
+    Attributes:
+        exporter (SpanExporter): The destination of the finished traces.
+        sample_rate (float): The fraction of the requests without a ``traceparent`` to trace.
+        debug (bool): Whether to log a breakdown of every traced request.
+    """
+
+    def __init__(
+        self, exporter: SpanExporter, sample_rate: float, debug: bool = False
+    ) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.debug = debug
+
+    def start_trace(
+        self, name: str, traceparent: Optional[str] = None
+    ) -> Optional[Span]:
+        """Start the root span of a request if the request is sampled.
+
+        Args:
+            name (str): The name of the root span.
+            traceparent (Optional[str]): The ``traceparent`` header of the request.
+
+        Returns:
+            Optional[Span]: The root span, None if the request isn't sampled.
+        """
+        match = TRACEPARENT_PATTERN.fullmatch(traceparent or "")
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            if not int(flags, 16) & 1:
+                return None
+            return Span(name, trace_id, parent_id, [])
+        if random.random() >= self.sample_rate:
+            return None
+        return Span(name, f"{random.getrandbits(128):032x}", None, [])
+
+    @contextmanager
+    def activate(self, root: Span) -> Iterator[Span]:
+        """Make the root span current within the block and export the trace afterwards.
+
+        Args:
+            root (Span): The root span of the trace.
+
+        Yields:
+            Span: The root span.
+        """
+        token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.error = type(e).__name__
+            raise
+        finally:
+            root.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self.finish(root)
+
+    def finish(self, root: Span) -> None:
+        """Export the trace of a finished root span.
+
+        Args:
+            root (Span): The root span of the trace.
+
+        Returns:
+            None
+        """
+        if self.debug:
+            logger.info("Trace %s\n%s", root.trace_id, format_flame(root.spans))
+        try:
+            self.exporter.export(root.spans)
+        except Exception:
+            logger.exception("Failed to export a trace")
+
+
+def create_exporter(
+    kind: str, service_name: str, file_path: str, otlp_endpoint: str
+) -> SpanExporter:
+    """Create the exporter of a kind, the blocking ones export on a background thread.
+
+    Args:
+        kind (str): ``memory``, ``file`` or ``otlp``.
+        service_name (str): The name of the traced service.
+        file_path (str): The path of the file of the ``file`` exporter.
+        otlp_endpoint (str): The URL of the collector's traces endpoint of the ``otlp`` exporter.
+
+    Returns:
+        SpanExporter: The exporter.
+
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    if kind == "memory":
+        return InMemoryExporter()
+    if kind == "file":
+        return BackgroundExporter(FileExporter(file_path, service_name))
+    if kind == "otlp":
+        return BackgroundExporter(OTLPExporter(otlp_endpoint, service_name))
+    raise ValueError(f"Unknown trace exporter: {kind}")
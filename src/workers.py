@@ -0,0 +1,64 @@
+import asyncio
+import sys
+from types import FrameType
+from typing import Any, Optional
+
+from gunicorn.arbiter import Arbiter
+from uvicorn import Config, Server
+from uvicorn.workers import UvicornWorker
+from src.modules.health.config import health_config
+from src.modules.health.service import service as health_service
+
+
+class DrainingServer(Server):
+    """A uvicorn server that keeps serving for a while after the shutdown signal.
+
+    On the first ``SIGTERM`` or ``SIGINT``, the readiness probe starts reporting the worker as
+    draining, while the listening sockets stay open for the drain delay. The orchestrator sees
+    the failing probe and stops routing new requests to the worker before it closes its sockets.
+    A second signal shuts the server down right away.
+
+    Attributes:
+        drain_delay (float): The time in seconds between the signal and the shutdown.
+    """
+
+    def __init__(self, config: Config, drain_delay: float) -> None:
+        super().__init__(config)
+        self.drain_delay = drain_delay
+        self._draining = False
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if self._draining or self.should_exit or self.drain_delay <= 0:
+            super().handle_exit(sig, frame)
+            return
+        self._draining = True
+        health_service.drain()
+        asyncio.get_running_loop().call_later(
+            self.drain_delay, super().handle_exit, sig, frame
+        )
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    """A Gunicorn worker running the application on uvloop with the httptools HTTP parser.
+
+    Unlike the stock ``UvicornWorker``, which silently falls back to asyncio and h11 when
+    the optional dependencies are missing, this worker fails fast if they are not installed.
+    It also honours Gunicorn's ``worker_connections`` setting as the per-worker concurrency limit,
+    and drains on shutdown through the `DrainingServer`.
+    """
+
+    CONFIG_KWARGS: dict[str, Any] = {"loop": "uvloop", "http": "httptools"}
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Connections above the limit are answered with 503 instead of queueing in the worker.
+        self.config.limit_concurrency = self.cfg.worker_connections
+
+    async def _serve(self) -> None:
+        # The stock worker with the draining server
+        self.config.app = self.wsgi
+        server = DrainingServer(self.config, health_config.HEALTH_DRAIN_DELAY)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+from src.modules.admin.profiler import profiler
+from src.modules.auth.constants import UserRole
+
+ADMIN = [UserRole.USER, UserRole.ADMIN]
+
+
+def busy_loop(stopped: threading.Event) -> None:
+    while not stopped.is_set():
+        sum(range(1000))
+
+
+async def test_profile_collapsed_stacks(sign_in):
+    client = await sign_in("admin@example.com", roles=ADMIN)
+    stopped = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stopped,), name="busy")
+    thread.start()
+    try:
+        response = await client.post(
+            "/admin/profile", params={"seconds": 0.2, "interval_ms": 5}
+        )
+    finally:
+        stopped.set()
+        thread.join()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    stacks = [line.rsplit(" ", 1) for line in response.text.splitlines()]
+    busy = [stack for stack, count in stacks if stack.startswith("busy;")]
+    assert any("busy_loop (" in stack for stack in busy)
+    assert all(int(count) > 0 for _, count in stacks)
+    assert not profiler.running
+
+
+async def test_profile_speedscope(sign_in):
+    client = await sign_in("admin@example.com", roles=ADMIN)
+
+    response = await client.post(
+        "/admin/profile",
+        params={"seconds": 0.05, "interval_ms": 5, "format": "speedscope"},
+    )
+
+    assert response.status_code == 200
+    document = response.json()
+    frames = document["shared"]["frames"]
+    [main] = [p for p in document["profiles"] if p["name"] == "MainThread"]
+    assert main["type"] == "sampled"
+    assert len(main["samples"]) == len(main["weights"])
+    assert all(0 <= index < len(frames) for stack in main["samples"] for index in stack)
+
+
+async def test_profile_requires_admin(sign_in):
+    client = await sign_in()
+
+    response = await client.post("/admin/profile", params={"seconds": 0.01})
+
+    assert response.status_code == 403
+
+
+async def test_one_profile_per_worker(sign_in):
+    client = await sign_in("admin@example.com", roles=ADMIN)
+    running = asyncio.create_task(profiler.profile(0.2, 0.01))
+    await asyncio.sleep(0)
+
+    response = await client.post("/admin/profile", params={"seconds": 0.01})
+
+    assert response.status_code == 409
+    await running
+    assert not profiler.running
@@ -0,0 +1,356 @@
+import asyncio
+from pathlib import Path
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+    load_pem_private_key,
+)
+from src.exceptions import TooManyRequests
+from src.modules.auth import service as auth_service_module
+from src.modules.auth.config import auth_config
+from src.modules.auth.constants import TokenType, UserRole
+from src.modules.auth.service import service as auth_service
+from src.utils.rate_limit_utils import RedisRateLimitBackend, create_rate_limiter
+from src.utils.query_utils import assert_num_queries
+from src.utils import jwt_utils
+from src.utils.jwt_utils import load_key_set
+
+
+async def test_sign_up(client):
+    response = await client.post(
+        "/auth/sign-up",
+        json={
+            "full_name": "Jane Doe",
+            "email": "jane@example.com",
+            "password": "secret",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["roles"] == [UserRole.USER]
+    assert response.json()["timezone"] == "UTC"
+
+
+async def test_sign_up_existing_email(client, sign_in):
+    await sign_in("jane@example.com")
+
+    response = await client.post(
+        "/auth/sign-up",
+        json={
+            "full_name": "Jane Doe",
+            "email": "jane@example.com",
+            "password": "secret",
+        },
+    )
+
+    assert response.status_code == 409
+
+
+async def test_sign_in_invalid_password(client, sign_in):
+    await sign_in("jane@example.com")
+    client.cookies.clear()
+
+    response = await client.post(
+        "/auth/sign-in", json={"email": "jane@example.com", "password": "wrong"}
+    )
+
+    assert response.status_code == 401
+
+
+@pytest.fixture
+def sign_in_rate_limit(monkeypatch):
+    monkeypatch.setattr(auth_config, "SIGN_IN_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(auth_config, "SIGN_IN_EMAIL_LIMIT", 2)
+    monkeypatch.setattr(
+        auth_service_module, "sign_in_rate_limiter", create_rate_limiter(None, 100)
+    )
+
+
+async def test_successful_sign_ins_do_not_lock_email(sign_in, sign_in_rate_limit):
+    client = await sign_in("jane@example.com")
+
+    for _ in range(3):
+        response = await client.post(
+            "/auth/sign-in", json={"email": "jane@example.com", "password": "password"}
+        )
+        assert response.status_code == 200
+
+
+async def test_failed_sign_ins_lock_email(sign_in, sign_in_rate_limit):
+    client = await sign_in("jane@example.com")
+    for _ in range(2):
+        response = await client.post(
+            "/auth/sign-in", json={"email": "jane@example.com", "password": "wrong"}
+        )
+        assert response.status_code == 401
+
+    response = await client.post(
+        "/auth/sign-in", json={"email": "jane@example.com", "password": "password"}
+    )
+
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+
+
+async def test_parallel_sign_ins_reserve_email_limit(sign_in_rate_limit):
+    # All attempts pass the check before the password of any of them is validated.
+    results = await asyncio.gather(
+        *(auth_service.check_sign_in_rate_limit("jane@example.com") for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], TooManyRequests)
+
+
+class FakeRedis:
+    """Records the calls of the registered script, which returns the queued results."""
+
+    def __init__(self, *results: str) -> None:
+        self.results = list(results)
+        self.calls = []
+
+    def register_script(self, script):
+        async def run(keys, args):
+            self.calls.append((keys, args))
+            return self.results.pop(0)
+
+        return run
+
+
+async def test_redis_rate_limit_backend(monkeypatch):
+    redis = FakeRedis("0", "1.5", "0")
+    limiter = create_rate_limiter(None, 100)
+    limiter.backend = RedisRateLimitBackend(redis)
+    monkeypatch.setattr("time.time", lambda: 1000.0)
+
+    assert await limiter.hit("sign_in_email", "jane@example.com", 5, 300) == 0
+    assert await limiter.hit("sign_in_email", "jane@example.com", 5, 300) == 1.5
+    await limiter.refund("sign_in_email", "jane@example.com", 5, 300)
+
+    assert redis.calls == [
+        (["rate_limit:sign_in_email:jane@example.com"], [5, 300, 1000.0, 1]),
+        (["rate_limit:sign_in_email:jane@example.com"], [5, 300, 1000.0, 1]),
+        (["rate_limit:sign_in_email:jane@example.com"], [5, 300, 1000.0, -1]),
+    ]
+    assert limiter.blocked["sign_in_email"] == 1
+
+
+async def test_me(sign_in):
+    client = await sign_in("jane@example.com")
+
+    # A single query loads the user together with the roles, wrapped in the savepoint of the test transaction.
+    with assert_num_queries(3):
+        response = await client.get("/auth/me")
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "jane@example.com"
+
+
+async def test_me_unauthenticated(client):
+    response = await client.get("/auth/me")
+
+    assert response.status_code == 401
+
+
+async def test_update_preferences(sign_in):
+    client = await sign_in()
+
+    response = await client.patch(
+        "/auth/me", json={"timezone": "Europe/Prague", "weight_unit": "lb"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["timezone"] == "Europe/Prague"
+    assert response.json()["weight_unit"] == "lb"
+
+
+async def test_update_preferences_unknown_timezone(sign_in):
+    client = await sign_in()
+
+    response = await client.patch("/auth/me", json={"timezone": "Mars/Olympus"})
+
+    assert response.status_code == 422
+
+
+async def test_sign_out_revokes_tokens(sign_in):
+    client = await sign_in()
+    access_token = client.cookies["access_token"]
+
+    response = await client.post("/auth/sign-out")
+    assert response.status_code == 204
+
+    response = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == 401
+
+
+async def refresh(client, refresh_token):
+    # Sign the request only with the refresh token, so the tokens are rotated.
+    client.cookies.clear()
+    client.cookies.set("refresh_token", refresh_token)
+    return await client.get("/auth/me")
+
+
+async def test_refresh_token_reuse_within_grace(sign_in):
+    client = await sign_in()
+    refresh_token = client.cookies["refresh_token"]
+
+    # Concurrent requests carrying the same cookies may exchange the token twice.
+    assert (await refresh(client, refresh_token)).status_code == 200
+    assert (await refresh(client, refresh_token)).status_code == 200
+    assert (await refresh(client, refresh_token)).status_code == 401
+
+
+async def test_refresh_token_reuse_revokes_family(sign_in, monkeypatch):
+    monkeypatch.setattr(auth_config, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", 0)
+    client = await sign_in()
+    stolen_token = client.cookies["refresh_token"]
+    response = await refresh(client, stolen_token)
+    assert response.status_code == 200
+    access_token = response.cookies["access_token"]
+    refresh_token = response.cookies["refresh_token"]
+
+    assert (await refresh(client, stolen_token)).status_code == 401
+
+    # The tokens rotated from the stolen one are revoked too.
+    assert (await refresh(client, refresh_token)).status_code == 401
+    client.cookies.clear()
+    response = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == 401
+
+
+def write_private_key(keys_dir: Path, kid: str, algorithm: str) -> None:
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        key = ed25519.Ed25519PrivateKey.generate()
+    (keys_dir / f"{kid}.pem").write_bytes(
+        key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    )
+
+
+def retire_key(keys_dir: Path, kid: str) -> None:
+    # Keep only the public key of the former signing key, like a rotation does.
+    private_key_path = keys_dir / f"{kid}.pem"
+    key = load_pem_private_key(private_key_path.read_bytes(), password=None)
+    (keys_dir / f"{kid}.pub.pem").write_bytes(
+        key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+    )
+    private_key_path.unlink()
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_key_set_signs_with_active_key(tmp_path, algorithm):
+    write_private_key(tmp_path, "2026-09", algorithm)
+
+    key_set = load_key_set(algorithm, str(tmp_path), None)
+    token = key_set.sign({"sub": 1})
+
+    assert jwt.get_unverified_header(token)["kid"] == "2026-09"
+    assert key_set.verify(token)["sub"] == 1
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_key_set_rotation(tmp_path, algorithm):
+    write_private_key(tmp_path, "2026-09", algorithm)
+    old_token = load_key_set(algorithm, str(tmp_path), None).sign({"sub": 1})
+    retire_key(tmp_path, "2026-09")
+    write_private_key(tmp_path, "2026-10", algorithm)
+
+    key_set = load_key_set(algorithm, str(tmp_path), "2026-10")
+    new_token = key_set.sign({"sub": 2})
+
+    # Tokens signed before the rotation stay valid until they expire.
+    assert key_set.verify(old_token)["sub"] == 1
+    assert jwt.get_unverified_header(new_token)["kid"] == "2026-10"
+    assert key_set.verify(new_token)["sub"] == 2
+    assert {key["kid"] for key in key_set.jwks["keys"]} == {"2026-09", "2026-10"}
+
+
+def test_key_set_rejects_unknown_key(tmp_path):
+    (tmp_path / "trusted").mkdir()
+    (tmp_path / "other").mkdir()
+    write_private_key(tmp_path / "trusted", "2026-10", "EdDSA")
+    write_private_key(tmp_path / "other", "2026-11", "EdDSA")
+    key_set = load_key_set("EdDSA", str(tmp_path / "trusted"), None)
+    token = load_key_set("EdDSA", str(tmp_path / "other"), None).sign({"sub": 1})
+
+    with pytest.raises(jwt.InvalidKeyError):
+        key_set.verify(token)
+
+
+def test_key_set_rejects_forged_key_id(tmp_path):
+    (tmp_path / "trusted").mkdir()
+    (tmp_path / "other").mkdir()
+    write_private_key(tmp_path / "trusted", "2026-10", "EdDSA")
+    write_private_key(tmp_path / "other", "2026-10", "EdDSA")
+    key_set = load_key_set("EdDSA", str(tmp_path / "trusted"), None)
+    token = load_key_set("EdDSA", str(tmp_path / "other"), None).sign({"sub": 1})
+
+    with pytest.raises(jwt.InvalidSignatureError):
+        key_set.verify(token)
+
+
+def test_key_set_requires_active_key(tmp_path):
+    write_private_key(tmp_path, "2026-09", "EdDSA")
+    write_private_key(tmp_path, "2026-10", "EdDSA")
+
+    with pytest.raises(ValueError):
+        load_key_set("EdDSA", str(tmp_path), None)
+
+
+@pytest.fixture
+def jwt_keys(tmp_path, monkeypatch):
+    """Sign the tokens with an EdDSA key set of two keys, the older one retired."""
+    write_private_key(tmp_path, "2026-09", "EdDSA")
+    retire_key(tmp_path, "2026-09")
+    write_private_key(tmp_path, "2026-10", "EdDSA")
+    monkeypatch.setattr(auth_config, "JWT_ALGORITHM", "EdDSA")
+    monkeypatch.setattr(auth_config, "JWT_KEYS_DIR", str(tmp_path))
+    monkeypatch.setattr(auth_config, "JWT_ACTIVE_KID", "2026-10")
+    jwt_utils.get_key_set.cache_clear()
+    jwt_utils._load_configured_key_set.cache_clear()
+    yield tmp_path
+    jwt_utils.get_key_set.cache_clear()
+    jwt_utils._load_configured_key_set.cache_clear()
+
+
+async def test_jwks(client, jwt_keys):
+    response = await client.get("/auth/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert "max-age" in response.headers["cache-control"]
+    keys = sorted(response.json()["keys"], key=lambda key: key["kid"])
+    assert [(key["kid"], key["alg"], key["kty"]) for key in keys] == [
+        ("2026-09", "EdDSA", "OKP"),
+        ("2026-10", "EdDSA", "OKP"),
+    ]
+    # Only the public parts of the keys are published.
+    assert all("d" not in key for key in keys)
+
+
+async def test_jwks_hmac(client):
+    response = await client.get("/auth/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
+
+
+async def test_sign_in_with_asymmetric_keys(sign_in, jwt_keys):
+    client = await sign_in("jane@example.com")
+
+    access_token = client.cookies["access_token"]
+    assert jwt.get_unverified_header(access_token)["kid"] == "2026-10"
+    assert jwt_utils.decode_token(access_token, TokenType.REFRESH) is None
+    response = await client.get("/auth/me")
+    assert response.status_code == 200
@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from starlette.responses import JSONResponse, StreamingResponse
+from src.middlewares import CompressionMiddleware
+from src.utils.compression_utils import COMPRESSORS, negotiate_encoding
+
+PAYLOAD = {"items": [{"id": i, "weight": 80.0 - i / 10} for i in range(200)]}
+
+
+async def call(app, accept_encoding: str) -> tuple[dict, bytes]:
+    """Call the ASGI application and collect the response headers and body."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b""}]
+
+    async def receive():
+        # Streaming responses listen for the disconnect until the response is sent.
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    headers = {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+    return headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def compressed(response, **kwargs) -> CompressionMiddleware:
+    kwargs = {
+        "minimum_size": 1024,
+        "encodings": ["gzip"],
+        "cache_size": 1024 * 1024,
+        **kwargs,
+    }
+    return CompressionMiddleware(response, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, *", "zstd"),
+        ("identity", None),
+        ("*;q=0", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+async def test_compresses_large_responses():
+    app = compressed(JSONResponse(PAYLOAD))
+
+    headers, body = await call(app, "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == PAYLOAD
+
+
+async def test_caches_compressed_bodies():
+    app = compressed(JSONResponse(PAYLOAD))
+
+    _, first = await call(app, "gzip")
+    _, second = await call(app, "gzip")
+
+    assert first == second
+    assert len(app.cache._entries) == 1
+
+
+async def test_skips_small_and_unaccepted_responses():
+    app = compressed(JSONResponse({"weight": 80.0}))
+    headers, _ = await call(app, "gzip")
+    assert "content-encoding" not in headers
+
+    app = compressed(JSONResponse(PAYLOAD))
+    headers, _ = await call(app, "identity")
+    assert "content-encoding" not in headers
+
+
+async def test_compresses_streamed_responses():
+    async def chunks():
+        yield b"["
+        for i in range(100):
+            yield json.dumps({"id": i}).encode() + b","
+        yield b"{}]"
+
+    app = compressed(StreamingResponse(chunks(), media_type="application/json"))
+
+    headers, body = await call(app, "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert len(json.loads(gzip.decompress(body))) == 101
+
+
+async def test_skips_event_streams():
+    async def events():
+        yield b"data: 1\n\n" * 200
+
+    app = compressed(StreamingResponse(events(), media_type="text/event-stream"))
+
+    headers, body = await call(app, "gzip")
+
+    assert "content-encoding" not in headers
+    assert body.startswith(b"data: 1")
+
+
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+async def test_optional_encodings(encoding):
+    if encoding not in COMPRESSORS:
+        pytest.skip(f"The compressor of {encoding} isn't installed")
+    app = compressed(JSONResponse(PAYLOAD), encodings=[encoding])
+
+    headers, body = await call(app, encoding)
+
+    assert headers["content-encoding"] == encoding
+    assert len(body) < len(json.dumps(PAYLOAD))
@@ -0,0 +1,89 @@
+from src.modules.goals.service import service as goal_service
+from src.utils.query_utils import assert_num_queries
+
+GOAL = {"target_weight": 90.0, "target_date": "2024-06-01"}
+
+
+async def weigh(client, date: str, weight: float) -> dict:
+    response = await client.post(
+        "/weight/", json={"date": f"{date}T08:00:00", "weight": weight}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_goal_requires_a_measurement(sign_in):
+    client = await sign_in()
+
+    response = await client.put("/goals/", json=GOAL)
+
+    assert response.status_code == 400
+
+
+async def test_progress_and_eta(sign_in):
+    client = await sign_in()
+    await weigh(client, "2024-01-01", 100.0)
+    response = await client.put("/goals/", json=GOAL)
+    assert response.status_code == 200
+    assert response.json()["progress"] == 0
+    assert response.json()["eta"] is None
+
+    await weigh(client, "2024-01-08", 97.5)
+
+    goal = (await client.get("/goals/")).json()
+    assert goal["latest_weight"] == 97.5
+    assert goal["progress"] == 25
+    assert goal["milestone"] == 25
+    # Losing 2.5 kg a week, the remaining 7.5 kg take three more weeks.
+    assert goal["eta"] == "2024-01-29"
+    assert goal["on_track"] is True
+
+
+async def test_measurements_before_the_goal_are_ignored(sign_in):
+    client = await sign_in()
+    await weigh(client, "2024-01-08", 100.0)
+    await client.put("/goals/", json=GOAL)
+
+    await weigh(client, "2024-01-01", 95.0)
+
+    goal = (await client.get("/goals/")).json()
+    assert goal["latest_weight"] == 100.0
+    assert goal["progress"] == 0
+
+
+async def test_deleted_measurement_is_taken_back(sign_in):
+    client = await sign_in()
+    await weigh(client, "2024-01-01", 100.0)
+    await client.put("/goals/", json=GOAL)
+    measurement = await weigh(client, "2024-01-08", 90.0)
+    assert (await client.get("/goals/")).json()["milestone"] == 100
+
+    await client.delete(f"/weight/{measurement['id']}")
+
+    goal = (await client.get("/goals/")).json()
+    assert goal["progress"] == 0
+    assert goal["milestone"] == 0
+    assert goal["milestone_reached_at"] is None
+
+
+async def test_goal_read_is_a_single_lookup(sign_in):
+    client = await sign_in()
+    await weigh(client, "2024-01-01", 100.0)
+    await client.put("/goals/", json=GOAL)
+    user_id = (await client.get("/auth/me")).json()["id"]
+
+    # The lookup plus the savepoint of the test transaction and its release.
+    with assert_num_queries(3):
+        await goal_service.get_goal(user_id)
+
+
+async def test_delete_goal(sign_in):
+    client = await sign_in()
+    await weigh(client, "2024-01-01", 100.0)
+    await client.put("/goals/", json=GOAL)
+
+    response = await client.delete("/goals/")
+    assert response.status_code == 204
+
+    response = await client.get("/goals/")
+    assert response.status_code == 404
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import signal
+import socket
+from unittest import mock
+
+import httpx
+import pytest
+import uvicorn
+from starlette.responses import PlainTextResponse
+from src.config import ConcurrencyLimit
+from src.main import app
+from src.middlewares import LoadSheddingMiddleware
+from src.modules.health.service import service as health_service
+from src.utils.query_utils import assert_num_queries
+from src.workers import DrainingServer
+
+
+@pytest.fixture(autouse=True)
+def reset_health_service():
+    """Forget the cached readiness and stop draining, the service is shared by all tests."""
+    yield
+    health_service.draining = False
+    health_service._result = None
+
+
+async def test_liveness(client):
+    with assert_num_queries(0):
+        response = await client.get("/health/live")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+
+async def test_readiness_is_cached(client):
+    response = await client.get("/health/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["db_latency_ms"] >= 0
+    with assert_num_queries(0):
+        assert (await client.get("/health/ready")).json() == body
+
+
+async def test_concurrent_probes_share_a_check(client):
+    with assert_num_queries(3):
+        responses = await asyncio.gather(
+            *(client.get("/health/ready") for _ in range(5))
+        )
+
+    assert {response.status_code for response in responses} == {200}
+
+
+async def test_unavailable_database(client):
+    with mock.patch.object(health_service, "_ping", side_effect=ConnectionRefusedError):
+        response = await client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert (
+        response.json()["detail"]
+        == "The database is unavailable: ConnectionRefusedError"
+    )
+
+
+async def test_draining(client):
+    health_service.drain()
+
+    with assert_num_queries(0):
+        response = await client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "draining"
+
+
+async def test_shutdown_signal_drains_before_closing(db_connection):
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    url = f"http://127.0.0.1:{sock.getsockname()[1]}/health/ready"
+    # The test binds the application to its database connection, the lifespan would rebind it
+    server = DrainingServer(
+        uvicorn.Config(app, lifespan="off", log_config=None), drain_delay=0.5
+    )
+    serving = asyncio.create_task(server.serve(sockets=[sock]))
+    try:
+        while not server.started:
+            await asyncio.sleep(0.01)
+        async with httpx.AsyncClient() as client:
+            assert (await client.get(url)).status_code == 200
+
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(0.1)
+
+            # Still serving, but reported unready until the sockets close
+            response = await client.get(url)
+            assert response.status_code == 503
+            assert response.json()["status"] == "draining"
+            assert not serving.done()
+        await asyncio.wait_for(serving, 5)
+    finally:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        sock.close()
+
+
+async def test_probes_are_exempt_from_load_shedding():
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def application(scope, receive, send):
+        if scope["path"] == "/slow":
+            started.set()
+            await release.wait()
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    shedding = LoadSheddingMiddleware(
+        application,
+        groups={
+            "health": ConcurrencyLimit(PATHS=["/health/"]),
+            "default": ConcurrencyLimit(PATHS=["/"], LIMIT=1),
+        },
+        retry_after=1,
+    )
+    transport = httpx.ASGITransport(app=shedding)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        slow = asyncio.create_task(client.get("/slow"))
+        await started.wait()
+
+        # The saturated worker sheds requests, but still answers its probes.
+        assert (await client.get("/weight")).status_code == 503
+        assert (await client.get("/health/ready")).status_code == 200
+
+        release.set()
+        assert (await slow).status_code == 200
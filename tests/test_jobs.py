@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+import pytest
+from src.modules.jobs.config import jobs_config
+from src.modules.jobs.service import service as job_service
+from src.modules.jobs.worker import JobWorker, get_retry_delay
+
+CSV = "date,weight\n2024-01-01T08:00:00,80.0\n2024-01-02T08:00:00,79.5\n"
+
+
+@pytest.fixture
+def worker() -> JobWorker:
+    return JobWorker(concurrency=2, poll_interval=0, worker_id="test")
+
+
+async def process_jobs(worker: JobWorker) -> int:
+    claimed = await worker.run_once()
+    await worker.drain()
+    return claimed
+
+
+async def import_csv(client, content: str) -> dict:
+    response = await client.post(
+        "/weight/import", content=content, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 202
+    return response.json()
+
+
+async def test_import(sign_in, worker):
+    client = await sign_in()
+
+    job = await import_csv(client, CSV)
+    assert job["status"] == "pending"
+    assert await process_jobs(worker) == 1
+
+    response = await client.get(f"/jobs/{job['id']}")
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["result"] == {"imported": 2}
+    response = await client.get("/weight/")
+    assert [m["weight"] for m in response.json()["items"]] == [80.0, 79.5]
+
+
+async def test_import_flags_outliers(sign_in, worker):
+    client = await sign_in()
+    rows = [f"2024-01-0{day}T08:00:00,{80 + day / 10}" for day in range(1, 7)]
+    # The spike precedes the rest of the history in the file, but not by the date.
+    content = "date,weight\n2024-01-09T08:00:00,160.0\n" + "\n".join(rows)
+
+    await import_csv(client, content)
+    await process_jobs(worker)
+
+    response = await client.get("/weight/")
+    flagged = {m["weight"]: m["flagged"] for m in response.json()["items"]}
+    assert flagged.pop(160.0) is True
+    assert not any(flagged.values())
+
+
+async def test_rescore(sign_in, worker):
+    client = await sign_in()
+    await import_csv(client, CSV)
+    await process_jobs(worker)
+    response = await client.get("/weight/")
+    [first, second] = response.json()["items"]
+    # The flag of a corrected weight is cleared, re-scoring sets it again.
+    await client.patch(f"/weight/{first['id']}", json={"weight": 0.5})
+
+    job = (await client.post("/weight/rescore")).json()
+    await process_jobs(worker)
+
+    response = await client.get(f"/jobs/{job['id']}")
+    assert response.json()["result"] == {"changed": 1}
+    response = await client.get("/weight/")
+    flagged = {m["id"]: m["flagged"] for m in response.json()["items"]}
+    assert flagged == {first["id"]: True, second["id"]: False}
+
+
+async def test_invalid_import_fails_without_retry(sign_in, worker):
+    client = await sign_in()
+
+    job = await import_csv(client, CSV + "2024-01-03,heavy\n")
+    await process_jobs(worker)
+
+    response = await client.get(f"/jobs/{job['id']}")
+    assert response.json()["status"] == "failed"
+    assert response.json()["error"].startswith("Invalid row on line 4")
+    response = await client.get("/weight/")
+    assert response.json()["items"] == []
+
+
+async def test_job_of_other_user(client, sign_in):
+    await sign_in("jane@example.com")
+    job = await import_csv(client, CSV)
+    await sign_in("john@example.com")
+
+    response = await client.get(f"/jobs/{job['id']}")
+
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def flaky_job(sign_in, monkeypatch):
+    """Enqueue jobs failing their first attempts, retried without a delay."""
+    monkeypatch.setattr(jobs_config, "JOB_RETRY_BASE_DELAY", 0)
+
+    async def enqueue(failures: int) -> tuple:
+        client = await sign_in()
+        user_id = (await client.get("/auth/me")).json()["id"]
+
+        @job_service.handler("test.flaky")
+        async def flaky(job):
+            if job.attempts <= failures:
+                raise ConnectionError("Connection reset")
+            return {"attempts": job.attempts}
+
+        job = await job_service.enqueue(user_id, "test.flaky", {})
+        return client, job.id
+
+    return enqueue
+
+
+async def test_failed_job_is_retried(flaky_job, worker):
+    client, job_id = await flaky_job(failures=1)
+
+    await process_jobs(worker)
+    response = await client.get(f"/jobs/{job_id}")
+    assert response.json()["status"] == "pending"
+    assert "ConnectionError" in response.json()["error"]
+
+    await process_jobs(worker)
+    response = await client.get(f"/jobs/{job_id}")
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["result"] == {"attempts": 2}
+
+
+async def test_failing_job_gives_up(flaky_job, worker, monkeypatch):
+    monkeypatch.setattr(jobs_config, "JOB_MAX_ATTEMPTS", 2)
+    client, job_id = await flaky_job(failures=5)
+
+    for _ in range(3):
+        await process_jobs(worker)
+
+    response = await client.get(f"/jobs/{job_id}")
+    assert response.json()["status"] == "failed"
+    assert response.json()["attempts"] == 2
+
+
+def test_retry_delay_grows_exponentially():
+    assert timedelta(seconds=1) <= get_retry_delay(1) <= timedelta(seconds=2)
+    assert timedelta(seconds=8) <= get_retry_delay(4) <= timedelta(seconds=16)
+    assert get_retry_delay(30) <= timedelta(seconds=jobs_config.JOB_RETRY_MAX_DELAY)
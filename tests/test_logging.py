@@ -0,0 +1,112 @@
+import io
+import logging
+import threading
+
+import httpx
+import pytest
+from sqlalchemy import text
+from starlette.responses import PlainTextResponse, StreamingResponse
+from src.middlewares import QueryBudgetMiddleware, RequestContextMiddleware
+from src.utils.db_utils import async_session
+from src.utils.log_utils import QueueLogHandler
+
+FORMAT = "%(message)s|%(request_id)s|%(user_id)s|%(route)s|%(db_queries)s"
+
+
+@pytest.fixture
+def access_log():
+    """Capture the access log through a queue handler, the records are returned once it's closed."""
+    stream = io.StringIO()
+    handler = QueueLogHandler(stream)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    logger = logging.getLogger("src.access")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    def records() -> list[list[str]]:
+        handler.close()
+        return [line.split("|") for line in stream.getvalue().splitlines()]
+
+    yield records
+    logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+    handler.close()
+
+
+async def test_access_log_carries_request_context(sign_in, access_log):
+    client = await sign_in()
+    user_id = (await client.get("/auth/me")).json()["id"]
+
+    response = await client.get("/weight/", headers={"X-Request-ID": "req-1"})
+
+    assert response.headers["X-Request-ID"] == "req-1"
+    message, request_id, logged_user_id, route, db_queries = access_log()[-1]
+    assert message.startswith("GET /weight/ 200")
+    assert request_id == "req-1"
+    assert logged_user_id == str(user_id)
+    assert route == "/weight/"
+    assert int(db_queries) > 0
+
+
+async def test_invalid_request_id_is_replaced(client):
+    response = await client.get("/weight/", headers={"X-Request-ID": "a\nb"})
+
+    assert len(response.headers["X-Request-ID"]) == 32
+
+
+async def test_successful_requests_are_sampled(access_log):
+    async def app(scope, receive, send):
+        response = PlainTextResponse("", status_code=int(scope["path"][1:]))
+        await response(scope, receive, send)
+
+    transport = httpx.ASGITransport(app=RequestContextMiddleware(app, sample_rate=0))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for status_code in [200, 404, 500]:
+            await client.get(f"/{status_code}")
+
+    assert [record[0].split()[1] for record in access_log()] == ["/404", "/500"]
+
+
+def test_full_queue_drops_records():
+    class BlockedStream(io.StringIO):
+        def __init__(self) -> None:
+            super().__init__()
+            self.writing = threading.Event()
+            self.unblocked = threading.Event()
+
+        def write(self, text: str) -> int:
+            self.writing.set()
+            self.unblocked.wait()
+            return super().write(text)
+
+    stream = BlockedStream()
+    handler = QueueLogHandler(stream, queue_size=1)
+    logger = logging.Logger("test")
+    logger.addHandler(handler)
+
+    logger.warning("written")
+    stream.writing.wait()
+    logger.warning("queued")
+    logger.warning("dropped")
+    stream.unblocked.set()
+    handler.close()
+
+    assert handler.dropped == 1
+    assert stream.getvalue().splitlines() == ["written", "queued"]
+
+
+async def test_query_budget_counts_streamed_queries(db_connection, caplog):
+    async def body():
+        async with async_session() as session:
+            await session.execute(text("SELECT 1"))
+        yield b"ok"
+
+    app = QueryBudgetMiddleware(StreamingResponse(body()), budget=0)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/export")
+
+    # The header is sent before the body runs its query, the budget check sees it.
+    assert response.headers["Server-Timing"].endswith('desc="0 queries"')
+    assert "GET /export executed" in caplog.text
+    assert "after the response started" in caplog.text
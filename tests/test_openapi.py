@@ -0,0 +1,31 @@
+import json
+
+from src.main import app
+from src.openapi import StaticOpenAPI, encode_schema
+
+
+async def test_schema_is_served_as_generated(client):
+    response = await client.get("/openapi.json")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == encode_schema(app.openapi())
+    assert "/weight/" in response.json()["paths"]
+
+
+async def test_docs_ui_loads_the_schema(client):
+    response = await client.get("/")
+
+    assert response.status_code == 200
+    assert "'/openapi.json'" in response.text
+
+
+def test_precomputed_schema_file(tmp_path):
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps({"openapi": "3.1.0", "paths": {}}))
+    schema = StaticOpenAPI(app, str(path))
+
+    assert json.loads(schema.load()) == {"openapi": "3.1.0", "paths": {}}
+    # Read once, the file isn't consulted again
+    path.unlink()
+    assert json.loads(schema.load()) == {"openapi": "3.1.0", "paths": {}}
@@ -0,0 +1,131 @@
+import json
+
+import httpx
+import pytest
+from src.main import app
+from src.middlewares import TracingMiddleware
+from src.utils.trace_utils import (
+    FileExporter,
+    InMemoryExporter,
+    Tracer,
+    format_flame,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+@pytest.fixture
+async def traced_client(sign_in):
+    """Sign a user in and return a client of the application traced with the given sample rate."""
+    clients = []
+
+    async def traced_client(
+        exporter: InMemoryExporter, sample_rate: float = 1.0
+    ) -> httpx.AsyncClient:
+        client = await sign_in()
+        transport = httpx.ASGITransport(
+            app=TracingMiddleware(app, Tracer(exporter, sample_rate))
+        )
+        traced = httpx.AsyncClient(
+            transport=transport, base_url="http://test", cookies=client.cookies
+        )
+        clients.append(traced)
+        return traced
+
+    yield traced_client
+    for client in clients:
+        await client.aclose()
+
+
+async def test_request_is_traced_down_to_the_queries(traced_client):
+    exporter = InMemoryExporter()
+    client = await traced_client(exporter)
+
+    response = await client.get("/weight/")
+
+    assert response.status_code == 200
+    [spans] = exporter.traces
+    root = spans[0]
+    assert root.name == "GET /weight/"
+    assert root.parent_id is None
+    assert root.attributes["http.response.status_code"] == 200
+    by_name = {s.name: s for s in spans}
+    assert by_name["auth.validate_token"].parent_id == root.span_id
+    assert (
+        by_name["AuthService.get_user"].parent_id
+        == by_name["auth.validate_token"].span_id
+    )
+    service = by_name["WeightService.get_weight_measurements"]
+    repository = by_name["WeightRepository.get_weight_measurements"]
+    assert service.parent_id == root.span_id
+    assert repository.parent_id == service.span_id
+    assert any(
+        s.name == "db.query" and s.parent_id == repository.span_id for s in spans
+    )
+    assert all(s.trace_id == root.trace_id and s.end_ns for s in spans)
+
+
+async def test_unsampled_requests_are_not_traced(traced_client):
+    exporter = InMemoryExporter()
+    client = await traced_client(exporter, sample_rate=0)
+
+    await client.get("/weight/")
+
+    assert not exporter.traces
+
+
+async def test_traceparent_decides_sampling(traced_client):
+    exporter = InMemoryExporter()
+    client = await traced_client(exporter, sample_rate=0)
+
+    await client.get(
+        "/weight/", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"}
+    )
+    await client.get(
+        "/weight/", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-00"}
+    )
+
+    [spans] = exporter.traces
+    assert spans[0].trace_id == TRACE_ID
+    assert spans[0].parent_id == "00f067aa0ba902b7"
+
+
+async def test_file_exporter_writes_otlp_json(traced_client, tmp_path):
+    exporter = InMemoryExporter()
+    client = await traced_client(exporter)
+    await client.get("/weight/")
+    [spans] = exporter.traces
+
+    path = tmp_path / "traces.jsonl"
+    FileExporter(str(path), "weight-tracker").export(spans)
+
+    [line] = path.read_text().splitlines()
+    [resource_spans] = json.loads(line)["resourceSpans"]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "weight-tracker"}}
+    ]
+    [scope_spans] = resource_spans["scopeSpans"]
+    otlp_root = scope_spans["spans"][0]
+    assert otlp_root["traceId"] == spans[0].trace_id
+    assert "parentSpanId" not in otlp_root
+    assert int(otlp_root["endTimeUnixNano"]) >= int(otlp_root["startTimeUnixNano"])
+    assert {
+        "key": "http.response.status_code",
+        "value": {"intValue": "200"},
+    } in otlp_root["attributes"]
+    assert len(scope_spans["spans"]) == len(spans)
+
+
+async def test_flame_breakdown(traced_client):
+    exporter = InMemoryExporter()
+    client = await traced_client(exporter)
+    await client.get("/weight/")
+
+    lines = format_flame(exporter.traces[0]).splitlines()
+
+    assert lines[0].startswith("GET /weight/")
+    assert any(line.startswith("  auth.validate_token") for line in lines)
+    assert any(
+        line.startswith("    WeightRepository.get_weight_measurements")
+        for line in lines
+    )
@@ -0,0 +1,404 @@
+import asyncio
+import json
+import struct
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+from src.modules.auth.constants import UserRole
+from src.modules.weight.config import weight_config
+from src.modules.weight.outliers import find_outliers, outlier_detector
+from src.modules.weight.repository import measurement_notifications
+from src.modules.weight.service import service as weight_service
+from src.utils.notify_utils import NotificationHub
+from src.utils.query_utils import assert_num_queries
+
+STEADY_WEIGHTS = [80.0, 79.8, 80.1, 79.9, 80.0]
+
+
+async def create_measurements(client, weights: list[float]) -> list[dict]:
+    measurements = []
+    for day, weight in enumerate(weights, start=1):
+        response = await client.post(
+            "/weight/", json={"date": f"2024-01-{day:02d}T08:00:00", "weight": weight}
+        )
+        assert response.status_code == 200
+        measurements.append(response.json())
+    return measurements
+
+
+async def test_create_and_list(sign_in):
+    client = await sign_in()
+    await create_measurements(client, [80.0, 79.5])
+
+    response = await client.get("/weight/", params={"from_date": "2024-01-02"})
+
+    assert response.status_code == 200
+    assert [m["weight"] for m in response.json()["items"]] == [79.5]
+
+
+async def test_measurements_are_isolated_between_tests(sign_in):
+    client = await sign_in()
+
+    response = await client.get("/weight/")
+
+    assert response.json()["items"] == []
+
+
+async def test_update(sign_in):
+    client = await sign_in()
+    [measurement] = await create_measurements(client, [80.0])
+
+    response = await client.patch(f"/weight/{measurement['id']}", json={"weight": 78.2})
+
+    assert response.status_code == 200
+    assert response.json()["weight"] == 78.2
+
+
+async def test_empty_update(sign_in):
+    client = await sign_in()
+    [measurement] = await create_measurements(client, [80.0])
+
+    for body in [{}, {"weight": None}]:
+        response = await client.patch(f"/weight/{measurement['id']}", json=body)
+        assert response.status_code == 422
+
+
+async def test_update_of_other_user(client, sign_in):
+    await sign_in("jane@example.com")
+    [measurement] = await create_measurements(client, [80.0])
+    await sign_in("john@example.com")
+
+    response = await client.patch(f"/weight/{measurement['id']}", json={"weight": 1})
+
+    assert response.status_code == 404
+
+
+async def test_delete(sign_in):
+    client = await sign_in()
+    [measurement] = await create_measurements(client, [80.0])
+
+    response = await client.delete(f"/weight/{measurement['id']}")
+    assert response.status_code == 204
+
+    response = await client.delete(f"/weight/{measurement['id']}")
+    assert response.status_code == 404
+
+
+async def test_delete_range(sign_in):
+    client = await sign_in()
+    await create_measurements(client, [80.0, 79.5, 79.0, 78.5])
+
+    response = await client.delete(
+        "/weight/", params={"from_date": "2024-01-02", "to_date": "2024-01-03"}
+    )
+
+    assert response.json()["deleted"] == 2
+    response = await client.get("/weight/")
+    assert sorted(m["weight"] for m in response.json()["items"]) == [78.5, 80.0]
+
+
+async def test_sync(sign_in):
+    client = await sign_in()
+    measurements = await create_measurements(client, [80.0, 79.5, 79.0])
+
+    response = await client.get("/weight/sync", params={"limit": 2})
+    assert response.json()["has_more"] is True
+    assert len(response.json()["items"]) == 2
+
+    await client.delete(f"/weight/{measurements[0]['id']}")
+    response = await client.get(
+        "/weight/sync", params={"cursor": response.json()["cursor"]}
+    )
+
+    changes = {change["id"]: change for change in response.json()["items"]}
+    assert changes[measurements[0]["id"]]["deleted"] is True
+    assert measurements[2]["id"] in changes
+
+
+async def test_sync_invalid_cursor(sign_in):
+    client = await sign_in()
+
+    response = await client.get("/weight/sync", params={"cursor": "invalid"})
+
+    assert response.status_code == 400
+
+
+async def test_summaries(client, sign_in):
+    await sign_in("jane@example.com")
+    user_id = (await client.get("/auth/me")).json()["id"]
+    await sign_in("coach@example.com", roles=[UserRole.USER, UserRole.COACH])
+
+    response = await client.post(
+        "/weight/summaries", json={"user_ids": [user_id], "days": 30}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [
+        {
+            "user_id": user_id,
+            "measurements": 0,
+            "latest_date": None,
+            "latest_weight": None,
+            "first_date": None,
+            "first_weight": None,
+            "min_weight": None,
+            "max_weight": None,
+            "change": None,
+        }
+    ]
+
+
+async def test_summaries_require_coach(sign_in):
+    client = await sign_in()
+
+    response = await client.post("/weight/summaries", json={"user_ids": [1]})
+
+    assert response.status_code == 403
+
+
+@pytest.mark.postgresql
+async def test_daily_buckets_by_local_day(sign_in):
+    client = await sign_in()
+    await client.patch(
+        "/auth/me", json={"timezone": "Europe/Prague", "weight_unit": "lb"}
+    )
+    # 23:30 UTC is already the next day in Prague (UTC+1 in winter).
+    for date, weight in [
+        ("2024-01-01T22:30:00", 80.0),
+        ("2024-01-01T23:30:00", 81.0),
+        ("2024-01-02T08:00:00", 82.0),
+    ]:
+        await client.post("/weight/", json={"date": date, "weight": weight})
+
+    response = await client.get("/weight/daily")
+
+    assert response.status_code == 200
+    assert response.json()["unit"] == "lb"
+    assert response.json()["items"] == [
+        {
+            "day": "2024-01-01",
+            "measurements": 1,
+            "weight": 176.37,
+            "min_weight": 176.37,
+            "max_weight": 176.37,
+        },
+        {
+            "day": "2024-01-02",
+            "measurements": 2,
+            "weight": 179.68,
+            "min_weight": 178.57,
+            "max_weight": 180.78,
+        },
+    ]
+
+
+@pytest.mark.postgresql
+async def test_daily_range_uses_local_days(sign_in):
+    client = await sign_in()
+    await client.patch("/auth/me", json={"timezone": "Europe/Prague"})
+    await client.post("/weight/", json={"date": "2024-01-01T23:30:00", "weight": 81.0})
+
+    response = await client.get(
+        "/weight/daily", params={"from_date": "2024-01-02", "to_date": "2024-01-02"}
+    )
+
+    assert [item["day"] for item in response.json()["items"]] == ["2024-01-02"]
+
+
+async def test_outlier_is_flagged_and_excluded_from_analytics(sign_in):
+    client = await sign_in()
+    await create_measurements(client, STEADY_WEIGHTS)
+
+    response = await client.post(
+        "/weight/", json={"date": "2024-01-06T08:00:00", "weight": 40.0}
+    )
+    assert response.json()["flagged"] is True
+
+    response = await client.put(
+        "/goals/", json={"target_weight": 75.0, "target_date": "2024-06-01"}
+    )
+    assert response.json()["start_weight"] == 80.0
+    response = await client.get("/weight/")
+    flagged = {m["weight"]: m["flagged"] for m in response.json()["items"]}
+    assert flagged.pop(40.0) is True
+    assert not any(flagged.values())
+
+
+async def test_implausible_weight_is_flagged_without_history(sign_in):
+    client = await sign_in()
+
+    [measurement] = await create_measurements(client, [0.8])
+
+    assert measurement["flagged"] is True
+
+
+async def test_corrected_outlier_is_no_longer_flagged(sign_in):
+    client = await sign_in()
+    *_, outlier = await create_measurements(client, STEADY_WEIGHTS + [8.0])
+
+    response = await client.patch(f"/weight/{outlier['id']}", json={"weight": 80.2})
+
+    assert response.json()["flagged"] is False
+
+
+async def test_outlier_window_is_held_in_memory(sign_in):
+    client = await sign_in()
+    await create_measurements(client, STEADY_WEIGHTS)
+    user_id = (await client.get("/auth/me")).json()["id"]
+
+    with assert_num_queries(0):
+        assert await outlier_detector.score(user_id, [80.2, 95.0]) == [False, True]
+
+    # An invalidated window is loaded from the database, plus the savepoint and its release.
+    outlier_detector.invalidate(user_id)
+    with assert_num_queries(3):
+        assert await outlier_detector.score(user_id, [80.2]) == [False]
+
+
+def test_find_outliers():
+    weights = np.array(STEADY_WEIGHTS + [120.0, 80.1, 5.0, 79.8])
+
+    assert find_outliers(weights).tolist() == [False] * 5 + [True, False, True, False]
+
+
+def pack_batch(records: list[tuple[str, float]]) -> bytes:
+    return b"".join(
+        struct.pack("<qf", int(datetime.fromisoformat(date).timestamp()), weight)
+        for date, weight in records
+    )
+
+
+async def test_batch(sign_in):
+    client = await sign_in()
+    body = pack_batch(
+        [
+            ("2024-01-02T08:00:00+00:00", 79.9),
+            ("2024-01-01T08:00:00+00:00", 80.1),
+        ]
+    )
+
+    response = await client.post(
+        "/weight/batch",
+        content=body,
+        headers={"Content-Type": "application/octet-stream"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"saved": 2, "flagged": 0}
+    response = await client.get("/weight/")
+    measurements = {m["date"]: m["weight"] for m in response.json()["items"]}
+    assert measurements == {
+        "2024-01-01T08:00:00+0000": 80.1,
+        "2024-01-02T08:00:00+0000": 79.9,
+    }
+
+
+async def test_batch_flags_outliers(sign_in):
+    client = await sign_in()
+    weights = STEADY_WEIGHTS + [160.0, 80.0]
+    body = pack_batch(
+        [(f"2024-01-{day:02d}T08:00:00+00:00", w) for day, w in enumerate(weights, 1)]
+    )
+
+    response = await client.post("/weight/batch", content=body)
+
+    assert response.json() == {"saved": 7, "flagged": 1}
+
+
+async def test_invalid_batch(sign_in):
+    client = await sign_in()
+    valid = pack_batch([("2024-01-01T08:00:00+00:00", 80.0)])
+
+    for body in [valid[:-1], valid + struct.pack("<qf", 1704096000, float("nan"))]:
+        response = await client.post("/weight/batch", content=body)
+        assert response.status_code == 400
+
+    response = await client.get("/weight/")
+    assert response.json()["items"] == []
+
+
+async def test_stream(sign_in):
+    client = await sign_in()
+    user_id = (await client.get("/auth/me")).json()["id"]
+    events = weight_service.stream_weight_measurements(user_id)
+    assert (await anext(events)).startswith("retry:")
+
+    [measurement] = await create_measurements(client, [80.0])
+
+    event = await anext(events)
+    assert event.startswith("event: measurement\n")
+    assert json.loads(event.split("data: ")[1]) == measurement
+    await events.aclose()
+    assert measurement_notifications.subscribers == 0
+
+
+async def test_stream_batch(sign_in):
+    client = await sign_in()
+    user_id = (await client.get("/auth/me")).json()["id"]
+    events = weight_service.stream_weight_measurements(user_id)
+    await anext(events)
+
+    body = pack_batch(
+        [
+            ("2024-01-01T08:00:00+00:00", 80.1),
+            ("2024-01-02T08:00:00+00:00", 79.9),
+        ]
+    )
+    await client.post("/weight/batch", content=body)
+
+    assert await anext(events) == 'event: sync\ndata: {"saved":2}\n\n'
+    await events.aclose()
+
+
+async def test_stream_heartbeat(sign_in, monkeypatch):
+    monkeypatch.setattr(weight_config, "STREAM_HEARTBEAT_INTERVAL", 0)
+    events = weight_service.stream_weight_measurements(1)
+    await anext(events)
+
+    assert await anext(events) == ": heartbeat\n\n"
+    await events.aclose()
+
+
+async def test_stream_connection_limit(sign_in, monkeypatch):
+    client = await sign_in()
+    monkeypatch.setattr(measurement_notifications, "max_subscribers", 0)
+
+    response = await client.get("/weight/stream")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(weight_config.STREAM_RETRY_AFTER)
+
+
+def test_slow_subscriber_is_disconnected():
+    hub = NotificationHub("test", max_subscribers=10, queue_size=2)
+    queue = hub.subscribe(1)
+
+    for payload in ["a", "b", "c"]:
+        hub.publish(1, payload)
+
+    assert queue.get_nowait() is None
+    assert hub.subscribers == 0
+
+
+@pytest.mark.postgresql
+async def test_notifications_are_delivered_through_postgres(engine):
+    hub = NotificationHub("test", max_subscribers=10, queue_size=10)
+    queue = hub.subscribe(1)
+    await hub.start()
+    try:
+        # Notify until the listener, connecting in the background, receives the notification.
+        for _ in range(50):
+            async with engine.begin() as connection:
+                await connection.execute(select(func.pg_notify("test", "1:hello")))
+            try:
+                payload = await asyncio.wait_for(queue.get(), 0.1)
+                break
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await hub.stop()
+
+    assert payload == "hello"
+    assert await queue.get() is None